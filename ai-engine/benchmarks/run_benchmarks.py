@@ -0,0 +1,311 @@
+"""
+Micro-benchmarks for the ai-engine heuristics and detector.
+
+Runs every benchmark over seeded synthetic corpora (several sizes and text
+lengths), reports ops/sec, p50/p99 latency and peak traced memory, writes the
+results as JSON and compares them against a stored baseline: a benchmark whose
+throughput dropped (or whose memory grew) by more than --tolerance fails the
+run.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --only detect_clickbait
+    python benchmarks/run_benchmarks.py --classifier mock model --json results.json
+    python benchmarks/run_benchmarks.py --save-baseline    # after an intended change
+
+Throughput is compared as a ratio to a fixed calibration workload whose rounds
+are interleaved with the benchmark's, so a baseline saved on one machine still
+holds on a faster or slower one, and under changing background load.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Ensure we can import from local directories (ai-engine folder)
+ENGINE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ENGINE_DIR)
+
+from config.config import Config
+from heuristics.clickbait import detect_clickbait
+from heuristics.reliability import check_reliability_patterns
+from heuristics.sensationalism import analyze_sensationalism
+from heuristics.source_check import check_source_reliability, SUSPICIOUS_DOMAINS, RELIABLE_DOMAINS
+from explainability.highlight_suspicious import highlight_suspicious
+from pipelines import detector
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+MIN_ROUND_SECONDS = 0.1 # Timed rounds repeat the corpus until they last this long (timeit's autorange)
+
+# Words per document for each length class
+LENGTHS = {"short": 12, "medium": 150, "long": 1500}
+
+NEUTRAL_WORDS = (
+    "the government announced a new policy on tuesday after the committee reviewed "
+    "budget figures from last year while officials said the program would expand "
+    "to more regions and researchers published data showing modest growth in "
+    "employment local reports confirmed the schedule for the vote next month"
+).split()
+LOADED_WORDS = ["amazing", "terrible", "horrible", "incredible", "worst", "best", "outrageous", "disgusting"]
+HEDGE_PHRASES = [
+    "sources claim", "allegedly", "experts claim", "viral message",
+    "what they don't want you to know", "mainstream media is silent",
+]
+UNKNOWN_DOMAINS = ["local-daily.com", "citynews.org", "blog.example.net"]
+
+
+def make_corpus(size: int, length: str, seed: int = 42) -> list:
+    """
+    Deterministic synthetic documents: mostly neutral prose, with a share of
+    clickbait headlines, loaded words, hedge phrases and shouting mixed in,
+    so every branch of the heuristics is exercised.
+    """
+    rng = random.Random(f"{seed}:{size}:{length}")
+    words = LENGTHS[length]
+    domains = sorted(SUSPICIOUS_DOMAINS) + sorted(RELIABLE_DOMAINS) + UNKNOWN_DOMAINS
+    corpus = []
+    for _ in range(size):
+        headline = " ".join(rng.choice(NEUTRAL_WORDS) for _ in range(10))
+        if rng.random() < 0.3:
+            headline = f"{rng.choice(Config.CLICKBAIT_KEYWORDS)} {headline}"
+        if rng.random() < 0.1:
+            headline = headline.upper() + "!!"
+
+        body = []
+        for _ in range(max(0, words - 10)):
+            roll = rng.random()
+            if roll < 0.03:
+                body.append(rng.choice(LOADED_WORDS))
+            elif roll < 0.04:
+                body.append(rng.choice(HEDGE_PHRASES))
+            else:
+                body.append(rng.choice(NEUTRAL_WORDS))
+        text = headline + ("\n" + " ".join(body) + "." if body else "")
+        url = "" if rng.random() < 0.1 else f"https://{'www.' if rng.random() < 0.5 else ''}{rng.choice(domains)}/news/{rng.randrange(10**6)}"
+        corpus.append({"headline": headline, "text": text, "url": url})
+    return corpus
+
+
+def mock_classifier(text, candidate_labels):
+    """Same output shape as the detector's fallback classifier (uniform scores)."""
+    return {"labels": candidate_labels, "scores": [1.0 / len(candidate_labels)] * len(candidate_labels)}
+
+
+def load_classifier(kind: str):
+    """Returns the classifier to install for a run, or None if it is unavailable here."""
+    if kind == "mock":
+        return mock_classifier
+    if detector.pipeline is None:
+        return None
+    detector._classifier = None
+    classifier = detector.get_classifier()
+    # get_classifier falls back to a mock when the model cannot be loaded
+    return None if getattr(classifier, "__name__", "") == "mock_classifier" else classifier
+
+
+# name -> (function taking one corpus item, needs the classifier)
+BENCHMARKS = {
+    "detect_clickbait": (lambda doc: detect_clickbait(doc["headline"]), False),
+    "analyze_sensationalism": (lambda doc: analyze_sensationalism(doc["text"]), False),
+    "check_reliability_patterns": (lambda doc: check_reliability_patterns(doc["text"]), False),
+    "check_source_reliability": (lambda doc: check_source_reliability(doc["url"]), False),
+    "highlight_suspicious": (lambda doc: highlight_suspicious(doc["text"]), False),
+    "detect_fake_news": (lambda doc: detector.detect_fake_news(doc["text"], doc["url"]), True),
+}
+
+
+def calibration_workload(doc):
+    """
+    Fixed pure-Python work (lower-case, split, count words) in the same mix as
+    the heuristics. Its throughput measures the machine, not the code: every
+    benchmark's ops/sec is compared relative to it.
+    """
+    counts = {}
+    for token in doc["text"].lower().split():
+        counts[token] = counts.get(token, 0) + 1
+    return len(counts)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def passes_per_round(fn, corpus: list) -> int:
+    """Passes over the corpus for a timed round to last MIN_ROUND_SECONDS (timeit's autorange)."""
+    start = time.perf_counter()
+    for doc in corpus:
+        fn(doc)
+    return max(1, math.ceil(MIN_ROUND_SECONDS / max(time.perf_counter() - start, 1e-6)))
+
+
+def run_one(fn, corpus: list, rounds: int, warmup: int) -> dict:
+    # 1. Warm up (caches, lazy imports, branch predictors) and size the rounds
+    for doc in corpus[:warmup]:
+        fn(doc)
+    passes = passes_per_round(fn, corpus)
+    calibration_corpus = make_corpus(100, "medium", seed=0)
+    calibration_passes = passes_per_round(calibration_workload, calibration_corpus)
+
+    # 2. Timed rounds, per-call latencies. A calibration round runs right before
+    # each one: machine slowdowns are short, only interleaving cancels them out.
+    samples = []
+    round_times = []
+    calibration_times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable() # Keep collector pauses out of the per-call samples
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            for _ in range(calibration_passes):
+                for doc in calibration_corpus:
+                    calibration_workload(doc)
+            calibration_times.append(time.perf_counter_ns() - start)
+
+            elapsed = 0
+            for _ in range(passes):
+                for doc in corpus:
+                    start = time.perf_counter_ns()
+                    fn(doc)
+                    duration = time.perf_counter_ns() - start
+                    samples.append(duration)
+                    elapsed += duration
+            round_times.append(elapsed)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples.sort()
+
+    # 3. Peak memory in a separate pass (tracemalloc slows every allocation)
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for doc in corpus:
+        fn(doc)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": len(samples),
+        # Best round, as timeit does: slower rounds measure the machine's noise, not the code
+        "ops_per_sec": round(len(corpus) * passes / (min(round_times) / 1e9), 1),
+        "calibration_ops_per_sec": round(len(calibration_corpus) * calibration_passes / (min(calibration_times) / 1e9), 1),
+        "p50_us": round(percentile(samples, 0.50) / 1000, 2),
+        "p99_us": round(percentile(samples, 0.99) / 1000, 2),
+        "mean_us": round(statistics.fmean(samples) / 1000, 2),
+        "peak_kib": round((peak - baseline) / 1024, 1),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Regressions against the baseline: best-round throughput, relative to the
+    calibration rounds interleaved with it, lower by more than `tolerance`,
+    or peak memory above it by more than `tolerance` (+64 KiB of slack for
+    tiny peaks). Latency percentiles are reported but not gated, they move
+    with machine load.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or "calibration_ops_per_sec" not in previous:
+            continue
+        relative = current["ops_per_sec"] / current["calibration_ops_per_sec"]
+        previous_relative = previous["ops_per_sec"] / previous["calibration_ops_per_sec"]
+        if relative < previous_relative * (1 - tolerance):
+            regressions.append(f"{name}: ops/sec relative to calibration {previous_relative:.4g} -> {relative:.4g} "
+                               f"({previous['ops_per_sec']} -> {current['ops_per_sec']})")
+        if current["peak_kib"] > previous["peak_kib"] * (1 + tolerance) + 64:
+            regressions.append(f"{name}: peak memory {previous['peak_kib']}KiB -> {current['peak_kib']}KiB")
+    return regressions
+
+
+def main(args):
+    sizes = [50, 200] if args.quick else args.sizes
+    lengths = ["short", "medium"] if args.quick else args.lengths
+    names = args.only or list(BENCHMARKS)
+
+    classifiers = {}
+    for kind in args.classifier:
+        classifier = load_classifier(kind)
+        if classifier is None:
+            print(f"Skipping classifier '{kind}': model not available (transformers missing or load failed)")
+        else:
+            classifiers[kind] = classifier
+
+    results = {}
+    print(f"{'benchmark':58} {'ops/sec':>11} {'p50 us':>9} {'p99 us':>9} {'peak KiB':>9}")
+    for name in names:
+        fn, needs_classifier = BENCHMARKS[name]
+        variants = classifiers.items() if needs_classifier else [(None, None)]
+        for kind, classifier in variants:
+            if classifier is not None:
+                detector._classifier = classifier
+            for length in lengths:
+                for size in sizes:
+                    corpus = make_corpus(size, length, seed=args.seed)
+                    key = f"{name}[{kind}]/{length}/n={size}" if kind else f"{name}/{length}/n={size}"
+                    stats = run_one(fn, corpus, rounds=args.rounds, warmup=min(size, 20))
+                    results[key] = stats
+                    print(f"{key:58} {stats['ops_per_sec']:11.1f} {stats['p50_us']:9.2f} {stats['p99_us']:9.2f} {stats['peak_kib']:9.1f}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rounds": args.rounds,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    compared = [name for name in results if "calibration_ops_per_sec" in baseline.get(name, {})]
+    missing = [name for name in results if name not in compared]
+    regressions = compare(results, baseline, args.tolerance)
+    print(f"\nCompared {len(compared)} benchmarks against {args.baseline} (tolerance {args.tolerance:.0%})")
+    if missing:
+        print(f"  {len(missing)} not in the baseline (run with --save-baseline to add them): {', '.join(missing)}")
+    for regression in regressions:
+        print(f"  REGRESSION {regression}")
+    print("FAIL" if regressions else "OK")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ai-engine heuristics and detector.")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--classifier", nargs="*", default=["mock", "model"], choices=["mock", "model"],
+                        help="Classifier(s) for detect_fake_news; 'model' loads Config.FAKE_NEWS_MODEL_NAME")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[100, 1000], help="Documents per corpus")
+    parser.add_argument("--lengths", nargs="*", default=list(LENGTHS), choices=list(LENGTHS))
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark (best one counts)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help="Small corpora (sizes 50/200, short/medium texts)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown / memory growth")
+    main(parser.parse_args())
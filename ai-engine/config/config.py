@@ -20,6 +20,16 @@ class Config:
         "shocking", "you won't believe", "mind blowing", "miracle", 
         "secret", "exposed", "banned", "can't miss"
     ]
+    # Cascade: a hashed n-gram logistic regression (models/fake_news_classifier.py) answers
+    # first; only texts whose P(fake) falls inside the band go to the zero-shot model
+    CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+    CASCADE_MODEL_PATH = os.getenv("CASCADE_MODEL_PATH", os.path.join(os.path.dirname(__file__), "..", "models", "artifacts", "fake_news_linear.npz"))
+    CASCADE_UNCERTAINTY_BAND = (0.25, 0.75) # Escalate when low < P(fake) < high
+    # Headline clickbait model (models/clickbait_detector.py, memory-mapped .npy weights); the keyword
+    # rules above are used alone when the file is missing
+    CLICKBAIT_MODEL_PATH = os.getenv("CLICKBAIT_MODEL_PATH", os.path.join(os.path.dirname(__file__), "..", "models", "artifacts", "clickbait.npy"))
+
+    MAX_HIGHLIGHTS = 200 # Suspicious spans returned per analysis (explainability/highlight_suspicious.py)
 
     # API Keys (Passed from environment or backend)
     GOOGLE_FACT_CHECK_KEY = os.getenv("GOOGLE_FACT_CHECK_KEY", "")
@@ -0,0 +1,169 @@
+import re
+from typing import Iterable, Iterator, List, Union
+from config.config import Config
+from heuristics.reliability import SUSPICIOUS_PHRASES
+from pipelines.preprocessing import Document, as_document
+
+# Highlight weight per category (0-1), the same weights the heuristics score with
+CATEGORY_WEIGHTS = {
+    "clickbait": 0.3,
+    "hedge": 0.3,
+    "suspicious_phrase": 0.3,
+    "all_caps": 0.3,
+    "punctuation": 0.2,
+}
+
+# Characters of look-back kept between chunks in highlight_stream: longer than
+# any phrase, so a phrase cut by a chunk boundary is found in the next round
+_CARRY = 128
+# A span still growing at the end of the buffer is held back at most this long,
+# then emitted as is (a pathological all-caps run must not make the carry unbounded)
+_MAX_HOLD = 4096
+
+
+def _normalize(phrase: str) -> str:
+    # casefold, not lower: IGNORECASE also matches fold variants such as "ſhocking" (long s)
+    return " ".join(phrase.casefold().replace("\u2019", "'").split())
+
+
+def _trie_pattern(phrases) -> str:
+    """
+    One regex for all phrases with shared prefixes factored out
+    ("exp(?:erts\\s+claim|osed)"): a plain alternation retries every phrase
+    at every position, the trie branches once per character.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {} # End of a phrase
+
+    def atom(char):
+        # Any run of whitespace between words, straight or curly apostrophes
+        if char == " ":
+            return r"\s+"
+        return "['\u2019]" if char == "'" else re.escape(char)
+
+    def build(node):
+        branches = [atom(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy: a longer phrase ("you won't believe") wins over its prefix
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _build_patterns():
+    categories = {_normalize(keyword): "clickbait" for keyword in Config.CLICKBAIT_KEYWORDS}
+    categories.update((_normalize(phrase), category) for phrase, category in SUSPICIOUS_PHRASES.items())
+    phrases = r"\b" + _trie_pattern(categories) + r"\b"
+
+    upper = "A-Z\u00c0-\u00d6\u00d8-\u00de"
+    # Two or more consecutive upper-case words ("BREAKING NEWS"), case sensitive
+    caps = rf"(?-i:\b[{upper}][{upper}'\u2019]+(?:[ \t]+[{upper}][{upper}'\u2019]+)+\b)"
+    # "!!", "??", "?!?!"...
+    punctuation = r"[!?]{2,}"
+
+    combined = re.compile(rf"(?P<all_caps>{caps})|(?P<punctuation>{punctuation})|(?P<phrase>{phrases})", re.IGNORECASE)
+    return combined, re.compile(phrases, re.IGNORECASE), categories
+
+# Compiled once at import; one pattern so the text is scanned in a single pass
+_PATTERN, _PHRASE_PATTERN, _PHRASE_CATEGORIES = _build_patterns()
+
+
+def _span(match, offset: int, category: str) -> dict:
+    return {
+        "start": offset + match.start(),
+        "end": offset + match.end(),
+        "text": match.group(),
+        "category": category,
+        "weight": CATEGORY_WEIGHTS[category],
+    }
+
+
+def _phrase_spans(matches, offset: int) -> List[dict]:
+    spans = []
+    for match in matches:
+        # A case variant the regex matches but casefold maps elsewhere is skipped, not a KeyError
+        category = _PHRASE_CATEGORIES.get(_normalize(match.group()))
+        if category is not None:
+            spans.append(_span(match, offset, category))
+    return spans
+
+
+def _spans(match, offset: int) -> List[dict]:
+    """The highlight(s) of one match: an all-caps run also yields the phrases inside it."""
+    kind = match.lastgroup
+    if kind in ("all_caps", "punctuation"):
+        spans = [_span(match, offset, kind)]
+        if kind == "all_caps":
+            spans.extend(_phrase_spans(_PHRASE_PATTERN.finditer(match.group()), offset + match.start()))
+        return spans
+    return _phrase_spans([match], offset)
+
+
+def iter_highlights(text: Union[str, Document]) -> Iterator[dict]:
+    """
+    Yields suspicious spans in order of their start offset, as they are found:
+    {"start", "end", "text", "category", "weight"}. `text[start:end]` is the
+    span; offsets count code points, so a JavaScript client has to convert
+    them for characters outside the BMP (emoji).
+    """
+    text = as_document(text).text
+    if not text:
+        return
+    for match in _PATTERN.finditer(text):
+        yield from _spans(match, 0)
+
+
+def highlight_suspicious(text: Union[str, Document], limit: int = None) -> List[dict]:
+    """
+    Character-offset highlights for clickbait keywords, hedges, suspicious
+    phrases, all-caps runs and punctuation bursts (see iter_highlights).
+    `limit` stops the scan after that many spans.
+    """
+    highlights = []
+    for span in iter_highlights(text):
+        highlights.append(span)
+        if limit is not None and len(highlights) >= limit:
+            break
+    return highlights
+
+
+def highlight_stream(chunks: Iterable[str]) -> Iterator[dict]:
+    """
+    Same spans as iter_highlights, for a document that arrives (or is read)
+    in chunks: offsets are relative to the whole document, and spans are
+    yielded as soon as no later chunk can change them. Each character is
+    scanned at most twice (the carried-over tail), so the work stays linear.
+    """
+    buffer = ""
+    offset = 0 # Document offset of buffer[0]
+    pos = 0 # Where scanning resumes in buffer (earlier characters are context for \b)
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        # Matches ending in the last _CARRY characters could still grow with the next chunk
+        safe = len(buffer) - _CARRY
+        resume = None
+        last_end = pos
+        for match in _PATTERN.finditer(buffer, pos):
+            if match.end() > safe and len(buffer) - match.start() < _MAX_HOLD:
+                resume = match.start()
+                break
+            yield from _spans(match, offset)
+            last_end = match.end()
+        if resume is None:
+            resume = max(last_end, safe)
+        # Keep a little context before the resume point for word boundaries
+        cut = max(0, resume - 1)
+        buffer = buffer[cut:]
+        offset += cut
+        pos = resume - cut
+
+    for match in _PATTERN.finditer(buffer, pos):
+        yield from _spans(match, offset)
@@ -1,9 +1,39 @@
+import logging
 import re
+from typing import Union
 from config.config import Config
+from pipelines.preprocessing import Document
 
-def detect_clickbait(headline: str):
+logger = logging.getLogger(__name__)
+
+_model = None # ClickbaitDetector, False if CLICKBAIT_MODEL_PATH could not be loaded
+
+def get_clickbait_model():
+    """
+    The trained headline model, or None (rules only) if CLICKBAIT_MODEL_PATH
+    cannot be loaded. Loaded on first use; the weights are memory-mapped, so
+    this costs a file open, not a read.
     """
-    Analyzes headline for clickbait patterns.
+    global _model
+    if _model is None:
+        try:
+            from models.clickbait_detector import ClickbaitDetector
+            _model = ClickbaitDetector.load(Config.CLICKBAIT_MODEL_PATH)
+            logger.info("Loaded clickbait model: %s", Config.CLICKBAIT_MODEL_PATH)
+        except FileNotFoundError:
+            logger.info("No clickbait model at %s, using the keyword rules only", Config.CLICKBAIT_MODEL_PATH)
+            _model = False
+        except Exception as e:
+            logger.warning("Clickbait model unavailable, using the keyword rules only: %s", e)
+            _model = False
+    return _model or None
+
+def detect_clickbait(headline: Union[str, Document]):
+    """
+    Analyzes headline for clickbait patterns. Given an article Document,
+    its headline (first line) is analyzed. With a trained model
+    (CLICKBAIT_MODEL_PATH) the score is its probability; the rules still
+    explain what they found.
     
     Returns:
         dict: {
@@ -11,10 +41,12 @@ def detect_clickbait(headline: str):
             "reasoning": str
         }
     """
-    if not headline:
+    doc = headline.headline if isinstance(headline, Document) else Document(headline)
+    if not doc.text:
         return {"score": 0.0, "reasoning": "No headline provided."}
         
-    headline_lower = headline.lower()
+    headline = doc.text
+    headline_lower = doc.lower
     score = 0.0
     reasons = []
     
@@ -36,7 +68,7 @@ def detect_clickbait(headline: str):
     # 3. Check for All Caps (Sign of urgency/shouting)
     # We count words with length > 2 to avoid 'A', 'I', 'US', 'UK' triggering it falsely too often, 
     # but simple heuristics: if > 50% capital letters
-    uppercase_chars = sum(1 for c in headline if c.isupper())
+    uppercase_chars = sum(map(str.isupper, headline))
     total_chars = len(headline)
     if total_chars > 0 and (uppercase_chars / total_chars) > 0.5:
         score += 0.3
@@ -49,6 +81,12 @@ def detect_clickbait(headline: str):
         
     # Cap score at 1.0
     score = min(score, 1.0)
+
+    # 5. Trained model, when available, replaces the rule score
+    model = get_clickbait_model()
+    if model is not None:
+        score = float(model.predict_proba([headline])[0])
+        reasons.append(f"Clickbait model probability: {score:.2f}.")
     
     return {
         "score": round(score, 2),
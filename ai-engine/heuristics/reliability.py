@@ -1,31 +1,34 @@
 import re
+from typing import Union
+from pipelines.preprocessing import Document, as_document
 
-def check_reliability_patterns(text: str):
+# Phrases often used in fake news to avoid liability, by kind:
+# "hedge" = vague/unverifiable attribution, "suspicious_phrase" = appeals to popularity or secrecy
+SUSPICIOUS_PHRASES = {
+    "unverified sources": "hedge",
+    "according to rumors": "hedge",
+    "sources claim": "hedge",
+    "allegedly": "hedge",
+    "it is believed": "hedge",
+    "experts claim": "hedge", # Vague appeal to authority
+    "critics have questioned": "hedge", # Vague
+    "social media platforms were flooded": "suspicious_phrase", # Appeal to popularity
+    "no official press release": "suspicious_phrase",
+    "mainstream media is silent": "suspicious_phrase",
+    "what they don't want you to know": "suspicious_phrase",
+    "viral message": "suspicious_phrase",
+    "forwarded many times": "suspicious_phrase",
+}
+
+def check_reliability_patterns(text: Union[str, Document]):
     """
     Analyzes text for 'hedge words' and signs of unreliable attribution
     that suggest gossip or unverified content.
     """
-    text_lower = text.lower()
-    
-    # Phrases often used in fake news to avoid liability
-    suspicious_phrases = [
-        "unverified sources",
-        "according to rumors",
-        "sources claim",
-        "allegedly",
-        "it is believed",
-        "experts claim", # Vague appeal to authority
-        "critics have questioned", # Vague
-        "social media platforms were flooded", # Appeal to popularity
-        "no official press release",
-        "mainstream media is silent",
-        "what they don't want you to know",
-        "viral message",
-        "forwarded many times"
-    ]
+    text_lower = as_document(text).lower
     
     found_phrases = []
-    for phrase in suspicious_phrases:
+    for phrase in SUSPICIOUS_PHRASES:
         if phrase in text_lower:
             found_phrases.append(phrase)
             
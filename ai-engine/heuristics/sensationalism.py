@@ -1,7 +1,9 @@
+from typing import Union
 from textblob import TextBlob
 from config.config import Config
+from pipelines.preprocessing import Document, as_document
 
-def analyze_sensationalism(text: str):
+def analyze_sensationalism(text: Union[str, Document]):
     """
     Analyzes text for sensationalism using Sentiment Analysis.
     High subjectivity and extreme polarity suggest sensationalism.
@@ -13,7 +15,8 @@ def analyze_sensationalism(text: str):
             "sentiment": dict
         }
     """
-    blob = TextBlob(text)
+    # TextBlob's sentiment lexicon runs its own tokenizer (it needs the punctuation and casing)
+    blob = TextBlob(as_document(text).text)
     sentiment = blob.sentiment
     
     # 1. Subjectivity check (Opinions vs Facts)
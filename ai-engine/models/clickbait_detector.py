@@ -0,0 +1,125 @@
+import json
+import os
+from typing import Sequence
+import numpy as np
+
+DEFAULT_CONFIG = {
+    "bits": 18, # 2^18 hashed char n-gram buckets
+    "ngrams": [3, 5], # char n-gram sizes, inclusive range
+    "max_bytes": 128, # Headlines are cut to this many UTF-8 bytes (boundary spaces included)
+}
+# Dense features appended after the hashed buckets (case and punctuation, lost by the n-grams' lowercasing)
+DENSE_FEATURES = ["upper_ratio", "punctuation_burst", "question", "starts_with_digit"]
+
+BATCH_SIZE = 4096 # Headlines featurized at once (bounds the temporary arrays to a few MB)
+_PRIME = np.uint32(16777619) # FNV prime, rolling polynomial hash
+_MIX = np.uint32(2654435761) # Knuth's multiplicative hash, spreads the polynomial hash over the buckets
+
+
+def _byte_matrix(headlines: Sequence[str], max_bytes: int):
+    """(N, L) uint8 matrix of " headline " (zero padded) and the byte length of each row."""
+    encoded = [(" " + headline + " ").encode("utf-8")[:max_bytes] for headline in headlines]
+    width = max(3, max(map(len, encoded)))
+    matrix = np.array(encoded, dtype=f"S{width}").view(np.uint8).reshape(len(encoded), width)
+    lengths = np.fromiter(map(len, encoded), dtype=np.int32, count=len(encoded))
+    return matrix, lengths
+
+
+def hashed_features(headlines: Sequence[str], config: dict):
+    """
+    Vectorized featurization of a batch of headlines (no Python loop per n-gram):
+    returns (buckets, mask, dense) where buckets is (N, M) int bucket ids of every
+    char n-gram, mask marks the real ones (rows have different lengths) and dense
+    is (N, len(DENSE_FEATURES)). Used by training and prediction alike.
+    """
+    raw, lengths = _byte_matrix(headlines, config["max_bytes"])
+    upper = (raw >= 65) & (raw <= 90)
+    letters = upper | ((raw >= 97) & (raw <= 122))
+    data = (raw + upper * np.uint8(32)).astype(np.uint32) # ASCII lowercase
+    width = data.shape[1]
+    shift = np.uint32(32 - config["bits"])
+
+    # 1. Rolling hashes: the (n+1)-grams extend the n-grams by one byte
+    low, high = config["ngrams"]
+    h = data[:, :width - low + 1].copy()
+    for k in range(1, low):
+        h = h * _PRIME + data[:, k:width - low + 1 + k]
+    buckets, masks = [], []
+    positions = np.arange(width, dtype=np.int32)
+    for n in range(low, high + 1):
+        if n > low:
+            h = h[:, :-1] * _PRIME + data[:, n - 1:]
+        # Mixing in n keeps "abc" and "abc " from sharing a bucket by construction
+        buckets.append(((h ^ np.uint32(n * 0x9E3779B9 & 0xFFFFFFFF)) * _MIX) >> shift)
+        masks.append(positions[None, :width - n + 1] <= (lengths[:, None] - n))
+    buckets = np.concatenate(buckets, axis=1)
+    mask = np.concatenate(masks, axis=1)
+
+    # 2. Dense features
+    letter_count = np.maximum(letters.sum(axis=1), 1)
+    burst = (((raw[:, :-1] == 33) | (raw[:, :-1] == 63)) & ((raw[:, 1:] == 33) | (raw[:, 1:] == 63))).any(axis=1)
+    dense = np.stack([
+        upper.sum(axis=1) / letter_count,
+        burst,
+        (raw == 63).any(axis=1),
+        (raw[:, 1] >= 48) & (raw[:, 1] <= 57),
+    ], axis=1).astype(np.float32)
+    return buckets, mask, dense
+
+
+def row_scale(mask: np.ndarray) -> np.ndarray:
+    """Per-headline n-gram weight: 1/sqrt(#n-grams), so long and short headlines score alike."""
+    return 1.0 / np.sqrt(np.maximum(mask.sum(axis=1), 1)).astype(np.float32)
+
+
+class ClickbaitDetector:
+    """
+    Headline clickbait classifier: a sparse linear model over hashed char
+    n-grams (plus a few case/punctuation features).
+
+    The weights are a .npy file opened memory-mapped: loading is instant and
+    the pages are shared by every worker process on the host. Prediction is
+    vectorized over the batch: each headline costs a few NumPy gathers and
+    sums, no per-n-gram Python code.
+
+        detector = ClickbaitDetector.load(path)
+        probabilities = detector.predict_proba(headlines) # np.ndarray, P(clickbait)
+    """
+    def __init__(self, weights: np.ndarray, intercept: float, config: dict, meta: dict = None):
+        self.weights = weights # n_buckets hashed weights, then one per DENSE_FEATURES entry
+        self.intercept = float(intercept)
+        self.config = config
+        self.meta = meta or {}
+        self.n_buckets = 2 ** config["bits"]
+
+    @classmethod
+    def load(cls, path: str) -> "ClickbaitDetector":
+        """`path` is the .npy weights file; its config lives next to it in <path>.json."""
+        weights = np.load(path, mmap_mode="r")
+        with open(path + ".json") as f:
+            header = json.load(f)
+        if weights.shape[0] != 2 ** header["config"]["bits"] + len(DENSE_FEATURES):
+            raise ValueError(f"{path}: {weights.shape[0]} weights do not match its config")
+        return cls(weights, header["intercept"], header["config"], header.get("meta"))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.save(path, np.asarray(self.weights, dtype=np.float32))
+        with open(path + ".json", "w") as f:
+            json.dump({"intercept": self.intercept, "config": self.config, "meta": self.meta}, f, indent=2)
+
+    def decision_function(self, headlines: Sequence[str]) -> np.ndarray:
+        scores = np.empty(len(headlines), dtype=np.float32)
+        hashed, dense = self.weights[:self.n_buckets], self.weights[self.n_buckets:]
+        for start in range(0, len(headlines), BATCH_SIZE):
+            batch = headlines[start:start + BATCH_SIZE]
+            buckets, mask, dense_features = hashed_features(batch, self.config)
+            ngram_sum = np.where(mask, hashed[buckets], 0).sum(axis=1)
+            scores[start:start + len(batch)] = ngram_sum * row_scale(mask) + dense_features @ dense + self.intercept
+        return scores
+
+    def predict_proba(self, headlines: Sequence[str]) -> np.ndarray:
+        """P(clickbait) for each headline."""
+        if len(headlines) == 0:
+            return np.empty(0, dtype=np.float32)
+        return 1.0 / (1.0 + np.exp(-self.decision_function(headlines)))
@@ -0,0 +1,82 @@
+import json
+from typing import Iterable, Union
+import numpy as np
+from pipelines.preprocessing import Document, as_document
+
+# Feature hashing defaults: 2^18 word + 2^18 char buckets (~1 MB of float32 weights, less on disk)
+DEFAULT_FEATURES = {
+    "word_ngrams": [1, 2],
+    "word_bits": 18,
+    "char_ngrams": [3, 5],
+    "char_bits": 18,
+    # Only the start of a text is featurized (as the zero-shot model only sees its first 1500 chars),
+    # which bounds the per-text cost; applied identically in training and inference
+    "max_chars": 3000,
+}
+
+
+def make_vectorizers(features: dict):
+    """
+    The two stateless hashing vectorizers (word and char_wb n-grams). Shared
+    by training and inference, so a model is fully described by its weights
+    plus this dict. Texts are passed in already lowercased (Document.lower).
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+    common = {"alternate_sign": False, "norm": "l2", "lowercase": False, "dtype": np.float32}
+    word = HashingVectorizer(analyzer="word", ngram_range=tuple(features["word_ngrams"]),
+                             n_features=2 ** features["word_bits"], token_pattern=r"(?u)\b\w+\b", **common)
+    char = HashingVectorizer(analyzer="char_wb", ngram_range=tuple(features["char_ngrams"]),
+                             n_features=2 ** features["char_bits"], **common)
+    return word, char
+
+
+def featurize(texts: Iterable[Union[str, Document]], vectorizers, max_chars: int = None):
+    from scipy.sparse import hstack
+    lowered = [as_document(text).lower[:max_chars] for text in texts]
+    return hstack([vectorizer.transform(lowered) for vectorizer in vectorizers], format="csr")
+
+
+class LinearFakeNewsClassifier:
+    """
+    Cheap first tier of the detector: logistic regression over hashed word
+    and character n-grams. predict_proba returns P(fake); a document costs a
+    sparse dot product, orders of magnitude less than the zero-shot model.
+
+    Serialized compactly as an .npz: only the non-zero weights (int32 index +
+    float16 value), the intercept and the feature config.
+    """
+    def __init__(self, coef: np.ndarray, intercept: float, features: dict, meta: dict = None):
+        self.coef = coef.astype(np.float32)
+        self.intercept = float(intercept)
+        self.features = features
+        self.meta = meta or {}
+        self.vectorizers = make_vectorizers(features)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearFakeNewsClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            coef = np.zeros(header["n_features"], dtype=np.float32)
+            coef[data["indices"]] = data["values"].astype(np.float32)
+            return cls(coef, header["intercept"], header["features"], header.get("meta"))
+
+    def save(self, path: str):
+        indices = np.flatnonzero(self.coef).astype(np.int32)
+        header = {
+            "n_features": int(self.coef.shape[0]),
+            "intercept": self.intercept,
+            "features": self.features,
+            "meta": self.meta,
+        }
+        np.savez_compressed(path, header=json.dumps(header), indices=indices, values=self.coef[indices].astype(np.float16))
+
+    def decision_function(self, texts) -> np.ndarray:
+        return featurize(texts, self.vectorizers, self.features.get("max_chars")) @ self.coef + self.intercept
+
+    def predict_proba(self, texts) -> np.ndarray:
+        """P(fake) for each text (str or Document)."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(texts)))
+
+    def predict_one(self, text: Union[str, Document]) -> float:
+        return float(self.predict_proba([text])[0])
+
@@ -1,4 +1,8 @@
+import logging
+import threading
+import time
 from datetime import datetime
+from typing import Union
 try:
     from transformers import pipeline
 except ImportError:
@@ -7,10 +11,69 @@ except ImportError:
 from heuristics.sensationalism import analyze_sensationalism
 from heuristics.clickbait import detect_clickbait
 from heuristics.source_check import check_source_reliability
+from explainability.highlight_suspicious import highlight_suspicious
+from pipelines.preprocessing import Document, as_document
 from config.config import Config
 
+logger = logging.getLogger(__name__)
+
+class CascadeStats:
+    """
+    How the detector's cascade routes traffic: calls answered by the linear
+    tier vs escalated to the transformer, and the time spent in each.
+    throughput_gain compares the classification time actually spent with
+    what sending every call to the transformer would have cost.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.escalated = 0
+            self.linear_seconds = 0.0
+            self.transformer_seconds = 0.0
+
+    def record(self, escalated: bool, linear_seconds: float, transformer_seconds: float = 0.0):
+        with self._lock:
+            self.calls += 1
+            self.escalated += escalated
+            self.linear_seconds += linear_seconds
+            self.transformer_seconds += transformer_seconds
+
+    def summary(self) -> dict:
+        with self._lock:
+            transformer_mean = self.transformer_seconds / self.escalated if self.escalated else None
+            spent = self.linear_seconds + self.transformer_seconds
+            return {
+                "calls": self.calls,
+                "escalated": self.escalated,
+                "escalation_rate": round(self.escalated / self.calls, 4) if self.calls else None,
+                "linear_ms_mean": round(self.linear_seconds / self.calls * 1000, 3) if self.calls else None,
+                "transformer_ms_mean": round(transformer_mean * 1000, 3) if transformer_mean else None,
+                # Needs at least one escalation to know what the transformer costs
+                "throughput_gain": round(self.calls * transformer_mean / spent, 2) if transformer_mean and spent else None,
+            }
+
+
 # Global Model Cache
 _classifier = None
+_linear_classifier = None # LinearFakeNewsClassifier, False if it could not be loaded
+cascade_stats = CascadeStats()
+
+def get_linear_classifier():
+    """The cascade's first tier, or None if CASCADE_MODEL_PATH cannot be loaded (everything goes to the transformer)."""
+    global _linear_classifier
+    if _linear_classifier is None:
+        try:
+            from models.fake_news_classifier import LinearFakeNewsClassifier
+            _linear_classifier = LinearFakeNewsClassifier.load(Config.CASCADE_MODEL_PATH)
+            logger.info("Loaded cascade classifier: %s", Config.CASCADE_MODEL_PATH)
+        except Exception as e:
+            logger.warning("Cascade classifier unavailable, using the transformer only. %s", e)
+            _linear_classifier = False
+    return _linear_classifier or None
 
 def get_classifier():
     global _classifier
@@ -33,43 +96,64 @@ def get_classifier():
             _classifier = mock_classifier
     return _classifier
 
-def detect_fake_news(text: str, url: str = ""):
+def detect_fake_news(text: Union[str, Document], url: str = ""):
     """
     Main entry point for AI Engine.
     
     Args:
-        text (str): The content of the news article.
+        text (str | Document): The content of the news article.
         url (str): The source URL (optional, for domain checking).
         
     Returns:
         dict: valid response matching Backend contract.
     """
-    if not text:
+    doc = as_document(text)
+    if not doc.text:
         return {
             "credibility_score": 0,
             "verdict": "Likely Fake",
             "explanation": "No text content provided for analysis.",
             "red_flags": ["Empty content"],
+            "highlights": [],
             "sentiment_analysis": {},
             "timestamp": datetime.utcnow().isoformat()
         }
 
-    # 1. Run Heuristics
-    clickbait_result = detect_clickbait(text.split('\n')[0]) # Assume first line is headline
-    sensationalism_result = analyze_sensationalism(text)
+    # 1. Run Heuristics (all share the one Document: lowercased/split once)
+    clickbait_result = detect_clickbait(doc) # Reads doc.headline, the first line
+    sensationalism_result = analyze_sensationalism(doc)
     source_result = check_source_reliability(url)
     
     # 2. Run ML Classification
-    # We use Zero-Shot to classify text into: "real news", "fake news", "opinion"
-    classifier = get_classifier()
-    labels = ["real news", "fake news", "subjective opinion"]
-    
-    # Truncate text for model if too long (BART limit is usually 1024 tokens)
-    # We take the first 1000 chars roughly to be safe and fast
-    truncated_text = text[:1500] 
-    
-    ml_result = classifier(truncated_text, candidate_labels=labels)
-    scores = dict(zip(ml_result['labels'], ml_result['scores']))
+    # Cascade (CASCADE_ENABLED): the linear model decides the easy calls on its own
+    scores = None
+    tier = "transformer"
+    linear = get_linear_classifier() if Config.CASCADE_ENABLED else None
+    if linear is not None:
+        start = time.perf_counter()
+        linear_fake = linear.predict_one(doc)
+        linear_seconds = time.perf_counter() - start
+        low, high = Config.CASCADE_UNCERTAINTY_BAND
+        if not low < linear_fake < high:
+            tier = "linear"
+            # The linear model has no opinion class
+            scores = {"fake news": linear_fake, "real news": 1.0 - linear_fake, "subjective opinion": 0.0}
+            cascade_stats.record(False, linear_seconds)
+
+    if scores is None:
+        # We use Zero-Shot to classify text into: "real news", "fake news", "opinion"
+        classifier = get_classifier()
+        labels = ["real news", "fake news", "subjective opinion"]
+        
+        # Truncate text for model if too long (BART limit is usually 1024 tokens)
+        # We take the first 1000 chars roughly to be safe and fast
+        truncated_text = doc.text[:1500] 
+        
+        start = time.perf_counter()
+        ml_result = classifier(truncated_text, candidate_labels=labels)
+        scores = dict(zip(ml_result['labels'], ml_result['scores']))
+        if linear is not None:
+            cascade_stats.record(True, linear_seconds, time.perf_counter() - start)
     
     fake_confidence = scores.get("fake news", 0.0)
     real_confidence = scores.get("real news", 0.0)
@@ -127,9 +211,12 @@ def detect_fake_news(text: str, url: str = ""):
         "explanation": " ".join(explanation_parts),
         "sentiment_analysis": sensationalism_result['sentiment'],
         "red_flags": red_flags,
+        # Character offsets of the suspicious phrases, for inline highlighting
+        "highlights": highlight_suspicious(doc, limit=Config.MAX_HIGHLIGHTS),
         "ml_breakdown": {
             "fake_prob": round(fake_confidence, 2),
             "real_prob": round(real_confidence, 2),
-            "opinion_prob": round(opinion_confidence, 2)
+            "opinion_prob": round(opinion_confidence, 2),
+            "tier": tier
         }
     }
@@ -0,0 +1,74 @@
+import re
+from typing import List, Union
+
+# Lowercase word tokens; apostrophes inside a word are kept ("won't")
+_TOKEN_RE = re.compile(r"\w+(?:['’]\w+)*")
+_HASHTAG_RE = re.compile(r"#\w+")
+
+
+def clean_text(text: str) -> str:
+    """
+    Drops non-ASCII characters and hashtags and collapses whitespace: one
+    regex pass plus C-level encode/split, with the same result as the three
+    re.sub passes (non-ASCII, hashtags, whitespace) it replaces.
+    """
+    text = text.encode("ascii", "ignore").decode("ascii")
+    return " ".join(_HASHTAG_RE.sub("", text).split())
+
+
+class Document:
+    """
+    One input text, with the views the heuristics need computed once and
+    cached: lowercase text, word tokens and headline (first line).
+    Everything is lazy, so a heuristic only pays for what it reads.
+
+        doc = Document(text)
+        detect_clickbait(doc)            # reads doc.headline
+        check_reliability_patterns(doc)  # reads doc.lower
+    """
+    __slots__ = ("text", "_lower", "_tokens", "_token_set", "_headline")
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self._lower = None
+        self._tokens = None
+        self._token_set = None
+        self._headline = None
+
+    def __len__(self):
+        return len(self.text)
+
+    def __repr__(self):
+        return f"Document({self.text[:40]!r}{'...' if len(self.text) > 40 else ''})"
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def tokens(self) -> List[str]:
+        """Lowercase word tokens, in order."""
+        if self._tokens is None:
+            self._tokens = _TOKEN_RE.findall(self.lower)
+        return self._tokens
+
+    @property
+    def token_set(self) -> frozenset:
+        if self._token_set is None:
+            self._token_set = frozenset(self.tokens)
+        return self._token_set
+
+    @property
+    def headline(self) -> "Document":
+        """The first line (by convention the headline), itself a Document; self for one-line texts."""
+        if self._headline is None:
+            end = self.text.find("\n")
+            self._headline = self if end == -1 else Document(self.text[:end])
+        return self._headline
+
+
+def as_document(text: Union[str, Document]) -> Document:
+    """Lets the heuristics accept either a raw string or an already built Document."""
+    return text if isinstance(text, Document) else Document(text)
@@ -0,0 +1,25 @@
+import unittest
+from explainability.highlight_suspicious import highlight_stream, highlight_suspicious
+
+
+class TestHighlightSuspicious(unittest.TestCase):
+    def test_offsets_match_text(self):
+        text = "SHOCKING: experts claim a miracle cure!!"
+        for span in highlight_suspicious(text):
+            self.assertEqual(text[span["start"]:span["end"]], span["text"])
+
+    def test_case_fold_variants(self):
+        # IGNORECASE matches "ſ" (long s) as "s"; the phrase lookup used to raise KeyError
+        spans = highlight_suspicious("This is ſhocking news")
+        self.assertEqual([(s["text"], s["category"]) for s in spans], [("ſhocking", "clickbait")])
+        # Folds that casefold() maps elsewhere ("ı") are skipped, not an error
+        highlight_suspicious("A mıracle, İ say")
+
+    def test_stream_matches_one_shot(self):
+        text = "You won't believe this ſecret. BREAKING NEWS?! Allegedly exposed. " * 20
+        chunks = [text[i:i + 37] for i in range(0, len(text), 37)]
+        self.assertEqual(list(highlight_stream(chunks)), highlight_suspicious(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
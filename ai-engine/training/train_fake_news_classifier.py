@@ -0,0 +1,176 @@
+"""
+Trains the cascade's first tier (models/fake_news_classifier.py): logistic
+regression over hashed word and char n-grams, on a labeled JSONL/CSV corpus
+(same format as scripts/evaluate.py: `text` and `label` columns, real/fake
+labels; other labels are skipped).
+
+Reports held-out accuracy / AUC, and for each uncertainty band the share of
+texts that would be escalated to the zero-shot model, the accuracy on the
+rest and the expected classification throughput gain.
+
+    python training/train_fake_news_classifier.py data/labeled.jsonl
+    python training/train_fake_news_classifier.py data/labeled.jsonl --time-transformer 50
+    python training/train_fake_news_classifier.py data/labeled.jsonl --out /tmp/model.npz --C 2
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+# Ensure we can import from local directories (ai-engine folder)
+ENGINE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ENGINE_DIR)
+
+import numpy as np
+from config.config import Config
+from models.fake_news_classifier import DEFAULT_FEATURES, LinearFakeNewsClassifier, featurize, make_vectorizers
+from pipelines.preprocessing import Document
+
+REAL_LABELS = {"real", "true", "reliable", "legit", "1"}
+FAKE_LABELS = {"fake", "false", "likely fake", "hoax", "0"}
+
+
+def read_dataset(path: str):
+    """(texts, y) with y = 1 for fake, 0 for real."""
+    texts, y = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if path.lower().endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            label = str(row.get("label", "")).strip().lower()
+            text = row.get("text") or ""
+            if not text or (label not in REAL_LABELS and label not in FAKE_LABELS):
+                continue
+            texts.append(text)
+            y.append(1 if label in FAKE_LABELS else 0)
+    return texts, np.array(y)
+
+
+def time_per_doc(fn, docs: list) -> float:
+    """Seconds per document (best of 3 passes)."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best / len(docs)
+
+
+def transformer_seconds(docs: list) -> float:
+    """Measured zero-shot cost per document, or None if the model is unavailable here."""
+    from pipelines import detector
+    if detector.pipeline is None:
+        return None
+    classifier = detector.get_classifier()
+    if getattr(classifier, "__name__", "") == "mock_classifier":
+        return None
+    labels = ["real news", "fake news", "subjective opinion"]
+    classifier(docs[0].text[:1500], candidate_labels=labels) # Warm up
+    start = time.perf_counter()
+    for doc in docs:
+        classifier(doc.text[:1500], candidate_labels=labels)
+    return (time.perf_counter() - start) / len(docs)
+
+
+def band_report(proba: np.ndarray, y: np.ndarray, linear_s: float, transformer_s: float) -> list:
+    """Escalation share, accuracy of the non-escalated part and throughput gain per band."""
+    rows = []
+    for width in (0.1, 0.2, 0.3, 0.4, 0.5):
+        low, high = 0.5 - width / 2, 0.5 + width / 2
+        escalated = (proba > low) & (proba < high)
+        kept = ~escalated
+        accuracy = float(((proba[kept] >= 0.5) == y[kept]).mean()) if kept.any() else None
+        share = float(escalated.mean())
+        # Every text pays the linear tier, escalated ones the transformer too
+        gain = transformer_s / (linear_s + share * transformer_s) if transformer_s else None
+        rows.append({"band": [round(low, 3), round(high, 3)], "escalated": round(share, 4),
+                     "accuracy_not_escalated": round(accuracy, 4) if accuracy is not None else None,
+                     "throughput_gain": round(gain, 1) if gain else None})
+    return rows
+
+
+def main(args):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+
+    # 1. Data, seeded split
+    texts, y = read_dataset(args.dataset)
+    if len(set(y.tolist())) < 2:
+        sys.exit("Need both real and fake examples")
+    order = list(range(len(texts)))
+    random.Random(args.seed).shuffle(order)
+    n_val = max(1, int(len(order) * args.val_split))
+    val_idx, train_idx = order[:n_val], order[n_val:]
+    docs = [Document(text) for text in texts]
+    print(f"{len(train_idx)} training / {len(val_idx)} validation texts ({int(y.sum())} fake, {int(len(y) - y.sum())} real)")
+
+    # 2. Fit
+    features = dict(DEFAULT_FEATURES, word_bits=args.word_bits, char_bits=args.char_bits)
+    vectorizers = make_vectorizers(features)
+    X_train = featurize([docs[i] for i in train_idx], vectorizers, features["max_chars"])
+    start = time.perf_counter()
+    model = LogisticRegression(C=args.C, solver="liblinear", max_iter=1000)
+    model.fit(X_train, y[train_idx])
+    print(f"Trained in {time.perf_counter() - start:.1f}s on {X_train.shape[1]} hashed features")
+
+    classifier = LinearFakeNewsClassifier(model.coef_[0], model.intercept_[0], features)
+    val_docs = [docs[i] for i in val_idx]
+    y_val = y[val_idx]
+
+    # 3. Held-out quality, measured through the serialized (float16) weights actually shipped
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    classifier.meta = {"trained_on": os.path.basename(args.dataset), "train_size": len(train_idx), "C": args.C}
+    classifier.save(args.out)
+    classifier = LinearFakeNewsClassifier.load(args.out)
+    proba = classifier.predict_proba(val_docs)
+    accuracy = float(((proba >= 0.5) == y_val).mean())
+    auc = float(roc_auc_score(y_val, proba)) if len(set(y_val.tolist())) == 2 else None
+
+    # 4. Cost per document: linear tier vs transformer
+    linear_s = time_per_doc(classifier.predict_one, val_docs[:200])
+    transformer_s = transformer_seconds(val_docs[:args.time_transformer]) if args.time_transformer else None
+    if transformer_s is None and args.transformer_ms:
+        transformer_s = args.transformer_ms / 1000
+
+    report = {
+        "model": os.path.abspath(args.out),
+        "size_bytes": os.path.getsize(args.out),
+        "nonzero_weights": int(np.count_nonzero(classifier.coef)),
+        "val_accuracy": round(accuracy, 4),
+        "val_auc": round(auc, 4) if auc is not None else None,
+        "linear_ms_per_doc": round(linear_s * 1000, 3),
+        "transformer_ms_per_doc": round(transformer_s * 1000, 1) if transformer_s else None,
+        "bands": band_report(proba, y_val, linear_s, transformer_s),
+    }
+    print(f"Saved {report['model']} ({report['size_bytes'] / 1024:.0f} KiB, {report['nonzero_weights']} non-zero weights)")
+    print(f"Validation accuracy {report['val_accuracy']}  AUC {report['val_auc']}")
+    print(f"Linear tier {report['linear_ms_per_doc']} ms/doc, transformer {report['transformer_ms_per_doc'] or 'n/a (see --time-transformer / --transformer-ms)'} ms/doc")
+    print(f"\n{'band':>14} {'escalated':>10} {'acc. kept':>10} {'gain':>7}")
+    configured = [round(b, 3) for b in Config.CASCADE_UNCERTAINTY_BAND]
+    for row in report["bands"]:
+        marker = "  <- Config.CASCADE_UNCERTAINTY_BAND" if row["band"] == configured else ""
+        print(f"{str(row['band']):>14} {row['escalated']:>10.1%} {str(row['accuracy_not_escalated']):>10} "
+              f"{(str(row['throughput_gain']) + 'x') if row['throughput_gain'] else 'n/a':>7}{marker}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the cascade's linear fake news classifier.")
+    parser.add_argument("dataset", help="JSONL or CSV with text and label (real/fake)")
+    parser.add_argument("--out", default=Config.CASCADE_MODEL_PATH, help="Where to write the .npz model")
+    parser.add_argument("--C", type=float, default=4.0, help="Inverse L2 regularization strength")
+    parser.add_argument("--word-bits", type=int, default=DEFAULT_FEATURES["word_bits"], help="log2 of the word n-gram buckets")
+    parser.add_argument("--char-bits", type=int, default=DEFAULT_FEATURES["char_bits"], help="log2 of the char n-gram buckets")
+    parser.add_argument("--val-split", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--time-transformer", type=int, default=0, metavar="N",
+                        help="Time the zero-shot model on N validation texts to compute the throughput gain")
+    parser.add_argument("--transformer-ms", type=float, help="Assumed zero-shot cost per text when it is not timed here")
+    parser.add_argument("--json", help="Also write the report to this file")
+    main(parser.parse_args())
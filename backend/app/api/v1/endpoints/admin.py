@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from app.core import security
+from app.core.memory import memory_registry
+from app.core.profiling import profile_store
+
+router = APIRouter()
+
+@router.get("/profiles")
+async def list_profiles(limit: int = 50, admin: dict = Depends(security.require_admin)):
+    """
+    Recent request profiles (newest first), see PROFILING_ENABLED.
+    """
+    profiles = await run_in_threadpool(profile_store.list)
+    return profiles[:limit]
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, admin: dict = Depends(security.require_admin)):
+    """
+    Collapsed stacks of one profile; open in speedscope or render with flamegraph.pl.
+    """
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
+
+@router.get("/memory")
+async def memory_report(admin: dict = Depends(security.require_admin)):
+    """
+    RSS, budget, model parameter memory and the size of every registered cache.
+    """
+    return await run_in_threadpool(memory_registry.report)
+
+@router.post("/memory/snapshot")
+async def memory_snapshot(limit: int = 25, key_type: str = "lineno", admin: dict = Depends(security.require_admin)):
+    """
+    Top allocation sites (tracemalloc). The first call starts tracing; take a
+    second one after some traffic to see what grew.
+    """
+    if key_type not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="key_type must be lineno, filename or traceback")
+    return await run_in_threadpool(memory_registry.snapshot, limit, key_type)
+
+@router.delete("/memory/snapshot")
+async def stop_memory_tracing(admin: dict = Depends(security.require_admin)):
+    """
+    Stops tracemalloc (it slows down every allocation while it runs).
+    """
+    memory_registry.stop_tracing()
+    return {"tracing": False}
+
+@router.post("/memory/enforce")
+async def enforce_memory_budget(admin: dict = Depends(security.require_admin)):
+    """
+    Runs the budget check now instead of waiting for the watchdog.
+    """
+    evicted = await run_in_threadpool(memory_registry.enforce_budget)
+    return {"evicted": evicted, "report": await run_in_threadpool(memory_registry.report)}
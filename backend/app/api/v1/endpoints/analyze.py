@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
 from app.core import security
+from app.core.config import settings
+from app.core.rate_limit import analysis_slots
+from app.core.metrics import span
 from app.schemas.analysis import AnalysisRequest, AnalysisResponse
 from app.services import analysis_service
 from app.db.mongodb import get_database
 from app.models.analysis import AnalysisDBModel
+from app.services.notification_service import notification_service
+from app.services.history_service import history_service
+from app.services.persistence_service import interest_update_pipeline, write_behind
+from app.utils.helpers import counter_key
 from motor.motor_asyncio import AsyncIOMotorClient
 
 router = APIRouter()
@@ -12,6 +21,7 @@ router = APIRouter()
 
 async def analyze_content(
     request: AnalysisRequest,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(security.get_current_user), # Require Auth to save history
     db: AsyncIOMotorClient = Depends(get_database)
 ):
@@ -21,7 +31,17 @@ async def analyze_content(
     """
     try:
         request.validate_input()
-        result = await analysis_service.perform_analysis(request.text, request.url)
+        defer_report = settings.DEFER_LLM_REPORT if request.defer_report is None else request.defer_report
+        
+        scored = None
+        # Global cap on concurrent pipelines: sheds load with 503 + Retry-After when saturated
+        async with analysis_slots.slot():
+            if defer_report:
+                # Respond with the deterministic score now, the Groq report is attached later
+                scored = await analysis_service.score_content(request.text, request.url)
+                result = analysis_service.build_result(scored, None, pending=True)
+            else:
+                result = await analysis_service.perform_analysis(request.text, request.url)
         
         # Save to Database
         analysis_doc = AnalysisDBModel(
@@ -32,54 +52,79 @@ async def analyze_content(
             input_type="url" if request.url else "text",
             verdict=result["verdict"],
             credibility_score=result["credibility_score"],
-            ai_raw_data=result,
-            category=result.get("category", "Others") # Save Category
+            **history_service.pack_ai_raw_data(result),
+            category=result.get("category", "Others"), # Save Category
+            explanation_pending=result.get("explanation_pending", False)
         )
         
         doc = analysis_doc.dict(by_alias=True)
-        if "_id" in doc and doc["_id"] is None:
-            del doc["_id"]
-        
-        await db["analysis_history"].insert_one(doc)
+        for field in ("ai_raw_data", "ai_raw_data_z"):
+            if field in doc and doc[field] is None:
+                del doc[field]
+        # Assign the id here so it can be returned before the write reaches Mongo
+        doc["_id"] = ObjectId()
+        result["analysis_id"] = str(doc["_id"])
 
         # Optimization: Update User Interests Collection (aggregated stats)
-        category = result.get("category", "Others")
+        category = counter_key(result.get("category", "Others"))
+        verdict = counter_key(result["verdict"])
         cred_score = result.get("credibility_score", 0)
         
-        # Streak Logic calculation
-        user_interest = await db["users_interests"].find_one({"user_id": current_user["uid"]})
-        new_streak = 1
-        if user_interest and "last_updated" in user_interest:
-            from datetime import datetime, timedelta
-            last_date = user_interest["last_updated"].date() if isinstance(user_interest["last_updated"], datetime) else datetime.fromisoformat(str(user_interest["last_updated"])).date()
-            today = datetime.utcnow().date()
-            
-            if last_date == today:
-                new_streak = user_interest.get("streak", 1)
-            elif last_date == today - timedelta(days=1):
-                new_streak = user_interest.get("streak", 0) + 1
-            else:
-                new_streak = 1
-
-        await db["users_interests"].update_one(
-            {"user_id": current_user["uid"]},
-            {
-                "$inc": {
-                    f"interests.{category}": 1, 
-                    "total_checks": 1,
-                    "total_credibility_score": cred_score
-                },
-                "$set": {
-                    "last_updated": doc["created_at"],
-                    "streak": new_streak
-                },
-                "$setOnInsert": {"user_id": current_user["uid"]}
-            },
-            upsert=True
-        )
+        # Queued on the write-behind stage (or executed directly when it is disabled).
+        # Counters and streak are one atomic pipeline update, no read of users_interests.
+        with span("db_write"):
+            await write_behind.write(db, "analysis_history", InsertOne(doc))
+            await write_behind.write(db, "users_interests", UpdateOne(
+                {"user_id": current_user["uid"]},
+                interest_update_pipeline(current_user["uid"], category, verdict, cred_score, doc["created_at"]),
+                upsert=True
+            ))
+        
+        if scored is not None:
+            background_tasks.add_task(
+                analysis_service.attach_llm_report,
+                db, doc["_id"], current_user["uid"], scored, dict(result)
+            )
         
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
          raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{analysis_id}", response_model=AnalysisResponse)
+async def get_analysis(
+    analysis_id: str,
+    wait: float = 0,
+    current_user: dict = Depends(security.get_current_user),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    """
+    Fetch a stored analysis result. Used to pick up a deferred LLM report:
+    pass `wait` (seconds) to long-poll until the report is attached.
+    """
+    # Read-your-writes: the insert (or the report patch) may still be queued
+    await write_behind.sync()
+    item = await history_service.get_analysis(db, current_user["uid"], analysis_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    if item.get("explanation_pending") and wait > 0:
+        async def report_attached() -> bool:
+            # The report may have landed between the read above and the waiter's registration,
+            # or on another worker (whose notify() does not reach this one)
+            current = await history_service.get_analysis(db, current_user["uid"], analysis_id)
+            return not (current or {}).get("explanation_pending")
+
+        await notification_service.wait_for(
+            analysis_id, min(wait, settings.REPORT_WAIT_MAX_SECONDS),
+            ready=report_attached, poll_interval=settings.REPORT_POLL_INTERVAL_SECONDS
+        )
+        item = await history_service.get_analysis(db, current_user["uid"], analysis_id)
+    
+    result = item["ai_raw_data"]
+    result["analysis_id"] = analysis_id
+    result["explanation_pending"] = item.get("explanation_pending", False)
+    return result
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 from app.core import security
+from app.core.token_cache import token_cache
 
 router = APIRouter()
 
@@ -9,3 +10,10 @@ def read_users_me(current_user: dict = Depends(security.get_current_user)):
     Fetch the current logged-in user details.
     """
     return current_user
+
+@router.get("/verification-stats")
+def read_verification_stats(current_user: dict = Depends(security.get_current_user)):
+    """
+    ID token cache hit rate and full-verification latency (this worker).
+    """
+    return token_cache.stats()
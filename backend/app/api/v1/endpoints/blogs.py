@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from typing import List, Optional, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.db.mongodb import get_database
 from app.core import security
+from app.core.config import settings
+from app.services.blog_service import (
+    like_id, like_toggle_pipeline, post_like_pipeline, migrate_embedded_comments, migrate_embedded_likes,
+    reconcile_likes
+)
+from app.services.feed_cache import feed_cache
+from app.utils.helpers import etag_matches, fetch_page
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -17,6 +28,7 @@ class AuthorInfo(BaseModel):
     photo_url: Optional[str] = ""
 
 class Comment(BaseModel):
+    id: Optional[str] = None
     user_id: str
     username: Optional[str] = "Anonymous"
     content: str
@@ -33,8 +45,10 @@ class BlogPostDB(BlogPostCreate):
     author: AuthorInfo
     created_at: datetime
     likes: int = 0
-    liked_by: List[str] = []
-    comments: List[Comment] = []
+    liked_by: List[str] = [] # Preview: most recent likers
+    liked: Optional[bool] = None # Whether the requesting user likes the post (when known)
+    comments: List[Comment] = [] # Preview: latest comments, full thread via GET /{post_id}/comments
+    comment_count: int = 0
     
     class Config:
         populate_by_name = True
@@ -43,40 +57,97 @@ class BlogPostDB(BlogPostCreate):
 class CreateCommentRequest(BaseModel):
     content: str
 
+def _post_query(post_id: str) -> dict:
+    return {"_id": ObjectId(post_id)} if ObjectId.is_valid(post_id) else {"_id": post_id}
+
+def _normalize_post(p: dict) -> dict:
+    """Maps a post document (any layout) to the BlogPostDB shape."""
+    p["_id"] = str(p["_id"])
+    p["id"] = p["_id"]
+    
+    if "author_id" in p and "author" not in p:
+        p["author"] = {
+            "uid": p["author_id"],
+            "name": p.get("author_name") or "Anonymous",
+            "photo_url": p.get("photo_url") or ""
+        }
+    
+    if "comments" not in p or p["comments"] is None:
+        p["comments"] = []
+    
+    # Not yet migrated: the preview undercounts until scripts/migrate_blog_posts.py runs
+    if "comment_count" not in p:
+        p["comment_count"] = len(p["comments"])
+    
+    if "liked_by" not in p or p["liked_by"] is None:
+        p["liked_by"] = []
+        
+    # Handle username null in comments
+    for c in p["comments"]:
+        if not c.get("username"):
+            c["username"] = "Anonymous"
+    return p
+
 # --- Endpoints ---
 
 @router.get("", response_model=List[BlogPostDB])
-async def get_posts(db: AsyncIOMotorClient = Depends(get_database)):
-    """Get all community posts."""
-    try:
-        posts = await db["posts"].find().sort("created_at", -1).to_list(100)
-        results = []
+async def get_posts(
+    request: Request,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: Optional[dict] = Depends(security.get_optional_user),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    """
+    Get community posts, newest first. Page with the `X-Next-Cursor` header.
+    Served from the feed cache with a strong ETag; send If-None-Match to get a 304.
+    """
+    async def build():
+        # $slice keeps not-yet-migrated posts with embedded threads/likers down to the preview
+        posts, next_cursor = await fetch_page(
+            db["posts"], {}, limit, cursor,
+            {"comments": {"$slice": -settings.COMMENT_PREVIEW_SIZE}, "liked_by": {"$slice": -settings.LIKED_BY_PREVIEW_SIZE}}
+        )
+        results, legacy_likers = [], {}
         for p in posts:
-            p["_id"] = str(p["_id"])
-            p["id"] = p["_id"]
-            
-            if "author_id" in p and "author" not in p:
-                p["author"] = {
-                    "uid": p["author_id"],
-                    "name": p.get("author_name") or "Anonymous",
-                    "photo_url": p.get("photo_url") or ""
-                }
-            
-            if "comments" not in p or p["comments"] is None:
-                p["comments"] = []
-            
-            if "liked_by" not in p:
-                p["liked_by"] = []
-                
-            # Handle username null in comments
-            for c in p["comments"]:
-                if not c.get("username"):
-                    c["username"] = "Anonymous"
-            
-            results.append(p)
-        return results
+            p = _normalize_post(p)
+            if not p.get("likes_migrated"):
+                legacy_likers[p["_id"]] = p["liked_by"]
+            results.append(BlogPostDB.model_validate(p).model_dump(mode="json", by_alias=True))
+        return {"posts": results, "next_cursor": next_cursor, "legacy_likers": legacy_likers}
+
+    async def lookup_likes(post_ids):
+        # The viewer's likes for this page, in one indexed query
+        likes = db["post_likes"].find(
+            {"user_id": current_user["uid"], "post_id": {"$in": post_ids}, "liked": True},
+            {"_id": 0, "post_id": 1}
+        )
+        return {like["post_id"] async for like in likes}
+
+    try:
+        page = await feed_cache.get_page(limit, cursor, build)
+        
+        headers = {"Cache-Control": "no-cache", "Vary": "Authorization"}
+        if page["next_cursor"]:
+            headers["X-Next-Cursor"] = page["next_cursor"]
+        
+        liked = None
+        if current_user:
+            liked = await feed_cache.viewer_likes(page, current_user["uid"], lookup_likes)
+            headers["Cache-Control"] = "private, no-cache"
+            headers["ETag"] = feed_cache.viewer_etag(page, liked)
+        else:
+            headers["ETag"] = page["etag"]
+        
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        
+        body = feed_cache.viewer_body(page, liked) if liked is not None else page["body"]
+        return Response(content=body, media_type="application/json", headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Error fetching posts: {e}")
+        logger.exception("Fetching posts failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("", response_model=BlogPostDB)
@@ -100,15 +171,19 @@ async def create_post(
             "created_at": datetime.utcnow(),
             "likes": 0,
             "liked_by": [],
-            "comments": []
+            "likes_migrated": True,
+            "comments": [],
+            "comment_count": 0,
+            "comments_migrated": True
         }
         
         result = await db["posts"].insert_one(new_post)
+        await feed_cache.invalidate()
         new_post["_id"] = str(result.inserted_id)
         new_post["id"] = new_post["_id"]
         return new_post
     except Exception as e:
-        print(f"Error creating post: {e}")
+        logger.exception("Creating post failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{post_id}/comments", response_model=BlogPostDB)
@@ -120,47 +195,113 @@ async def add_comment(
 ):
     """Add a comment to a post."""
     try:
-        query = {"_id": ObjectId(post_id)} if ObjectId.is_valid(post_id) else {"_id": post_id}
-            
+        query = _post_query(post_id)
+        comment_id = ObjectId()
         new_comment = {
+            "id": str(comment_id),
             "user_id": current_user["uid"],
             "username": current_user.get("name") or "Anonymous",
             "content": comment.content,
             "created_at": datetime.utcnow()
         }
+        update = {
+            # Keep only the latest comments embedded as a preview
+            "$push": {"comments": {"$each": [new_comment], "$slice": -settings.COMMENT_PREVIEW_SIZE}},
+            "$inc": {"comment_count": 1}
+        }
         
-        result = await db["posts"].update_one(
-            query,
-            {"$push": {"comments": new_comment}}
+        # 1. One round trip: update the post and get it back
+        updated_post = await db["posts"].find_one_and_update(
+            {**query, "comments_migrated": True}, update, return_document=ReturnDocument.AFTER
         )
+        if updated_post is None:
+            # 2. Missing, or a legacy post whose embedded thread has to move first
+            post = await db["posts"].find_one(query, {"comments": 1, "comments_migrated": 1})
+            if not post:
+                raise HTTPException(status_code=404, detail="Post not found")
+            await migrate_embedded_comments(db, post)
+            updated_post = await db["posts"].find_one_and_update(
+                {**query, "comments_migrated": True}, update, return_document=ReturnDocument.AFTER
+            )
+            if updated_post is None:
+                raise HTTPException(status_code=409, detail="Post is being updated, please retry")
         
-        if result.modified_count == 0:
-             raise HTTPException(status_code=404, detail="Post not found")
-             
-        updated_post = await db["posts"].find_one(query)
-        updated_post["_id"] = str(updated_post["_id"])
-        updated_post["id"] = updated_post["_id"]
-        
-        if "author_id" in updated_post and "author" not in updated_post:
-             updated_post["author"] = {
-                "uid": updated_post["author_id"],
-                "name": updated_post.get("author_name") or "Anonymous",
-                "photo_url": ""
-            }
-        
-        if "liked_by" not in updated_post:
-            updated_post["liked_by"] = []
+        # 3. Full thread entry (same id as the preview entry)
+        thread_comment = {k: v for k, v in new_comment.items() if k != "id"}
+        await db["comments"].insert_one({"_id": comment_id, **thread_comment, "post_id": str(updated_post["_id"])})
+        await feed_cache.invalidate()
+                
+        return _normalize_post(updated_post)
+    except Exception as e:
+        logger.exception("Adding comment failed")
+        if isinstance(e, HTTPException): raise e
+        raise HTTPException(status_code=500, detail=str(e))
 
-        for c in updated_post.get("comments", []):
+@router.get("/{post_id}/comments", response_model=List[Comment])
+async def get_comments(
+    post_id: str,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    """Get a post's comments, newest first. Page with the `X-Next-Cursor` header."""
+    try:
+        comments, next_cursor = await fetch_page(db["comments"], {"post_id": post_id}, limit, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        
+        for c in comments:
+            c["id"] = str(c.pop("_id"))
             if not c.get("username"):
                 c["username"] = "Anonymous"
-                
-        return updated_post
+        return comments
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Error adding comment: {e}")
-        if isinstance(e, HTTPException): raise e
+        logger.exception("Fetching comments failed")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _toggle_like(db, query: dict, post_key: str, uid: str):
+    """
+    Flips the like record, then applies it to the post. Both steps are single
+    atomic find_one_and_update calls, so concurrent toggles cannot double count.
+    They are not one transaction: if the second step fails (or finds a counter
+    an earlier interrupted toggle left negative), the post is recounted from
+    post_likes. Returns the updated post, or None if the post is missing or not migrated.
+    """
+    like = await db["post_likes"].find_one_and_update(
+        {"_id": like_id(post_key, uid)},
+        like_toggle_pipeline(post_key, uid, datetime.utcnow()),
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    try:
+        updated_post = await db["posts"].find_one_and_update(
+            {**query, "likes_migrated": True},
+            post_like_pipeline(uid, like["liked"]),
+            return_document=ReturnDocument.AFTER
+        )
+    except Exception:
+        logger.exception("Applying a like to post %s failed, recounting from post_likes", post_key)
+        updated_post = await reconcile_likes(db, query, post_key)
+        if updated_post is None:
+            raise
+    else:
+        if updated_post is not None and updated_post.get("likes", 0) < 0:
+            logger.warning("Like counter of post %s drifted, recounting from post_likes", post_key)
+            updated_post = await reconcile_likes(db, query, post_key)
+    if updated_post is None:
+        # Undo the flip; the caller migrates (or 404s) and retries. Before migration
+        # a like record can only come from migrate_embedded_likes (liked) or not exist.
+        if like["liked"]:
+            await db["post_likes"].delete_one({"_id": like_id(post_key, uid)})
+        else:
+            await db["post_likes"].update_one({"_id": like_id(post_key, uid)}, {"$set": {"liked": True}})
+        return None
+    updated_post["liked"] = like["liked"]
+    return updated_post
+
 @router.post("/{post_id}/like", response_model=BlogPostDB)
 async def like_post(
     post_id: str,
@@ -169,51 +310,23 @@ async def like_post(
 ):
     """Toggle like for a post (unique per user)."""
     uid = current_user["uid"]
-    query = {"_id": ObjectId(post_id)} if ObjectId.is_valid(post_id) else {"_id": post_id}
+    query = _post_query(post_id)
     
     try:
-        # Check if user already liked
-        post = await db["posts"].find_one(query)
-        if not post:
-             raise HTTPException(status_code=404, detail="Post not found")
-             
-        liked_by = post.get("liked_by", [])
-        
-        if uid in liked_by:
-            # Unlike
-            await db["posts"].update_one(
-                query,
-                {
-                    "$pull": {"liked_by": uid},
-                    "$inc": {"likes": -1}
-                }
-            )
-        else:
-            # Like
-            await db["posts"].update_one(
-                query,
-                {
-                    "$addToSet": {"liked_by": uid},
-                    "$inc": {"likes": 1}
-                }
-            )
-            
-        updated_post = await db["posts"].find_one(query)
-        updated_post["_id"] = str(updated_post["_id"])
-        updated_post["id"] = updated_post["_id"]
+        updated_post = await _toggle_like(db, query, post_id, uid)
+        if updated_post is None:
+            # Missing, or a legacy post whose liked_by array has to move first
+            post = await db["posts"].find_one(query, {"liked_by": 1, "likes_migrated": 1})
+            if not post:
+                raise HTTPException(status_code=404, detail="Post not found")
+            await migrate_embedded_likes(db, post)
+            updated_post = await _toggle_like(db, query, post_id, uid)
+            if updated_post is None:
+                raise HTTPException(status_code=409, detail="Post is being updated, please retry")
         
-        # Mapping for result
-        if "author_id" in updated_post and "author" not in updated_post:
-             updated_post["author"] = {
-                "uid": updated_post["author_id"],
-                "name": updated_post.get("author_name") or "Anonymous",
-                "photo_url": ""
-            }
-        if "liked_by" not in updated_post:
-            updated_post["liked_by"] = []
-            
-        return updated_post
+        await feed_cache.invalidate()
+        return _normalize_post(updated_post)
     except Exception as e:
-        print(f"Error liking post: {e}")
+        logger.exception("Liking post failed")
         if isinstance(e, HTTPException): raise e
         raise HTTPException(status_code=500, detail=str(e))
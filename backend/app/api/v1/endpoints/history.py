@@ -1,25 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Dict, Any, Optional
 from app.core import security
 from app.db.mongodb import get_database
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.services.history_service import history_service
 from app.services.llm_explainer import llm_explainer
+from app.services.persistence_service import write_behind
+from app.utils.helpers import is_fake_verdict
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Dict[str, Any]])
 async def get_history(
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(security.get_current_user),
     db: AsyncIOMotorClient = Depends(get_database)
 ):
     """
-    Get current user's analysis history.
+    Get current user's analysis history (summary fields), newest first.
+    Use GET /history/{id} for the full record.
+    Pass the `X-Next-Cursor` response header back as `cursor` to get the next page.
     """
     try:
-        history = await history_service.get_user_history(db, current_user["uid"], limit)
+        await write_behind.sync() # Include analyses still queued for writing
+        history, next_cursor = await history_service.get_user_history(db, current_user["uid"], limit, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return history
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -33,8 +47,11 @@ async def get_history_insights(
     Optimized: No real-time LLM calls.
     """
     try:
-        # Fetch pre-calculated stats
-        interest_doc = await db["users_interests"].find_one({"user_id": current_user["uid"]})
+        await write_behind.sync()
+        # Fetch pre-calculated stats (single point read on the user_id index)
+        interest_doc = await db["users_interests"].find_one(
+            {"user_id": current_user["uid"]}, {"_id": 0, "interests": 1, "verdicts": 1, "counters_version": 1}
+        )
         
         if not interest_doc:
              # First time? Fallback to calculating from history list (Migration helper)
@@ -67,13 +84,13 @@ async def get_history_insights(
         if top_topic == "Politics": persona = "The Policy Watcher"
         elif top_topic == "Tech": persona = "The Tech Insider"
         
-        # Fake News Hit Rate (Need to count "Fake" verdicts... wait, 'users_interests' needs to track verdict counts too!)
-        # For now, let's approximate or fetch history count quickly. 
-        # Actually, let's assume 50% for now or add "fake_count" to users_interests in next iteration.
-        # Let's just calculate hit rate from last 20 history items logic or keep it 0 if complex.
-        # Simpler: Just count "Fake" in history for now (it is fast enough for 50 items).
-        
-        fake_count = await db["analysis_history"].count_documents({"user_id": current_user["uid"], "verdict": {"$regex": "Fake|Likely Fake", "$options": "i"}})
+        # Fake News Hit Rate from the verdict counters maintained by /analyze
+        if interest_doc.get("counters_version", 0) >= 1:
+            verdicts_map = interest_doc.get("verdicts", {})
+            fake_count = sum(v for k, v in verdicts_map.items() if is_fake_verdict(k))
+        else:
+            # Not backfilled yet (scripts/backfill_verdict_counters.py)
+            fake_count = await db["analysis_history"].count_documents({"user_id": current_user["uid"], "verdict": {"$regex": "Fake|Likely Fake", "$options": "i"}})
         hit_rate = round((fake_count / calculated_total) * 100) if calculated_total > 0 else 0
 
         return {
@@ -83,6 +100,21 @@ async def get_history_insights(
             "fake_news_hit_rate": hit_rate
         }
         
-    except Exception as e:
-        print(f"Insights Error: {e}")
+    except Exception:
+        logger.exception("Generating insights failed")
         raise HTTPException(status_code=500, detail="Failed to generate insights")
+
+@router.get("/{analysis_id}", response_model=Dict[str, Any])
+async def get_history_item(
+    analysis_id: str,
+    current_user: dict = Depends(security.get_current_user),
+    db: AsyncIOMotorClient = Depends(get_database)
+):
+    """
+    Get the full record (including ai_raw_data) of one analysis.
+    """
+    await write_behind.sync() # Right after /analyze the insert may still be queued
+    item = await history_service.get_analysis(db, current_user["uid"], analysis_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return item
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
 from app.core import security
 from app.db.mongodb import get_database
 from motor.motor_asyncio import AsyncIOMotorClient
+from app.services.leaderboard_service import leaderboard_service
 
 router = APIRouter()
 
@@ -86,9 +87,12 @@ async def get_user_stats(
         avg_accuracy = round(total_score / total_checks) if total_checks > 0 else 0
         streak = interest_doc.get("streak", 0)
         
-        # 4. Rank Calculation (Based on total_checks)
-        higher_rank_count = await db["users_interests"].count_documents({"total_checks": {"$gt": total_checks}})
-        rank = higher_rank_count + 1
+        # 4. Rank Calculation (Based on total_checks) from the materialized leaderboard
+        rank = leaderboard_service.rank_of(total_checks)
+        if rank is None:
+            # Leaderboard not built yet (first seconds after startup)
+            higher_rank_count = await db["users_interests"].count_documents({"total_checks": {"$gt": total_checks}})
+            rank = higher_rank_count + 1
 
     return {
         "topics_shared": topics_shared,
@@ -97,3 +101,19 @@ async def get_user_stats(
         "streak": f"{streak} Days",
         "rank": f"#{rank}"
     }
+
+@router.get("/leaderboard")
+async def get_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    current_user: dict = Depends(security.get_current_user)
+):
+    """
+    Top users by number of checks. Refreshed every LEADERBOARD_REFRESH_SECONDS.
+    """
+    return {
+        "entries": [
+            {k: v for k, v in entry.items() if k != "user_id"}
+            for entry in leaderboard_service.top(limit)
+        ],
+        "refreshed_at": leaderboard_service.refreshed_at
+    }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 from pydantic import AnyHttpUrl, validator
 
 class Settings(BaseSettings):
@@ -20,14 +20,88 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     DB_NAME: str = "fake_news_db"
+    ENSURE_INDEXES_ON_STARTUP: bool = True # See app/db/indexes.py and scripts/init_database.py
+    VERIFY_INDEXES_ON_STARTUP: bool = True # explain() every endpoint query shape, warn on collection scans
+    REDIS_URL: Optional[str] = None # Optional shared tier for multi-worker deployments (pip install redis)
 
     # Security
     GOOGLE_APPLICATION_CREDENTIALS: str = "app/core/firebase_credentials.json"
+    FIREBASE_TOKEN_CACHE_SIZE: int = 10000 # Verified ID tokens kept until their exp (see app/core/token_cache.py)
+    FIREBASE_CHECK_REVOKED: bool = False # Also reject revoked tokens / disabled users (one Firebase call per check)
+    FIREBASE_REVOCATION_CHECK_SECONDS: int = 300 # With FIREBASE_CHECK_REVOKED: max age of a cached revocation check
+    FIREBASE_CERT_PREFETCH: bool = True # Refresh Google's signing certs in the background
     GOOGLE_FACT_CHECK_KEY: str = "" # API Key loaded from .env
     NEWS_API_KEY: str = "" # API Key loaded from .env
     GEMINI_API_KEY: str = "" # API Key loaded from .env
     GROQ_API_KEY: str = "" # API Key loaded from .env
 
+    # Shared text preprocessing lives in the sibling ai-engine (see app/utils/ai_engine.py)
+    AI_ENGINE_DIR: str = "../ai-engine" # Relative paths are resolved from the backend directory
+
+    # Load testing: route Fact Check, NewsAPI, Groq and Google Translate to mock_services/server.py
+    USE_MOCK_SERVICES: bool = False
+    MOCK_SERVICES_URL: str = "http://127.0.0.1:8100"
+    LOAD_TEST_AUTH_SECRET: str = "" # With USE_MOCK_SERVICES: accept "loadtest:<uid>:<secret>" bearer tokens (see load_test/run.py)
+
+    # Analysis
+    PRELOAD_ON_STARTUP: bool = True # Import the analysis dependencies / build the Groq client in the background after startup
+    DEFER_LLM_REPORT: bool = False # Respond with the weighted score first, attach the Groq report in the background
+    COMPRESS_AI_RAW_DATA: bool = False # Store analysis_history.ai_raw_data as zlib-compressed JSON
+    REPORT_WAIT_MAX_SECONDS: float = 25.0 # Upper bound for long-polling a pending report
+    REPORT_POLL_INTERVAL_SECONDS: float = 1.0 # Long-polls re-read the stored state this often (reports finished by another worker)
+
+    # Observability (see app/core/metrics.py and app/core/logging.py; Prometheus scrapes /metrics)
+    SERVER_TIMING_ENABLED: bool = False # Add a Server-Timing header with per-stage durations
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {} # Per-logger overrides, e.g. {"app.services.fact_checker": "DEBUG"}
+    LOG_FORMAT: str = "text" # "text" or "json" (one object per line, for log pipelines)
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1 # Share of requests whose DEBUG records are kept
+    LOG_QUEUE_SIZE: int = 10000 # Records waiting for the writer thread; beyond this they are dropped
+
+    # Request profiling (see app/core/profiling.py); the middleware is only installed when enabled
+    PROFILING_ENABLED: bool = False
+    PROFILING_PATHS: List[str] = ["POST /analyze"]
+    PROFILING_SAMPLE_RATE: float = 0.0 # Share of PROFILING_PATHS requests profiled without the X-Profile header
+    PROFILING_INTERVAL_MS: float = 5.0 # Stack sampling interval
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_PROFILES: int = 50
+    ADMIN_UIDS: List[str] = [] # Firebase uids allowed to use /admin and X-Profile
+
+    # Memory budget (see app/core/memory.py): over it, caches are evicted
+    MEMORY_BUDGET_MB: int = 0 # 0 = MEMORY_BUDGET_FRACTION of the container limit (no limit: off)
+    MEMORY_BUDGET_FRACTION: float = 0.85
+    MEMORY_EVICTION_FRACTION: float = 0.5 # Share of each cache dropped per eviction pass
+    MEMORY_CHECK_INTERVAL_SECONDS: float = 15.0
+    TRACEMALLOC_FRAMES: int = 10 # Traceback depth of on-demand allocation snapshots
+
+    # Rate limiting (see app/core/rate_limit.py); buckets are shared through Redis when REDIS_URL is set
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BURST: int = 60 # Bucket size, in cost units
+    RATE_LIMIT_REFILL_PER_MINUTE: float = 60.0
+    RATE_LIMIT_COSTS: Dict[str, int] = {"POST /analyze": 10, "POST /chat": 3, "POST /translate": 1} # Routes not listed are not limited
+    RATE_LIMIT_TRUST_PROXY: bool = False # Key anonymous callers by X-Forwarded-For (only behind a trusted proxy)
+    ANALYSIS_MAX_CONCURRENCY: int = 16 # Concurrent analysis pipelines per worker
+    ANALYSIS_QUEUE_TIMEOUT_SECONDS: float = 5.0 # Wait for a slot this long, then 503
+
+    # Write-behind persistence for /analyze (see app/services/persistence_service.py)
+    WRITE_BEHIND_ENABLED: bool = True
+    WRITE_BEHIND_BATCH_SIZE: int = 100 # Flush when this many writes are queued...
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: int = 200 # ...or at least this often
+    WRITE_BEHIND_MAX_PENDING: int = 5000 # Requests wait for a flush above this (backpressure)
+    WRITE_BEHIND_MAX_RETRIES: int = 5
+
+    # Community
+    COMMENT_PREVIEW_SIZE: int = 3 # Latest comments embedded in each post; the rest live in "comments"
+    LIKED_BY_PREVIEW_SIZE: int = 20 # Most recent likers kept on each post; all likes live in "post_likes"
+    FEED_CACHE_ENABLED: bool = True # See app/services/feed_cache.py
+    FEED_CACHE_TTL_SECONDS: float = 30.0 # In-process pages; bounds staleness across workers without Redis
+    FEED_CACHE_MAX_PAGES: int = 64
+    FEED_CACHE_SHARED_TTL_SECONDS: int = 5 # Pages shared through Redis (when REDIS_URL is set)
+
+    # Leaderboard (see app/services/leaderboard_service.py)
+    LEADERBOARD_REFRESH_SECONDS: int = 60 # Max staleness of other users' totals in a rank
+    LEADERBOARD_TOP_N: int = 100
+
     class Config:
         case_sensitive = True
         env_file = ".env"
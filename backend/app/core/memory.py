@@ -0,0 +1,240 @@
+import asyncio
+import ctypes
+import gc
+import logging
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Entries measured per cache when estimating its size (the rest is extrapolated)
+SIZE_SAMPLE = 64
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), else the peak from getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def container_limit_bytes() -> Optional[int]:
+    """Memory limit of the cgroup we run in (v2, then v1), None when unlimited."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 2**60: # v1 reports "no limit" as a huge number
+            return int(value)
+        return None
+    return None
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """
+    sys.getsizeof over containers, counting shared objects once. Containers
+    are copied (atomically, under the GIL) before walking them, so this can
+    run in a thread while the event loop mutates the cache.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in list(obj.items()))
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in list(obj))
+    return size
+
+
+def estimate_entries(entries: dict) -> int:
+    """Estimated bytes of a cache's entries, from a random sample of them."""
+    count = len(entries)
+    if count == 0:
+        return sys.getsizeof(entries)
+    items = list(entries.items())
+    sample = items if count <= SIZE_SAMPLE else random.sample(items, SIZE_SAMPLE)
+    sampled = sum(deep_sizeof(item) for item in sample)
+    return sys.getsizeof(entries) + sampled * count // len(sample)
+
+
+def model_parameter_bytes(model) -> Optional[int]:
+    """
+    Parameter + buffer memory of a torch model or a transformers pipeline
+    (duck typed, torch is never imported here). None for other objects.
+    """
+    module = getattr(model, "model", model)
+    if not hasattr(module, "parameters"):
+        return None
+    total = sum(p.numel() * p.element_size() for p in module.parameters())
+    if hasattr(module, "buffers"):
+        total += sum(b.numel() * b.element_size() for b in module.buffers())
+    return total
+
+
+def _malloc_trim():
+    # Hand freed heap pages back to the OS (glibc only), otherwise RSS stays high after eviction
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class MemoryRegistry:
+    """
+    Everything in the process that holds memory on purpose.
+
+    Caches register themselves next to their singleton; a cache provides
+    memory_stats() -> {"entries", "bytes"} and evict(fraction) (drops that
+    share of its entries, least recently used first). Models are registered
+    as callables returning the loaded model (or None while it is not loaded),
+    so registering never forces a load.
+    """
+    def __init__(self):
+        self.caches = {}
+        self.models: Dict[str, Callable] = {}
+        self.evictions = 0
+        self.last_eviction = None
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+
+    def register_cache(self, name: str, cache):
+        self.caches[name] = cache
+
+    def register_model(self, name: str, getter: Callable):
+        self.models[name] = getter
+
+    def budget_bytes(self) -> Optional[int]:
+        """MEMORY_BUDGET_MB, else MEMORY_BUDGET_FRACTION of the container limit, else None (off)."""
+        if settings.MEMORY_BUDGET_MB:
+            return settings.MEMORY_BUDGET_MB * 1024 * 1024
+        limit = container_limit_bytes()
+        return int(limit * settings.MEMORY_BUDGET_FRACTION) if limit else None
+
+    def cache_stats(self) -> Dict[str, dict]:
+        return {name: cache.memory_stats() for name, cache in self.caches.items()}
+
+    def model_stats(self) -> Dict[str, dict]:
+        stats = {}
+        for name, getter in self.models.items():
+            model = getter()
+            stats[name] = {
+                "loaded": model is not None,
+                "parameter_bytes": model_parameter_bytes(model) if model is not None else None,
+            }
+        return stats
+
+    def report(self) -> dict:
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+        return {
+            "rss_bytes": rss_bytes(),
+            "budget_bytes": self.budget_bytes(),
+            "container_limit_bytes": container_limit_bytes(),
+            "models": self.model_stats(),
+            "caches": self.cache_stats(),
+            "gc_objects": len(gc.get_objects()),
+            "evictions": self.evictions,
+            "last_eviction": self.last_eviction,
+            "tracemalloc": {"tracing": traced is not None, "traced_bytes": traced[0] if traced else None,
+                            "peak_bytes": traced[1] if traced else None},
+        }
+
+    def enforce_budget(self) -> bool:
+        """
+        Over budget: evict MEMORY_EVICTION_FRACTION of each cache, biggest
+        first, until RSS is back under it. Returns True if it evicted.
+        """
+        budget = self.budget_bytes()
+        if budget is None:
+            return False
+        before = rss_bytes()
+        if before <= budget:
+            return False
+
+        # 1. Evict, biggest caches first, re-checking RSS after each one
+        stats = self.cache_stats()
+        for name in sorted(stats, key=lambda n: stats[n]["bytes"], reverse=True):
+            self.caches[name].evict(settings.MEMORY_EVICTION_FRACTION)
+            gc.collect()
+            _malloc_trim()
+            if rss_bytes() <= budget:
+                break
+
+        # 2. Record what happened
+        after = rss_bytes()
+        self.evictions += 1
+        self.last_eviction = {"at": time.time(), "rss_before": before, "rss_after": after, "budget": budget}
+        logger.warning(
+            "Memory over budget (%.0f MiB > %.0f MiB): evicted caches, RSS now %.0f MiB",
+            before / 2**20, budget / 2**20, after / 2**20
+        )
+        return True
+
+    def snapshot(self, limit: int = 25, key_type: str = "lineno") -> dict:
+        """
+        Top allocation sites. The first call starts tracemalloc (it slows
+        allocations, so it only runs on demand); later calls also report
+        the growth since the previous snapshot.
+        """
+        with self._snapshot_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(settings.TRACEMALLOC_FRAMES)
+                self._snapshot = None
+                return {"tracing": True, "started": True, "top": [], "growth": []}
+
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            previous, self._snapshot = self._snapshot, snapshot
+
+        def entry(stat, size_diff=None):
+            item = {"site": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+            if size_diff is not None:
+                item["bytes_diff"] = size_diff
+            return item
+
+        top = [entry(stat) for stat in snapshot.statistics(key_type)[:limit]]
+        growth = []
+        if previous is not None:
+            growth = [entry(stat, stat.size_diff) for stat in snapshot.compare_to(previous, key_type)[:limit] if stat.size_diff > 0]
+        return {"tracing": True, "started": False, "top": top, "growth": growth}
+
+    def stop_tracing(self):
+        with self._snapshot_lock:
+            self._snapshot = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+memory_registry = MemoryRegistry()
+
+# The ai-engine detector's model, once something in this process has loaded it
+memory_registry.register_model("fake_news_detector", lambda: getattr(sys.modules.get("pipelines.detector"), "_classifier", None))
+
+
+async def run_memory_watchdog():
+    """Background task: check RSS against the budget every MEMORY_CHECK_INTERVAL_SECONDS."""
+    if memory_registry.budget_bytes() is None:
+        logger.info("No memory budget (MEMORY_BUDGET_MB unset and no container limit); watchdog disabled")
+        return
+    while True:
+        await asyncio.sleep(settings.MEMORY_CHECK_INTERVAL_SECONDS)
+        try:
+            # gc.collect and malloc_trim take a while on a big heap: keep them off the event loop
+            await asyncio.to_thread(memory_registry.enforce_budget)
+        except Exception as e:
+            logger.warning("Memory budget check failed: %s", e)
@@ -0,0 +1,166 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from app.core.config import settings
+
+# Latency buckets (seconds) from cache hits up to slow LLM calls
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "analysis_stage_seconds", "Duration of one pipeline stage (scrape, translate, fact_check, news_api, llm_*, db_*)",
+    ["stage", "outcome"], buckets=_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request duration by route template",
+    ["method", "route", "status"], buckets=_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+# Stage timings of the current request, for the Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+class Span:
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.outcome = "ok" # Callers may set e.g. "http_error" / "skipped"; exceptions set "error"
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Times a block as one pipeline stage:
+
+        with span("fact_check") as s:
+            response = requests.get(...)
+            if response.status_code != 200:
+                s.outcome = "http_error"
+    """
+    s = Span(stage)
+    start = time.perf_counter()
+    try:
+        yield s
+    except BaseException:
+        s.outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage, s.outcome).observe(elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+
+class AppStateCollector:
+    """
+    Exports counters the services already keep (cache hits, queue sizes,
+    shed requests) at scrape time, so the hot paths are not touched.
+    """
+    def collect(self):
+        from app.core.logging import dropped_records
+        from app.core.memory import memory_registry, rss_bytes
+        from app.core.rate_limit import analysis_slots
+        from app.core.token_cache import token_cache
+        from app.services.feed_cache import feed_cache
+        from app.services.persistence_service import write_behind
+
+        feed = CounterMetricFamily("feed_cache_requests", "Community feed page lookups", labels=["result"])
+        feed.add_metric(["hit"], feed_cache.hits)
+        feed.add_metric(["shared_hit"], feed_cache.shared_hits)
+        feed.add_metric(["miss"], feed_cache.misses)
+        yield feed
+        lookups = feed_cache.hits + feed_cache.shared_hits + feed_cache.misses
+        yield GaugeMetricFamily(
+            "feed_cache_hit_ratio", "Share of feed pages served without MongoDB",
+            value=(feed_cache.hits + feed_cache.shared_hits) / lookups if lookups else 0
+        )
+
+        tokens = token_cache.stats()
+        auth = CounterMetricFamily("token_cache_lookups", "Firebase ID token verifications", labels=["result"])
+        auth.add_metric(["hit"], tokens["hits"])
+        auth.add_metric(["miss"], tokens["misses"])
+        auth.add_metric(["failure"], tokens["failures"])
+        yield auth
+        yield GaugeMetricFamily("token_cache_hit_ratio", "Share of token verifications served from cache", value=tokens["hit_rate"] or 0)
+        yield GaugeMetricFamily("token_cache_entries", "Cached verified tokens", value=tokens["entries"])
+
+        yield GaugeMetricFamily("analysis_in_flight", "Analysis pipelines currently running", value=analysis_slots.active)
+        yield CounterMetricFamily("analysis_shed", "Analyses rejected with 503 (concurrency cap)", value=analysis_slots.shed)
+        yield GaugeMetricFamily("write_behind_pending", "Writes queued for the next flush", value=write_behind.pending_count)
+        yield CounterMetricFamily("log_records_dropped", "Log records dropped because the log queue was full", value=dropped_records())
+
+        # Memory (process_resident_memory_bytes comes from the default process collector)
+        budget = memory_registry.budget_bytes()
+        if budget is not None:
+            yield GaugeMetricFamily("memory_budget_bytes", "RSS above which caches are evicted", value=budget)
+            yield GaugeMetricFamily("memory_budget_used_ratio", "RSS / memory budget", value=rss_bytes() / budget)
+        yield CounterMetricFamily("memory_budget_evictions", "Cache evictions triggered by the memory budget", value=memory_registry.evictions)
+        cache_bytes = GaugeMetricFamily("cache_memory_bytes", "Estimated size of an in-process cache", labels=["cache"])
+        cache_entries = GaugeMetricFamily("cache_entries", "Entries in an in-process cache", labels=["cache"])
+        for name, stats in memory_registry.cache_stats().items():
+            cache_bytes.add_metric([name], stats["bytes"])
+            cache_entries.add_metric([name], stats["entries"])
+        yield cache_bytes
+        yield cache_entries
+        models = GaugeMetricFamily("model_parameter_bytes", "Parameter and buffer memory of a loaded model", labels=["model"])
+        for name, stats in memory_registry.model_stats().items():
+            if stats["parameter_bytes"] is not None:
+                models.add_metric([name], stats["parameter_bytes"])
+        yield models
+
+REGISTRY.register(AppStateCollector())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Request duration / in-flight metrics, and (SERVER_TIMING_ENABLED) a
+    Server-Timing header with the stages timed while serving the request.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = []
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    total = (time.perf_counter() - start) * 1000
+                    entries = [f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in timings]
+                    entries.append(f"total;dur={total:.1f}")
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"server-timing", ", ".join(entries).encode())]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            _request_timings.reset(token)
+            HTTP_REQUEST_SECONDS.labels(scope["method"], _route_label(scope), str(status[0])).observe(time.perf_counter() - start)
+
+
+def _route_label(scope) -> str:
+    """
+    Path with its parameters put back as {name} (/api/v1/history/{analysis_id}),
+    so ids do not blow up the label cardinality.
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join("{" + names[part] + "}" if part in names else part for part in scope["path"].split("/"))
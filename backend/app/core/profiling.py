@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.logging import request_id_var
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Leaf frames of a thread that is parked, not working
+_IDLE_FRAMES = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"), ("threading.py", "_wait_for_tstate_lock")}
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    if path.startswith(_BACKEND_DIR):
+        path = os.path.relpath(path, _BACKEND_DIR)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples Python stacks every PROFILING_INTERVAL_MS from a helper thread
+    (sys._current_frames; nothing is traced, the profiled code runs unmodified).
+
+    The event loop thread is only sampled while the profiled request's task
+    is the one running on it, so concurrent requests do not leak in. Busy
+    threadpool threads are sampled as well; they may be working for another
+    request, which matters only under concurrency.
+    """
+    def __init__(self, task: asyncio.Task, interval: float):
+        self.task = task
+        self.loop = task.get_loop()
+        self.loop_thread = threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                if thread_id == self.loop_thread:
+                    if asyncio.current_task(self.loop) is not self.task:
+                        continue
+                    root = "[event loop]"
+                elif (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES:
+                    continue
+                else:
+                    root = "[thread]"
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(root)
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format (flamegraph.pl, speedscope, inferno)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+    Recent profiles on disk (PROFILING_DIR, shared by the workers of a host):
+    <id>.collapsed with the stacks and <id>.json with the request metadata.
+    Keeps the newest PROFILING_MAX_PROFILES.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def save(self, profile_id: str, meta: dict, collapsed: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{profile_id}.collapsed"), "w") as f:
+            f.write(collapsed)
+        with open(os.path.join(self.directory, f"{profile_id}.json"), "w") as f:
+            json.dump(meta, f)
+        for old in self.list()[settings.PROFILING_MAX_PROFILES:]:
+            for ext in ("json", "collapsed"):
+                try:
+                    os.remove(os.path.join(self.directory, f"{old['id']}.{ext}"))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[dict]:
+        """Newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue # Being written or pruned by another worker
+        return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+    def path(self, profile_id: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.collapsed")
+        return path if os.path.exists(path) else None
+
+profile_store = ProfileStore(settings.PROFILING_DIR)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in sampling profiler for PROFILING_PATHS (default: POST /analyze).
+
+    A request is profiled when an admin (ADMIN_UIDS) sends `X-Profile: 1`,
+    or at random with PROFILING_SAMPLE_RATE. The response carries
+    X-Profile-Id; the stacks are listed and downloaded through /admin/profiles.
+    Only installed when PROFILING_ENABLED, so it costs nothing otherwise.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.paths = set()
+        for route in settings.PROFILING_PATHS:
+            method, path = route.split(" ", 1)
+            self.paths.add((method.upper(), (settings.API_V1_STR + path).rstrip("/")))
+
+    async def _admin_requested(self, headers: dict) -> bool:
+        if headers.get(b"x-profile") not in (b"1", b"true"):
+            return False
+        authorization = headers.get(b"authorization", b"").decode()
+        if not authorization.lower().startswith("bearer "):
+            return False
+        from app.core.token_cache import token_cache
+        try:
+            claims = await run_in_threadpool(token_cache.verify, authorization[7:].strip())
+        except Exception:
+            return False
+        return claims["uid"] in settings.ADMIN_UIDS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"].rstrip("/")) not in self.paths:
+            return await self.app(scope, receive, send)
+
+        if await self._admin_requested(dict(scope["headers"])):
+            trigger = "header"
+        elif settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            trigger = "sampled"
+        else:
+            return await self.app(scope, receive, send)
+
+        request_id = request_id_var.get() or "norid"
+        profile_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{request_id}"[:128]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = StackSampler(asyncio.current_task(), settings.PROFILING_INTERVAL_MS / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            meta = {
+                "id": profile_id,
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status[0],
+                "trigger": trigger,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "samples": sampler.samples,
+                "interval_ms": settings.PROFILING_INTERVAL_MS,
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            try:
+                await run_in_threadpool(profile_store.save, profile_id, meta, sampler.collapsed())
+                logger.info("Profiled %s %s in %.0f ms (%s)", scope["method"], scope["path"], meta["duration_ms"], profile_id)
+            except Exception as e:
+                logger.warning("Could not store profile %s: %s", profile_id, e)
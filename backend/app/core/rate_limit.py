@@ -0,0 +1,191 @@
+import logging
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Tuple
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from app.core.config import settings
+from app.core.memory import estimate_entries, memory_registry
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MAX_MEMORY_BUCKETS = 100000
+
+class MemoryBucketStore:
+    """Token buckets in process memory (single worker)."""
+    def __init__(self):
+        self._lock = threading.Lock() # The memory watchdog evicts from a worker thread
+        self._buckets = OrderedDict() # key -> (tokens, updated_at)
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float, float]:
+        """Returns (allowed, retry_after_seconds, tokens_left)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= cost
+            retry_after = 0.0
+            if allowed:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > MAX_MEMORY_BUCKETS:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after, tokens
+
+    def memory_stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._buckets), "bytes": estimate_entries(self._buckets)}
+
+    def evict(self, fraction: float):
+        """Drops the least recently used `fraction` of the buckets (they restart full)."""
+        with self._lock:
+            for _ in range(min(len(self._buckets), max(1, int(len(self._buckets) * fraction)))):
+                self._buckets.popitem(last=False)
+
+# Atomic refill-and-take; Redis' clock keeps workers consistent
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(retry_after), tostring(tokens)}
+"""
+
+class RedisBucketStore:
+    """Token buckets shared by all workers (REDIS_URL)."""
+    def __init__(self, redis):
+        self._script = redis.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float, float]:
+        allowed, retry_after, tokens = await self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost])
+        return bool(allowed), float(retry_after), float(tokens)
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limiting for the expensive routes (RATE_LIMIT_COSTS).
+
+    Each caller has one bucket of RATE_LIMIT_BURST tokens refilled at
+    RATE_LIMIT_REFILL_PER_MINUTE; a request takes its route's cost. Callers
+    are identified by Firebase uid (verified through the token cache) or,
+    for anonymous requests and invalid tokens, by client IP. Limited
+    requests get 429 with Retry-After. Buckets live in Redis when REDIS_URL
+    is set (shared by all workers) and in process memory otherwise.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.memory = MemoryBucketStore()
+        memory_registry.register_cache("rate_limit_buckets", self.memory)
+        self._redis_store = None
+        self.limited = 0
+        # "POST /analyze" -> full path
+        self.costs = {}
+        for route, cost in settings.RATE_LIMIT_COSTS.items():
+            method, path = route.split(" ", 1)
+            self.costs[(method.upper(), (settings.API_V1_STR + path).rstrip("/"))] = cost
+
+    def _store(self):
+        redis = get_redis()
+        if redis is None:
+            return self.memory
+        if self._redis_store is None:
+            self._redis_store = RedisBucketStore(redis)
+        return self._redis_store
+
+    async def _caller(self, scope) -> str:
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode()
+        if authorization.lower().startswith("bearer "):
+            from app.core.token_cache import token_cache
+            try:
+                claims = await run_in_threadpool(token_cache.verify, authorization[7:].strip())
+                return f"uid:{claims['uid']}"
+            except Exception:
+                pass # Rejected later by the auth dependency; meanwhile count it against the IP
+        if settings.RATE_LIMIT_TRUST_PROXY and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode().split(",")[0].strip()
+        return "ip:" + (scope["client"][0] if scope.get("client") else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            return await self.app(scope, receive, send)
+        cost = self.costs.get((scope["method"], scope["path"].rstrip("/")))
+        if cost is None:
+            return await self.app(scope, receive, send)
+
+        capacity = float(settings.RATE_LIMIT_BURST)
+        rate = settings.RATE_LIMIT_REFILL_PER_MINUTE / 60
+        key = await self._caller(scope)
+        try:
+            allowed, retry_after, _ = await self._store().take(key, min(cost, capacity), capacity, rate)
+        except Exception as e:
+            # Shared store unavailable: keep limiting per worker instead of failing requests
+            logger.warning("Rate limit store failed, using in-process buckets: %s", e)
+            allowed, retry_after, _ = await self.memory.take(key, min(cost, capacity), capacity, rate)
+
+        if not allowed:
+            self.limited += 1
+            response = JSONResponse(
+                {"detail": "Too many requests, please slow down."},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+            return await response(scope, receive, send)
+        return await self.app(scope, receive, send)
+
+
+class ConcurrencyLimiter:
+    """
+    Global cap on concurrently running analyses (per worker). Requests wait up
+    to ANALYSIS_QUEUE_TIMEOUT_SECONDS for a slot and are then shed with 503,
+    which keeps latency bounded instead of queueing without limit.
+    """
+    def __init__(self, limit: int, timeout: float):
+        self._semaphore = asyncio.Semaphore(limit)
+        self.limit = limit
+        self.timeout = timeout
+        self.active = 0
+        self.shed = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            raise HTTPException(
+                status_code=503,
+                detail="The analysis service is busy, please retry shortly.",
+                headers={"Retry-After": str(max(1, math.ceil(self.timeout)))}
+            )
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+analysis_slots = ConcurrencyLimiter(settings.ANALYSIS_MAX_CONCURRENCY, settings.ANALYSIS_QUEUE_TIMEOUT_SECONDS)
@@ -1,29 +1,44 @@
-import json
-import firebase_admin
-from firebase_admin import credentials, auth
+import logging
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
+from app.core.token_cache import token_cache
 
-# Initialize Firebase Admin
-cred = None
-try:
-    cred = credentials.Certificate(settings.GOOGLE_APPLICATION_CREDENTIALS)
-    firebase_admin.initialize_app(cred)
-    print("Firebase Admin Initialized Successfully")
-except Exception as e:
-    print(f"Warning: Could not initialize Firebase: {e}")
+logger = logging.getLogger(__name__)
+
+def init_firebase():
+    """
+    Initialize Firebase Admin. Called from the app lifespan (not at import),
+    so importing the app stays free of I/O.
+    """
+    if settings.USE_MOCK_SERVICES and settings.LOAD_TEST_AUTH_SECRET:
+        logger.warning("LOAD_TEST_AUTH_SECRET is set: load test tokens are accepted in place of Firebase ID tokens")
+    import firebase_admin
+    from firebase_admin import credentials
+    try:
+        firebase_admin.get_app()
+        return # Already initialized (e.g. lifespan re-entered in tests)
+    except ValueError:
+        pass
+    try:
+        cred = credentials.Certificate(settings.GOOGLE_APPLICATION_CREDENTIALS)
+        firebase_admin.initialize_app(cred)
+        logger.info("Firebase Admin initialized")
+    except Exception as e:
+        logger.warning("Could not initialize Firebase: %s", e)
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 def verify_firebase_token(res: HTTPAuthorizationCredentials = Depends(security)):
     """
     Verifies the Firebase ID Token passed in the Authorization header.
-    Returns the decoded token (dict) if valid.
+    Returns the decoded token (dict) if valid. Verified tokens are cached
+    until they expire (see app/core/token_cache.py).
     """
     token = res.credentials
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = token_cache.verify(token)
         return decoded_token
     except Exception as e:
         raise HTTPException(
@@ -42,3 +57,23 @@ def get_current_user(token_data: dict = Depends(verify_firebase_token)):
         "email": token_data.get("email"),
         "name": token_data.get("name")
     }
+
+def require_admin(current_user: dict = Depends(get_current_user)):
+    """
+    Dependency for operator endpoints: the user must be listed in ADMIN_UIDS.
+    """
+    if current_user["uid"] not in settings.ADMIN_UIDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+def get_optional_user(res: HTTPAuthorizationCredentials = Depends(optional_security)):
+    """
+    Like get_current_user, for endpoints that also serve anonymous visitors.
+    Returns None without a valid token.
+    """
+    if res is None:
+        return None
+    try:
+        return get_current_user(verify_firebase_token(res))
+    except HTTPException:
+        return None
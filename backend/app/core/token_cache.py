@@ -0,0 +1,176 @@
+import logging
+import asyncio
+import hashlib
+import hmac
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from app.core.config import settings
+from app.core.memory import estimate_entries, memory_registry
+
+logger = logging.getLogger(__name__)
+
+class TokenVerificationCache:
+    """
+    Bounded LRU of verified Firebase ID tokens, keyed by SHA-256 of the token
+    (raw tokens are never kept as keys).
+
+    An entry is reused until the token's `exp`. With FIREBASE_CHECK_REVOKED
+    the entry additionally expires FIREBASE_REVOCATION_CHECK_SECONDS after the
+    last full check, so a revoked or disabled user is rejected within that
+    window. Verification runs in FastAPI's threadpool, hence the lock.
+    """
+    def __init__(self):
+        self._entries = OrderedDict() # token hash -> (claims, valid_until)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000) # seconds, full verifications only
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def verify(self, token: str) -> dict:
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+
+        # 1. Cached and still valid
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+        # 2. Load-test tokens, never valid against real services
+        if token.startswith("loadtest:") and settings.USE_MOCK_SERVICES and settings.LOAD_TEST_AUTH_SECRET:
+            return verify_load_test_token(token)
+
+        # 3. Full verification (signature, claims, optionally revocation)
+        from firebase_admin import auth
+        start = time.perf_counter()
+        try:
+            claims = auth.verify_id_token(token, check_revoked=settings.FIREBASE_CHECK_REVOKED)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+                self._latencies.append(time.perf_counter() - start)
+            raise
+
+        valid_until = claims["exp"]
+        if settings.FIREBASE_CHECK_REVOKED:
+            valid_until = min(valid_until, now + settings.FIREBASE_REVOCATION_CHECK_SECONDS)
+
+        with self._lock:
+            self.misses += 1
+            self._latencies.append(time.perf_counter() - start)
+            self._entries[key] = (claims, valid_until)
+            while len(self._entries) > settings.FIREBASE_TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+        return claims
+
+    def memory_stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": estimate_entries(self._entries)}
+
+    def evict(self, fraction: float):
+        """Drops the least recently used `fraction` of the tokens (memory budget)."""
+        with self._lock:
+            for _ in range(min(len(self._entries), max(1, int(len(self._entries) * fraction)))):
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            lookups = self.hits + self.misses + self.failures
+
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2) if latencies else None
+
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "verify_ms": {
+                    "samples": len(latencies),
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "max": round(latencies[-1] * 1000, 2) if latencies else None
+                }
+            }
+
+token_cache = TokenVerificationCache()
+memory_registry.register_cache("verified_tokens", token_cache)
+
+
+def verify_load_test_token(token: str) -> dict:
+    """
+    Test verifier for load tests: "loadtest:<uid>:<LOAD_TEST_AUTH_SECRET>"
+    stands for a signed-in user without a Firebase round trip. Only consulted
+    when USE_MOCK_SERVICES and LOAD_TEST_AUTH_SECRET are both set.
+    """
+    parts = token.split(":", 2)
+    if len(parts) != 3 or not parts[1] or not hmac.compare_digest(parts[2].encode(), settings.LOAD_TEST_AUTH_SECRET.encode()):
+        raise ValueError("Invalid load test token")
+    uid = parts[1]
+    return {"uid": uid, "email": f"{uid}@loadtest.invalid", "name": f"Load Test {uid}", "exp": time.time() + 3600}
+
+
+# Public endpoint serving the certs that sign Firebase ID tokens
+ID_TOKEN_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+_cert_request = None
+
+
+def _get_cert_request():
+    """
+    The HTTP request object verify_id_token fetches the certs with, so a
+    prefetch lands in its cache. firebase_admin does not expose it: if its
+    internals moved, fall back to our own request (the certs are still
+    checked and their max-age known, but verify_id_token fetches its own copy).
+    """
+    global _cert_request
+    if _cert_request is None:
+        try:
+            from firebase_admin import auth
+            _cert_request = auth._get_client(None)._token_verifier.request
+        except (AttributeError, ImportError) as e:
+            logger.warning("firebase_admin's cert cache is not reachable (%s); prefetching without it", e)
+            from google.auth.transport.requests import Request
+            _cert_request = Request()
+    return _cert_request
+
+
+def prefetch_certs() -> int:
+    """
+    Fetches Google's token signing certs through firebase_admin's own HTTP
+    cache, bypassing the cached copy, so verify_id_token never has to fetch
+    them on a request. Returns the certs' max-age in seconds.
+    """
+    response = _get_cert_request()(url=ID_TOKEN_CERT_URL, headers={"Cache-Control": "no-cache"})
+    if response.status != 200:
+        raise RuntimeError(f"cert endpoint returned HTTP {response.status}")
+    match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+    return int(match.group(1)) if match else 3600
+
+
+async def run_cert_refresher():
+    """
+    Background task: keep the signing certs warm, refreshing them at 80% of
+    their max-age (retrying every minute on failure).
+    """
+    import firebase_admin
+    try:
+        firebase_admin.get_app()
+    except ValueError:
+        return # Firebase not initialized, nothing to verify
+    while True:
+        try:
+            max_age = await asyncio.to_thread(prefetch_certs)
+            delay = max(60, int(max_age * 0.8))
+        except Exception as e:
+            logger.warning("Could not prefetch Firebase signing certs: %s", e)
+            delay = 60
+        await asyncio.sleep(delay)
@@ -0,0 +1,190 @@
+import logging
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes for every query shape the endpoints run.
+# Each entry: name -> keys (+ options). Names are stable so re-runs are idempotent.
+INDEXES = {
+    "analysis_history": [
+        # history list: find({user_id}).sort(created_at desc, _id desc)
+        {"name": "user_created", "keys": [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]},
+        # insights fallback: count_documents({user_id, verdict})
+        {"name": "user_verdict", "keys": [("user_id", ASCENDING), ("verdict", ASCENDING)]},
+    ],
+    "posts": [
+        # community feed: find().sort(created_at desc, _id desc)
+        {"name": "feed", "keys": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+        # profile stats: count_documents({author.uid}) and $sum of likes per author
+        {"name": "author_likes", "keys": [("author.uid", ASCENDING), ("likes", ASCENDING)]},
+    ],
+    "comments": [
+        # thread pages: find({post_id}).sort(created_at desc, _id desc)
+        {"name": "post_created", "keys": [("post_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]},
+    ],
+    "post_likes": [
+        # toggles address documents by _id; feed: find({user_id, post_id: {$in}, liked})
+        {"name": "user_post", "keys": [("user_id", ASCENDING), ("post_id", ASCENDING)]},
+        # reconcile_likes: count({post_id, liked}) and its most recent likers
+        {"name": "post_liked", "keys": [("post_id", ASCENDING), ("liked", ASCENDING), ("updated_at", DESCENDING)]},
+    ],
+    "users_interests": [
+        {"name": "user_id_unique", "keys": [("user_id", ASCENDING)], "unique": True},
+        # rank fallback: count_documents({total_checks: {$gt: n}}),
+        # leaderboard refresh: covered scan of (total_checks, user_id)
+        {"name": "total_checks", "keys": [("total_checks", DESCENDING), ("user_id", ASCENDING)]},
+    ],
+    "users": [
+        {"name": "uid_unique", "keys": [("uid", ASCENDING)], "unique": True},
+    ],
+}
+
+# Probe values for paginated shapes (only the plan matters, not the result)
+_PROBE_TIME = datetime(1970, 1, 1)
+_PROBE_ID = ObjectId("000000000000000000000000")
+_PROBE_PAGE = {"$or": [{"created_at": {"$lt": _PROBE_TIME}}, {"created_at": _PROBE_TIME, "_id": {"$lt": _PROBE_ID}}]}
+
+# Representative endpoint queries, checked with explain() against the indexes above.
+# "command" is the body of an explain-able command (find / count / aggregate).
+QUERY_SHAPES = [
+    {"name": "history.list", "command": {"find": "analysis_history", "filter": {"user_id": "__probe__"}, "sort": {"created_at": -1, "_id": -1}, "limit": 50}},
+    {"name": "history.list_page", "command": {"find": "analysis_history", "filter": {"$and": [{"user_id": "__probe__"}, _PROBE_PAGE]}, "sort": {"created_at": -1, "_id": -1}, "limit": 51}},
+    {"name": "history.insights_fake_count", "command": {"count": "analysis_history", "query": {"user_id": "__probe__", "verdict": {"$regex": "Fake|Likely Fake", "$options": "i"}}}},
+    {"name": "blogs.feed", "command": {"find": "posts", "filter": {}, "sort": {"created_at": -1, "_id": -1}, "limit": 100}},
+    {"name": "blogs.feed_page", "command": {"find": "posts", "filter": _PROBE_PAGE, "sort": {"created_at": -1, "_id": -1}, "limit": 101}},
+    {"name": "blogs.comments_page", "command": {"find": "comments", "filter": {"$and": [{"post_id": "__probe__"}, _PROBE_PAGE]}, "sort": {"created_at": -1, "_id": -1}, "limit": 21}},
+    {"name": "blogs.viewer_likes", "command": {"find": "post_likes", "filter": {"user_id": "__probe__", "post_id": {"$in": ["__probe__"]}, "liked": True}, "projection": {"_id": 0, "post_id": 1}}},
+    {"name": "blogs.reconcile_likes", "command": {"find": "post_likes", "filter": {"post_id": "__probe__", "liked": True}, "projection": {"_id": 0, "user_id": 1}, "sort": {"updated_at": -1}, "limit": 20}},
+    {"name": "users.stats_topics_shared", "command": {"count": "posts", "query": {"author.uid": "__probe__"}}},
+    {"name": "users.stats_reactions", "command": {"aggregate": "posts", "pipeline": [{"$match": {"author.uid": "__probe__"}}, {"$group": {"_id": None, "total_likes": {"$sum": "$likes"}}}], "cursor": {}}},
+    {"name": "users_interests.by_user", "command": {"find": "users_interests", "filter": {"user_id": "__probe__"}, "limit": 1}},
+    {"name": "users.rank", "command": {"count": "users_interests", "query": {"total_checks": {"$gt": 0}}}},
+    {"name": "leaderboard.refresh", "command": {"find": "users_interests", "filter": {}, "projection": {"_id": 0, "user_id": 1, "total_checks": 1}, "sort": {"total_checks": -1, "user_id": 1}}},
+    {"name": "leaderboard.profiles", "command": {"find": "users", "filter": {"uid": {"$in": ["__probe__"]}}, "projection": {"_id": 0, "uid": 1, "name": 1, "photo_url": 1}}},
+    {"name": "users.profile", "command": {"find": "users", "filter": {"uid": "__probe__"}, "limit": 1}},
+]
+
+
+async def ensure_indexes(db, prune: bool = False) -> dict:
+    """
+    Idempotently creates the declared indexes. An index whose name exists
+    with different keys/options is dropped and rebuilt (migration).
+    With prune=True, indexes not declared here are dropped.
+    Returns {"created": [...], "rebuilt": [...], "dropped": [...], "failed": [...]}.
+    """
+    report = {"created": [], "rebuilt": [], "dropped": [], "failed": []}
+
+    for collection_name, specs in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+
+        for spec in specs:
+            name = spec["name"]
+            keys = spec["keys"]
+            unique = spec.get("unique", False)
+            label = f"{collection_name}.{name}"
+
+            current = existing.get(name)
+            if current is not None:
+                if list(current["key"]) == keys and current.get("unique", False) == unique:
+                    continue
+                await collection.drop_index(name)
+                report["rebuilt"].append(label)
+            else:
+                report["created"].append(label)
+
+            try:
+                # background=True is a no-op on MongoDB 4.2+ (builds no longer block), kept for older servers
+                await collection.create_index(keys, name=name, unique=unique, background=True)
+            except OperationFailure as e:
+                # e.g. duplicate data preventing a unique index, or the same keys under another name
+                logger.warning("Could not build index %s: %s", label, e)
+                report["failed"].append(label)
+                for bucket in ("created", "rebuilt"):
+                    if label in report[bucket]:
+                        report[bucket].remove(label)
+
+        if prune:
+            declared = {spec["name"] for spec in specs} | {"_id_"}
+            for name in existing:
+                if name not in declared:
+                    await collection.drop_index(name)
+                    report["dropped"].append(f"{collection_name}.{name}")
+
+    return report
+
+
+def _plan_stages(plan) -> List[str]:
+    """Collects every "stage" name below a winningPlan node."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def _winning_plans(explain) -> list:
+    """Finds all winningPlan nodes (aggregate explains nest them under $cursor)."""
+    plans = []
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                plans.append(value)
+            else:
+                plans.extend(_winning_plans(value))
+    elif isinstance(explain, list):
+        for item in explain:
+            plans.extend(_winning_plans(item))
+    return plans
+
+
+async def verify_query_shapes(db) -> List[dict]:
+    """
+    Runs explain() for every declared query shape and warns about the ones
+    that are not served by an index (COLLSCAN) or need an in-memory SORT.
+    """
+    results = []
+    for shape in QUERY_SHAPES:
+        try:
+            explain = await db.command({"explain": shape["command"], "verbosity": "queryPlanner"})
+        except OperationFailure as e:
+            logger.warning("explain() failed for %s: %s", shape["name"], e)
+            results.append({"name": shape["name"], "indexed": False, "stages": [], "error": str(e)})
+            continue
+
+        stages = [stage for plan in _winning_plans(explain) for stage in _plan_stages(plan)]
+        # EOF = collection does not exist yet, nothing to scan
+        indexed = "COLLSCAN" not in stages and ("IXSCAN" in stages or "COUNT_SCAN" in stages or "EOF" in stages or "IDHACK" in stages)
+        in_memory_sort = "SORT" in stages
+
+        if not indexed:
+            logger.warning("Unindexed query shape %s: plan stages %s", shape["name"], stages)
+        elif in_memory_sort:
+            logger.warning("Query shape %s sorts in memory: plan stages %s", shape["name"], stages)
+
+        results.append({"name": shape["name"], "indexed": indexed, "in_memory_sort": in_memory_sort, "stages": stages})
+    return results
+
+
+async def provision_indexes(db, verify: bool = True):
+    """
+    Startup hook: build missing indexes, then check the endpoint query shapes.
+    Never raises, so a slow or unreachable database does not block the API.
+    """
+    try:
+        report = await ensure_indexes(db)
+        if report["created"] or report["rebuilt"]:
+            logger.info("Indexes created: %s rebuilt: %s", report["created"], report["rebuilt"])
+        if verify:
+            await verify_query_shapes(db)
+    except Exception as e:
+        logger.warning("Index provisioning failed: %s", e)
@@ -1,6 +1,9 @@
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 class DataBase:
     client: AsyncIOMotorClient = None
 
@@ -10,11 +13,11 @@ async def get_database() -> AsyncIOMotorClient:
     return db.client[settings.DB_NAME]
 
 async def connect_to_mongo():
-    print("Connecting to MongoDB...")
+    logger.info("Connecting to MongoDB")
     db.client = AsyncIOMotorClient(settings.MONGODB_URL)
-    print("MongoDB Connected.")
+    logger.info("MongoDB connected")
 
 async def close_mongo_connection():
-    print("Closing MongoDB connection...")
+    logger.info("Closing MongoDB connection")
     if db.client:
         db.client.close()
@@ -0,0 +1,34 @@
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Optional shared store for multi-worker deployments (feed cache tier, ...).
+# Needs `pip install redis` and REDIS_URL; everything works in-process without it.
+
+class RedisConnection:
+    client = None
+    unavailable = False
+
+redis_conn = RedisConnection()
+
+def get_redis():
+    """
+    Returns the shared redis.asyncio client, or None when REDIS_URL is unset
+    or the redis package is missing (the caller falls back to in-process state).
+    """
+    if redis_conn.client is not None or redis_conn.unavailable or not settings.REDIS_URL:
+        return redis_conn.client
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("REDIS_URL is set but the redis package is not installed; using in-process state only")
+        redis_conn.unavailable = True
+        return None
+    redis_conn.client = aioredis.from_url(settings.REDIS_URL)
+    return redis_conn.client
+
+async def close_redis_connection():
+    if redis_conn.client is not None:
+        await redis_conn.client.aclose()
+        redis_conn.client = None
@@ -1,16 +1,55 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
+from app.core.logging import setup_logging, shutdown_logging, RequestIdMiddleware
 
-from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from app.db.indexes import provision_indexes
+from app.db.redis import close_redis_connection
+from app.core.security import init_firebase
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.memory import run_memory_watchdog
+from app.core.token_cache import run_cert_refresher
+from app.services.leaderboard_service import leaderboard_service
+from app.services.persistence_service import write_behind
+from app.services import analysis_service
 
 # DB connection logic
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Side effects live here, not at import time (see scripts/import_budget.py)
+    setup_logging()
+    init_firebase()
     await connect_to_mongo()
+    index_task = None
+    if settings.ENSURE_INDEXES_ON_STARTUP:
+        # Build indexes in the background so startup is not blocked on large collections
+        index_task = asyncio.create_task(
+            provision_indexes(await get_database(), verify=settings.VERIFY_INDEXES_ON_STARTUP)
+        )
+    if settings.WRITE_BEHIND_ENABLED:
+        write_behind.start(await get_database())
+    leaderboard_task = asyncio.create_task(leaderboard_service.run(get_database))
+    cert_task = asyncio.create_task(run_cert_refresher()) if settings.FIREBASE_CERT_PREFETCH else None
+    memory_task = asyncio.create_task(run_memory_watchdog())
+    if settings.PRELOAD_ON_STARTUP:
+        asyncio.create_task(asyncio.to_thread(analysis_service.preload_dependencies))
     yield
+    leaderboard_task.cancel()
+    memory_task.cancel()
+    if cert_task:
+        cert_task.cancel()
+    # Drain queued history/interest writes before the client goes away
+    await write_behind.stop()
+    if index_task and not index_task.done():
+        index_task.cancel()
+    await close_redis_connection()
     await close_mongo_connection()
+    shutdown_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -27,9 +66,22 @@ app.include_router(translate.router, prefix=f"{settings.API_V1_STR}/translate",
 app.include_router(chat.router, prefix=f"{settings.API_V1_STR}/chat", tags=["chat"])
 app.include_router(blogs.router, prefix=f"{settings.API_V1_STR}/blogs", tags=["blogs"])
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
-print(f"Loaded Router: /translate, /chat, /blogs, /users")
+from app.api.v1.endpoints import admin
+app.include_router(admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
+
+# Opt-in request profiling; not installed at all unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Token buckets for /analyze, /chat and /translate (inside CORS, so 429s carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
+# Request latency / in-flight metrics and the optional Server-Timing header
+app.add_middleware(MetricsMiddleware)
+
+# X-Request-ID on every response and in every log line written for the request
+app.add_middleware(RequestIdMiddleware)
 
-# Set all CORS enabled origins
 # Set all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
@@ -38,8 +90,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "Server-Timing", "X-Request-ID", "X-Profile-Id"], # Keyset pagination token for /history and /blogs; rate limits; stage timings; log correlation; profiles
 )
 
 @app.get("/")
 def root():
     return {"message": "Welcome to AI Fake News Detector API"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (stage latencies, request latencies, cache and queue state)."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
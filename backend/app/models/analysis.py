@@ -13,8 +13,10 @@ class AnalysisDBModel(BaseModel):
     credibility_score: int
     category: Optional[str] = "Others" # New field for dashboard
     
-    # Store full AI result for future reference
-    ai_raw_data: Dict[str, Any]
+    # Store AI result for future reference (trimmed, see history_service.pack_ai_raw_data)
+    ai_raw_data: Optional[Dict[str, Any]] = None
+    ai_raw_data_z: Optional[bytes] = None # zlib-compressed JSON when COMPRESS_AI_RAW_DATA is on
+    explanation_pending: bool = False
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -4,6 +4,7 @@ from typing import Optional, List, Dict, Any
 class AnalysisRequest(BaseModel):
     text: Optional[str] = None
     url: Optional[str] = None
+    defer_report: Optional[bool] = None # Overrides settings.DEFER_LLM_REPORT for this request
     
     # Validator to ensure at least one is provided
     def validate_input(self):
@@ -31,3 +32,5 @@ class AnalysisResponse(BaseModel):
     news_coverage: Optional[Dict[str, Any]] = None
     translated_content: Optional[str] = None # New field for non-English inputs
     timestamp: Optional[str] = None
+    analysis_id: Optional[str] = None
+    explanation_pending: bool = False # True until the background LLM report is attached
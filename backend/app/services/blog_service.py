@@ -0,0 +1,126 @@
+from pymongo import ReturnDocument, UpdateOne
+from app.core.config import settings
+
+# Posts keep only the latest COMMENT_PREVIEW_SIZE comments (chronological) plus
+# a comment_count; the full thread lives in the "comments" collection, indexed
+# by (post_id, created_at, _id). Posts created before this layout are moved
+# over by migrate_embedded_comments (lazily on the next comment, or in bulk by
+# scripts/migrate_blog_posts.py) and flagged with comments_migrated.
+#
+# Likes work the same way: "post_likes" holds one document per (post, user)
+# with _id "<post_id>:<uid>" and is the source of truth; the post keeps the
+# likes counter and liked_by, the LIKED_BY_PREVIEW_SIZE most recent likers
+# (recomputed from post_likes by reconcile_likes if the two drift apart).
+# Legacy posts with a full liked_by array are flagged with likes_migrated
+# once moved over.
+
+async def migrate_embedded_comments(db, post: dict) -> bool:
+    """
+    Copies a legacy post's embedded comments into the comments collection and
+    trims the post to the preview. Idempotent: comments are upserted on their
+    content/author/time, and the post is only rewritten once.
+    Returns True if this call converted the post.
+    """
+    if post.get("comments_migrated"):
+        return False
+
+    post_id = str(post["_id"])
+    comments = post.get("comments") or []
+    if comments:
+        ops = []
+        for c in comments:
+            key = {"post_id": post_id, "user_id": c.get("user_id"), "created_at": c.get("created_at"), "content": c.get("content")}
+            ops.append(UpdateOne(key, {"$setOnInsert": {**c, "post_id": post_id}}, upsert=True))
+        await db["comments"].bulk_write(ops, ordered=False)
+
+    result = await db["posts"].update_one(
+        # Guard on the array size so comments pushed concurrently by old code are not lost
+        {"_id": post["_id"], "comments_migrated": {"$ne": True}, "comments": {"$size": len(comments)}} if comments
+        else {"_id": post["_id"], "comments_migrated": {"$ne": True}},
+        {"$set": {
+            "comments": comments[-settings.COMMENT_PREVIEW_SIZE:],
+            "comment_count": len(comments),
+            "comments_migrated": True
+        }}
+    )
+    return result.modified_count == 1
+
+
+def like_id(post_id: str, uid: str) -> str:
+    return f"{post_id}:{uid}"
+
+
+def like_toggle_pipeline(post_id: str, uid: str, now) -> list:
+    """Flips the user's like in post_likes (upserted, unset counts as not liked)."""
+    return [{"$set": {
+        "post_id": post_id,
+        "user_id": uid,
+        "liked": {"$ne": [{"$ifNull": ["$liked", False]}, True]},
+        "updated_at": now
+    }}]
+
+
+def post_like_pipeline(uid: str, liked: bool) -> list:
+    """
+    Applies one like/unlike to the post: adjusts the counter and moves the
+    user to the end of (or out of) the bounded liked_by preview. `liked` is
+    the state the post_likes toggle returned, so each flip moves the counter
+    exactly once; no clamping, a drifted counter is fixed by reconcile_likes.
+    """
+    others = {"$filter": {"input": {"$ifNull": ["$liked_by", []]}, "cond": {"$ne": ["$$this", uid]}}}
+    return [{"$set": {
+        "likes": {"$add": [{"$ifNull": ["$likes", 0]}, 1 if liked else -1]},
+        "liked_by": {"$slice": [{"$concatArrays": [others, [uid]]}, -settings.LIKED_BY_PREVIEW_SIZE]} if liked else others
+    }}]
+
+
+async def reconcile_likes(db, post_query: dict, post_id: str):
+    """
+    Recounts a migrated post's likes and liked_by preview from post_likes,
+    the source of truth: repairs a counter left behind when a toggle failed
+    between its two writes. Returns the updated post, or None if the post is
+    missing or not migrated.
+    """
+    liked = {"post_id": post_id, "liked": True}
+    likes = await db["post_likes"].count_documents(liked)
+    recent = await db["post_likes"].find(liked, {"_id": 0, "user_id": 1}) \
+        .sort("updated_at", -1).limit(settings.LIKED_BY_PREVIEW_SIZE).to_list(settings.LIKED_BY_PREVIEW_SIZE)
+    return await db["posts"].find_one_and_update(
+        {**post_query, "likes_migrated": True},
+        {"$set": {"likes": likes, "liked_by": [like["user_id"] for like in reversed(recent)]}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def migrate_embedded_likes(db, post: dict) -> bool:
+    """
+    Copies a legacy post's liked_by array into post_likes and trims it to the
+    preview. Idempotent like migrate_embedded_comments.
+    Returns True if this call converted the post.
+    """
+    if post.get("likes_migrated"):
+        return False
+
+    post_id = str(post["_id"])
+    liked_by = post.get("liked_by") or []
+    if liked_by:
+        ops = [
+            UpdateOne(
+                {"_id": like_id(post_id, uid)},
+                {"$setOnInsert": {"post_id": post_id, "user_id": uid, "liked": True}},
+                upsert=True
+            )
+            for uid in liked_by
+        ]
+        await db["post_likes"].bulk_write(ops, ordered=False)
+
+    result = await db["posts"].update_one(
+        {"_id": post["_id"], "likes_migrated": {"$ne": True}, "liked_by": {"$size": len(liked_by)}} if liked_by
+        else {"_id": post["_id"], "likes_migrated": {"$ne": True}},
+        {"$set": {
+            "liked_by": liked_by[-settings.LIKED_BY_PREVIEW_SIZE:],
+            "likes": len(liked_by),
+            "likes_migrated": True
+        }}
+    )
+    return result.modified_count == 1
@@ -1,25 +1,27 @@
-import requests
+import logging
 from app.core.config import settings
+from app.core.metrics import span
+from app.utils.ai_engine import Document, as_document
+
+STOPWORDS = frozenset({'a', 'an', 'the', 'in', 'on', 'at', 'for', 'to', 'of', 'is', 'are', 'was', 'were', 'be', 'has', 'have', 'had', 'it', 'this', 'that'})
+
+logger = logging.getLogger(__name__)
 
 class FactChecker:
     def __init__(self):
-        print("Initializing FactChecker Service (Sync)...")
         self.api_key = settings.GOOGLE_FACT_CHECK_KEY
         self.base_url = "https://factchecktools.googleapis.com/v1alpha1/claims:search"
+        if settings.USE_MOCK_SERVICES:
+            self.api_key = self.api_key or "mock"
+            self.base_url = f"{settings.MOCK_SERVICES_URL}/factcheck/v1alpha1/claims:search"
 
-    def calculate_similarity(self, text1: str, text2: str) -> float:
+    def calculate_similarity(self, text1, text2) -> float:
         """
-        Calculates Jaccard similarity between two texts, ignoring common stopwords.
+        Calculates Jaccard similarity between two texts (str or Document), ignoring common stopwords.
+        Pass the query as a Document when comparing it against many claims: it is tokenized once.
         """
-        stopwords = {'a', 'an', 'the', 'in', 'on', 'at', 'for', 'to', 'of', 'is', 'are', 'was', 'were', 'be', 'has', 'have', 'had', 'it', 'this', 'that'}
-        
-        def tokenize(text):
-            # Simple tokenizer: lowercase, remove non-alphanumeric (simplified), split
-            words = text.lower().replace('.', '').replace(',', '').replace('?', '').split()
-            return set(w for w in words if w not in stopwords)
-
-        set1 = tokenize(text1)
-        set2 = tokenize(text2)
+        set1 = as_document(text1).token_set - STOPWORDS
+        set2 = as_document(text2).token_set - STOPWORDS
         
         if not set1 or not set2:
             return 0.0
@@ -36,23 +38,27 @@ class FactChecker:
         if not self.api_key:
             return None
 
+        import requests
         try:
-            response = requests.get(
-                self.base_url,
-                params={
-                    "key": self.api_key,
-                    "query": query,
-                    "languageCode": "en"
-                },
-                timeout=5
-            )
+            with span("fact_check") as s:
+                response = requests.get(
+                    self.base_url,
+                    params={
+                        "key": self.api_key,
+                        "query": query,
+                        "languageCode": "en"
+                    },
+                    timeout=5
+                )
+                if response.status_code != 200:
+                    s.outcome = "http_error"
             
             if response.status_code != 200:
-                print(f"FactCheck API Error: {response.status_code} - {response.text}")
+                logger.warning("Fact Check API returned HTTP %s: %.300s", response.status_code, response.text)
                 return None
             
             data = response.json()
-            print(f"\n[FactCheck API] Response: {data}") # LOGGING
+            logger.debug("Fact Check API returned %d claims", len(data.get("claims", [])) if data else 0)
             if not data or "claims" not in data:
                 return None
             
@@ -61,18 +67,19 @@ class FactChecker:
             SIMILARITY_THRESHOLD = 0.2 # Conservative threshold: at least 20% word overlap
             
             # Iterate through claims to find the best semantic match
+            query_doc = Document(query)
             for claim in data["claims"]:
                 claim_text = claim.get("text", "")
-                similarity = self.calculate_similarity(query, claim_text)
+                similarity = self.calculate_similarity(query_doc, claim_text)
                 
-                print(f"Checking claim: '{claim_text}' | Similarity: {similarity:.2f}")
+                logger.debug("Candidate claim %.120r similarity %.2f", claim_text, similarity)
                 
                 if similarity > highest_similarity:
                     highest_similarity = similarity
                     best_match = claim
 
             if not best_match or highest_similarity < SIMILARITY_THRESHOLD:
-                print(f"No sufficient match found. Max similarity: {highest_similarity:.2f}")
+                logger.debug("No fact-check above the similarity threshold (best %.2f)", highest_similarity)
                 return None
 
             # Process the best match
@@ -87,8 +94,7 @@ class FactChecker:
             }
 
         except Exception as e:
-            print(f"Fact Check API Error: {e}")
+            logger.warning("Fact Check API request failed: %s", e)
             return None
 
 fact_checker = FactChecker()
-print("FactChecker Service Ready.")
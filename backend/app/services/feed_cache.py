@@ -0,0 +1,170 @@
+import logging
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Set
+from app.core.config import settings
+from app.core.memory import estimate_entries, memory_registry
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "feed:version"
+MAX_VIEWERS_PER_PAGE = 256
+
+def _dumps(data) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+class FeedCache:
+    """
+    Cache for GET /blogs pages.
+
+    Pages are keyed by (feed version, limit, cursor). Every write that changes
+    the feed (new post, comment, like) calls invalidate(), which bumps the
+    version, so readers never see a page older than the last local write.
+    Each page is stored serialized together with a strong ETag (hash of the
+    body), so revalidations are answered with 304 without touching MongoDB.
+
+    Tiers:
+    - in-process LRU (FEED_CACHE_MAX_PAGES), entries live FEED_CACHE_TTL_SECONDS.
+      Without Redis the version is per process, so in a multi-worker
+      deployment the TTL bounds how long a worker serves a feed another worker
+      has changed.
+    - optional shared tier (REDIS_URL): the version is a Redis counter and
+      pages are shared between workers for FEED_CACHE_SHARED_TTL_SECONDS.
+
+    The viewer's `liked` flags are applied on top of the shared page; they are
+    cached per page (likes bump the version, so they cannot go stale).
+    """
+    def __init__(self):
+        self._local_version = 0
+        self._lock = threading.Lock() # The memory watchdog evicts from a worker thread
+        self._pages = OrderedDict() # (version, limit, cursor) -> page
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    async def _version(self) -> tuple:
+        redis = get_redis()
+        if redis is not None:
+            try:
+                return ("shared", int(await redis.get(VERSION_KEY) or 0))
+            except Exception as e:
+                logger.warning("Feed cache could not read the shared version: %s", e)
+        return ("local", self._local_version)
+
+    async def invalidate(self):
+        """Called after every write that changes what the feed shows."""
+        self._local_version += 1
+        with self._lock:
+            self._pages.clear()
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.incr(VERSION_KEY)
+            except Exception as e:
+                logger.warning("Feed cache could not bump the shared version: %s", e)
+
+    def _make_page(self, data: dict) -> dict:
+        body = _dumps(data["posts"])
+        return {
+            "posts": data["posts"],
+            "next_cursor": data["next_cursor"],
+            "legacy_likers": data.get("legacy_likers", {}),
+            "body": body,
+            "etag": _etag(body),
+            "expires": time.monotonic() + settings.FEED_CACHE_TTL_SECONDS,
+            "viewers": OrderedDict()
+        }
+
+    async def get_page(self, limit: int, cursor: Optional[str], build: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Returns the page for (limit, cursor); `build` loads it from MongoDB on a
+        miss and must return {"posts": [json-ready dicts], "next_cursor", "legacy_likers"}.
+        """
+        if not settings.FEED_CACHE_ENABLED:
+            return self._make_page(await build())
+
+        # 1. In-process
+        version = await self._version()
+        key = (version, limit, cursor)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None and page["expires"] > time.monotonic():
+                self._pages.move_to_end(key)
+                self.hits += 1
+                return page
+
+        # 2. Shared tier
+        data = None
+        redis = get_redis() if version[0] == "shared" else None
+        shared_key = f"feed:page:{version[1]}:{limit}:{cursor or ''}"
+        if redis is not None:
+            try:
+                raw = await redis.get(shared_key)
+                if raw is not None:
+                    data = json.loads(raw)
+                    self.shared_hits += 1
+            except Exception as e:
+                logger.warning("Feed cache shared read failed: %s", e)
+
+        # 3. Database
+        if data is None:
+            self.misses += 1
+            data = await build()
+            if redis is not None:
+                try:
+                    await redis.set(shared_key, _dumps(data), ex=settings.FEED_CACHE_SHARED_TTL_SECONDS)
+                except Exception as e:
+                    logger.warning("Feed cache shared write failed: %s", e)
+
+        page = self._make_page(data)
+        with self._lock:
+            self._pages[key] = page
+            while len(self._pages) > settings.FEED_CACHE_MAX_PAGES:
+                self._pages.popitem(last=False)
+        return page
+
+    async def viewer_likes(self, page: dict, uid: str, lookup: Callable[[list], Awaitable[Set[str]]]) -> Set[str]:
+        """Ids of the posts on `page` the user likes; `lookup(post_ids)` queries them on a miss."""
+        viewers = page["viewers"]
+        liked = viewers.get(uid)
+        if liked is None:
+            post_ids = [p["_id"] for p in page["posts"]]
+            liked = await lookup(post_ids) if post_ids else set()
+            # Posts whose likers have not been moved to post_likes yet
+            liked |= {pid for pid, likers in page["legacy_likers"].items() if uid in likers}
+            viewers[uid] = liked
+            while len(viewers) > MAX_VIEWERS_PER_PAGE:
+                viewers.popitem(last=False)
+        else:
+            viewers.move_to_end(uid)
+        return liked
+
+    def memory_stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._pages), "bytes": estimate_entries(self._pages)}
+
+    def evict(self, fraction: float):
+        """Drops the least recently used `fraction` of the pages (memory budget)."""
+        with self._lock:
+            for _ in range(min(len(self._pages), max(1, int(len(self._pages) * fraction)))):
+                self._pages.popitem(last=False)
+
+    @staticmethod
+    def viewer_etag(page: dict, liked: Set[str]) -> str:
+        # The personalized body is a function of the page body and the liked set
+        return _etag(page["etag"].encode() + b"|" + ",".join(sorted(liked)).encode())
+
+    @staticmethod
+    def viewer_body(page: dict, liked: Set[str]) -> bytes:
+        return _dumps([{**p, "liked": p["_id"] in liked} for p in page["posts"]])
+
+feed_cache = FeedCache()
+memory_registry.register_cache("feed_pages", feed_cache)
@@ -1,19 +1,103 @@
+import json
+import zlib
+from typing import Optional
+from bson import Binary, ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
 from app.db.mongodb import get_database
+from app.utils.helpers import fetch_page
+
+# Fields returned by the history list. The full ai_raw_data is only sent by the detail endpoint.
+LIST_PROJECTION = {
+    "content": 1,
+    "source_url": 1,
+    "input_type": 1,
+    "verdict": 1,
+    "credibility_score": 1,
+    "category": 1,
+    "created_at": 1,
+    "explanation_pending": 1,
+}
+
+MAX_STORED_ARTICLES = 5
+MAX_STORED_ORIGINAL_CHARS = 300
+
+def _trim_article(article: dict) -> dict:
+    """Keeps only the fields the UI links to (drops content, description, images)."""
+    source = article.get("source")
+    return {
+        "source": source.get("name") if isinstance(source, dict) else source,
+        "title": article.get("title"),
+        "url": article.get("url"),
+        "publishedAt": article.get("publishedAt"),
+    }
+
+def trim_ai_raw_data(result: dict) -> dict:
+    """
+    Copy of the analysis result reduced for storage: the NewsAPI top match and
+    trusted articles are cut down to links, and the original (pre-translation)
+    text is truncated like the stored content.
+    """
+    trimmed = dict(result)
+    trimmed.pop("analysis_id", None)
+    
+    news = result.get("news_coverage")
+    if news:
+        news = dict(news)
+        trusted = news.get("trusted_articles") or []
+        news["trusted_articles"] = [_trim_article(a) for a in trusted[:MAX_STORED_ARTICLES]]
+        if news.get("top_match"):
+            news["top_match"] = _trim_article(news["top_match"])
+        trimmed["news_coverage"] = news
+    
+    if trimmed.get("translated_content"):
+        trimmed["translated_content"] = trimmed["translated_content"][:MAX_STORED_ORIGINAL_CHARS]
+    return trimmed
 
 class HistoryService:
-    async def get_user_history(self, db: AsyncIOMotorClient, user_id: str, limit: int = 50):
+    def pack_ai_raw_data(self, result: dict) -> dict:
+        """
+        Storage fields for an analysis result: trimmed `ai_raw_data`, or
+        zlib-compressed JSON in `ai_raw_data_z` when COMPRESS_AI_RAW_DATA is on.
+        """
+        trimmed = trim_ai_raw_data(result)
+        if settings.COMPRESS_AI_RAW_DATA:
+            raw = json.dumps(trimmed, separators=(",", ":"), default=str).encode("utf-8")
+            return {"ai_raw_data": None, "ai_raw_data_z": Binary(zlib.compress(raw, 6))}
+        return {"ai_raw_data": trimmed, "ai_raw_data_z": None}
+
+    def unpack_ai_raw_data(self, doc: dict) -> dict:
+        if doc.get("ai_raw_data_z") is not None:
+            return json.loads(zlib.decompress(bytes(doc["ai_raw_data_z"])))
+        return doc.get("ai_raw_data") or {}
+
+    async def get_user_history(self, db: AsyncIOMotorClient, user_id: str, limit: int = 50, cursor: Optional[str] = None):
         """
-        Fetch analysis history for a specific user.
+        Fetch one page of analysis history (summary fields only) for a specific user, newest first.
+        Returns (items, next_cursor).
         """
-        cursor = db["analysis_history"].find({"user_id": user_id}).sort("created_at", -1).limit(limit)
-        history = await cursor.to_list(length=limit)
+        history, next_cursor = await fetch_page(db["analysis_history"], {"user_id": user_id}, limit, cursor, LIST_PROJECTION)
         
         # Convert ObjectId to string
         for item in history:
             item["id"] = str(item["_id"])
             del item["_id"]
             
-        return history
+        return history, next_cursor
+
+    async def get_analysis(self, db: AsyncIOMotorClient, user_id: str, analysis_id: str):
+        """
+        Fetch the full record of one analysis owned by the user, or None.
+        """
+        if not ObjectId.is_valid(analysis_id):
+            return None
+        doc = await db["analysis_history"].find_one({"_id": ObjectId(analysis_id), "user_id": user_id})
+        if not doc:
+            return None
+        
+        doc["ai_raw_data"] = self.unpack_ai_raw_data(doc)
+        doc.pop("ai_raw_data_z", None)
+        doc["id"] = str(doc.pop("_id"))
+        return doc
 
 history_service = HistoryService()
@@ -0,0 +1,93 @@
+import logging
+import asyncio
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from typing import List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class LeaderboardService:
+    """
+    Periodically materialized ranking of users_interests.total_checks.
+
+    Every LEADERBOARD_REFRESH_SECONDS the whole collection is read once along
+    the (total_checks, user_id) index into a sorted array. Rank lookups are a
+    binary search over that array and top-N is a slice, so neither touches the
+    database.
+
+    Staleness: a user's own total is always current (it is read together with
+    their profile), but the totals of everyone else are as of the last refresh.
+    A rank can therefore lag other users' activity by at most
+    LEADERBOARD_REFRESH_SECONDS (plus the refresh duration).
+    """
+    def __init__(self):
+        self._totals = array("q") # total_checks of every user, ascending
+        self._top: List[dict] = []
+        self.refreshed_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.refreshed_at is not None
+
+    async def refresh(self, db):
+        cursor = db["users_interests"].find(
+            {}, {"_id": 0, "user_id": 1, "total_checks": 1}
+        ).sort([("total_checks", -1), ("user_id", 1)])
+        
+        totals = array("q")
+        top = []
+        async for doc in cursor:
+            total = doc.get("total_checks", 0)
+            totals.append(total)
+            if len(top) < settings.LEADERBOARD_TOP_N:
+                top.append({"user_id": doc.get("user_id"), "total_checks": total})
+        totals.reverse()
+        
+        # Display names for the top entries only
+        profiles = {}
+        if top:
+            users = await db["users"].find(
+                {"uid": {"$in": [t["user_id"] for t in top]}}, {"_id": 0, "uid": 1, "name": 1, "photo_url": 1}
+            ).to_list(len(top))
+            profiles = {u["uid"]: u for u in users}
+        
+        for entry in top:
+            profile = profiles.get(entry["user_id"], {})
+            entry["name"] = profile.get("name") or "Anonymous"
+            entry["photo_url"] = profile.get("photo_url") or ""
+            entry["rank"] = self._rank_in(totals, entry["total_checks"])
+        
+        # Swap in one step so readers never see a half-built snapshot
+        self._totals, self._top = totals, top
+        self.refreshed_at = datetime.utcnow()
+
+    @staticmethod
+    def _rank_in(totals: array, total_checks: int) -> int:
+        # Same semantics as count_documents({"total_checks": {"$gt": n}}) + 1
+        return len(totals) - bisect_right(totals, total_checks) + 1
+
+    def rank_of(self, total_checks: int) -> Optional[int]:
+        """
+        Rank for a user with the given (current) total_checks, or None before the first refresh.
+        """
+        if not self.ready:
+            return None
+        return self._rank_in(self._totals, total_checks)
+
+    def top(self, limit: int) -> List[dict]:
+        return self._top[:limit]
+
+    async def run(self, get_database):
+        """
+        Background refresh loop, started from the app lifespan.
+        """
+        while True:
+            try:
+                await self.refresh(await get_database())
+            except Exception as e:
+                logger.warning("Leaderboard refresh failed: %s", e)
+            await asyncio.sleep(settings.LEADERBOARD_REFRESH_SECONDS)
+
+leaderboard_service = LeaderboardService()
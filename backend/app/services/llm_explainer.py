@@ -1,19 +1,46 @@
-from groq import Groq
+import logging
 import json
 import re
+import threading
 from app.core.config import settings
+from app.core.metrics import span
+
+logger = logging.getLogger(__name__)
 
 class LLMExplainer:
     def __init__(self):
-        print("Initializing LLMExplainer (Groq)...")
         self.api_key = settings.GROQ_API_KEY
-        self.client = None
-        if self.api_key:
-            try:
-                self.client = Groq(api_key=self.api_key)
-                print("Groq Client initialized successfully.")
-            except Exception as e:
-                print(f"Error initializing Groq Client: {e}")
+        self.base_url = None # SDK default (https://api.groq.com)
+        if settings.USE_MOCK_SERVICES:
+            self.api_key = self.api_key or "mock"
+            self.base_url = f"{settings.MOCK_SERVICES_URL}/groq"
+        self._client = None
+        self._client_ready = False
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        Groq client, built on first use (importing the SDK is slow, so it is
+        kept off the app import path; see preload_dependencies).
+        """
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    if self.api_key:
+                        logger.info("Initializing the Groq client")
+                        try:
+                            from groq import Groq
+                            self._client = Groq(api_key=self.api_key, base_url=self.base_url)
+                        except Exception as e:
+                            logger.error("Could not initialize the Groq client: %s", e)
+                    self._client_ready = True
+        return self._client
+
+    def _complete(self, stage: str, **kwargs):
+        """Groq chat completion, timed as a pipeline stage."""
+        with span(stage):
+            return self.client.chat.completions.create(**kwargs)
 
     def generate_explanation(self, text: str, initial_verdict: str, fact_check: dict, news_coverage: dict, red_flags: list) -> dict:
         """
@@ -21,7 +48,7 @@ class LLMExplainer:
         Returns structured JSON with explanation, dynamic score, tone, and red flags.
         """
         if not self.client:
-            print("Groq Client unavailable. Returning None.")
+            logger.debug("Groq client unavailable, no report generated")
             return None
 
         # Construct the context
@@ -58,7 +85,8 @@ class LLMExplainer:
         """
         
         try:
-            completion = self.client.chat.completions.create(
+            completion = self._complete(
+                "llm_report",
                 model="llama-3.3-70b-versatile", # Latest stable model
                 messages=[
                     {"role": "system", "content": "You are a Senior Editor and Fact Checker. Output ONLY JSON."},
@@ -72,14 +100,14 @@ class LLMExplainer:
             )
             
             response_content = completion.choices[0].message.content
-            print(f"\n[Groq API] Response: {response_content[:200]}...") # LOGGING
+            logger.debug("Groq report response: %.200s", response_content)
             
             # Parse JSON
             parsed_result = json.loads(response_content)
             return parsed_result
             
         except Exception as e:
-            print(f"Groq Analysis Failed: {e}")
+            logger.warning("Groq report failed: %s", e)
             return None
 
     def generate_dashboard_insights(self, history: list) -> dict:
@@ -107,7 +135,8 @@ class LLMExplainer:
         """
         
         try:
-            completion = self.client.chat.completions.create(
+            completion = self._complete(
+                "llm_insights",
                 model="mixtral-8x7b-32768",
                 messages=[{"role": "system", "content": "You are a Data Analyst. Output JSON."}, {"role": "user", "content": prompt}],
                 temperature=0.5,
@@ -115,7 +144,7 @@ class LLMExplainer:
             )
             return json.loads(completion.choices[0].message.content)
         except Exception as e:
-            print(f"Groq Insights Failed: {e}")
+            logger.warning("Groq insights failed: %s", e)
             return None
 
     def chat_with_expert(self, message: str, history: list = []) -> str:
@@ -148,7 +177,8 @@ class LLMExplainer:
         messages.append({"role": "user", "content": message})
         
         try:
-            completion = self.client.chat.completions.create(
+            completion = self._complete(
+                "llm_chat",
                 model="llama-3.3-70b-versatile",
                 messages=messages,
                 temperature=0.7,
@@ -156,7 +186,7 @@ class LLMExplainer:
             )
             return completion.choices[0].message.content
         except Exception as e:
-            print(f"Groq Chat Failed: {e}")
+            logger.warning("Groq chat failed: %s", e)
             return "I encountered an error processing your request."
 
 llm_explainer = LLMExplainer()
@@ -1,13 +1,18 @@
-import requests
+import logging
 import urllib.parse
 from app.core.config import settings
+from app.core.metrics import span
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 class NewsVerifier:
     def __init__(self):
-        print("Initializing NewsVerifier Service...")
         self.api_key = settings.NEWS_API_KEY
         self.base_url = "https://newsapi.org/v2/everything"
+        if settings.USE_MOCK_SERVICES:
+            self.api_key = self.api_key or "mock"
+            self.base_url = f"{settings.MOCK_SERVICES_URL}/newsapi/v2/everything"
         
         # Trusted mainstream domains (Allowlist)
         self.trusted_domains = [
@@ -23,9 +28,11 @@ class NewsVerifier:
         Returns detailed stats on coverage.
         """
         if not self.api_key:
-            print("WARNING: News API Key not found.")
+            logger.debug("NEWS_API_KEY not set, skipping the coverage check")
             return None
 
+        import requests
+
         # Clean query: Remove huge blobs of text, keep first 100 chars or standard keywords
         # For better results, we might want to extract keywords, but for now use the headline/first sentence
         search_query = query[:100]
@@ -46,18 +53,20 @@ class NewsVerifier:
                 # Let's search broadly first, then filter.
             }
             
-            response = requests.get(self.base_url, params=params, timeout=5)
+            with span("news_api") as s:
+                response = requests.get(self.base_url, params=params, timeout=5)
+                if response.status_code != 200:
+                    s.outcome = "http_error"
             
             if response.status_code != 200:
-                print(f"NewsAPI Error: {response.status_code} - {response.text}")
+                logger.warning("NewsAPI returned HTTP %s: %.300s", response.status_code, response.text)
                 return None
                 
             data = response.json()
             articles = data.get("articles", [])
             
             # Analyze results
-            print(f"\n[News API] Raw Response Articles Count: {len(articles)}") # LOGGING
-            # print(f"[News API] First Article: {articles[0] if articles else 'None'}") 
+            logger.debug("NewsAPI returned %d articles", len(articles))
             
             total_matches = len(articles)
             trusted_sources_found = []
@@ -85,8 +94,7 @@ class NewsVerifier:
             }
 
         except Exception as e:
-            print(f"NewsAPI Exception: {e}")
+            logger.warning("NewsAPI request failed: %s", e)
             return None
 
 news_verifier = NewsVerifier()
-print("NewsVerifier Service Ready.")
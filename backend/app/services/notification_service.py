@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class NotificationService:
+    """
+    In-process pub/sub used to wake up clients long-polling for a result
+    that is completed in the background (e.g. a deferred LLM report).
+
+    Waiters live in this worker only: notify() does not reach a client
+    long-polling on another worker. With several workers, pass `ready` to
+    wait_for so the stored state is also polled (REPORT_POLL_INTERVAL_SECONDS).
+    """
+    def __init__(self):
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+
+    async def wait_for(self, key: str, timeout: float, ready: Optional[Callable[[], Awaitable[bool]]] = None,
+                       poll_interval: Optional[float] = None) -> bool:
+        """
+        Wait until `notify(key)` is called, `ready()` returns True or the
+        timeout expires. `ready` is checked right after the waiter is
+        registered (a notify that raced the caller's own read is not missed)
+        and then every `poll_interval` seconds.
+        Returns True if notified or ready.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.setdefault(key, []).append(future)
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                if ready is not None and await ready():
+                    return True
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                step = min(remaining, poll_interval) if ready is not None and poll_interval else remaining
+                try:
+                    # Shielded: a poll step timing out must not cancel the future
+                    await asyncio.wait_for(asyncio.shield(future), timeout=step)
+                    return True
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            waiters = self._waiters.get(key, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(key, None)
+
+    def notify(self, key: str):
+        for future in self._waiters.pop(key, []):
+            if not future.done():
+                future.set_result(True)
+
+notification_service = NotificationService()
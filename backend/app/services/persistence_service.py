@@ -0,0 +1,181 @@
+import logging
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.core.metrics import span
+
+logger = logging.getLogger(__name__)
+
+def interest_update_pipeline(user_id: str, category: str, verdict: str, cred_score: int, created_at: datetime) -> list:
+    """
+    Aggregation-pipeline update applying one analysis to users_interests:
+    counters, streak and last_updated in a single atomic write (no prior read).
+    All expressions see the document as it was before this update.
+    `category` and `verdict` must already be sanitized with counter_key.
+    """
+    today = created_at.strftime("%Y-%m-%d")
+    yesterday = (created_at - timedelta(days=1)).strftime("%Y-%m-%d")
+
+    # Day of the previous check; last_updated may be a date or (legacy) an ISO string
+    last_day = {"$cond": [
+        {"$eq": [{"$type": "$last_updated"}, "date"]},
+        {"$dateToString": {"format": "%Y-%m-%d", "date": "$last_updated"}},
+        {"$substrBytes": [{"$ifNull": ["$last_updated", ""]}, 0, 10]}
+    ]}
+
+    def inc(field, amount=1):
+        return {"$add": [{"$ifNull": [f"${field}", 0]}, amount]}
+
+    return [{"$set": {
+        "user_id": user_id,
+        "streak": {"$switch": {
+            "branches": [
+                {"case": {"$eq": [last_day, today]}, "then": {"$ifNull": ["$streak", 1]}},
+                {"case": {"$eq": [last_day, yesterday]}, "then": inc("streak")}
+            ],
+            "default": 1
+        }},
+        "last_updated": created_at,
+        "total_checks": inc("total_checks"),
+        "total_credibility_score": inc("total_credibility_score", cred_score),
+        f"interests.{category}": inc(f"interests.{category}"),
+        f"verdicts.{verdict}": inc(f"verdicts.{verdict}"), # Read by /history/insights
+        # Only a new document has complete verdict counters; existing ones keep their
+        # version (absent until scripts/backfill_verdict_counters.py has run)
+        "counters_version": {"$cond": [
+            {"$eq": [{"$type": "$total_checks"}, "missing"]},
+            1,
+            {"$ifNull": ["$counters_version", "$$REMOVE"]}
+        ]}
+    }}]
+
+class WriteBehindQueue:
+    """
+    Write-behind stage for the /analyze persistence path.
+
+    Requests enqueue pymongo write models (InsertOne / UpdateOne) and return
+    immediately. A background task flushes them with one bulk_write per
+    collection when WRITE_BEHIND_BATCH_SIZE operations are pending or every
+    WRITE_BEHIND_FLUSH_INTERVAL_MS. Order is preserved per collection
+    (ordered bulk writes), so an update to a just-inserted document is safe.
+
+    Durability: the queue lives in process memory. stop() (called from the app
+    lifespan on shutdown) drains it; a hard crash loses at most the writes of
+    one flush interval. Failed batches are retried WRITE_BEHIND_MAX_RETRIES
+    times before being dropped with an error log.
+    """
+    def __init__(self):
+        self._pending: List[Tuple[str, object, int]] = [] # (collection, operation, attempts)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._db = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def start(self, db):
+        self._db = db
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flusher and drain everything still queued.
+        """
+        if self._task:
+            # Let the loop finish its current flush instead of cancelling it mid-write
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        for _ in range(settings.WRITE_BEHIND_MAX_RETRIES + 1):
+            if not self._pending:
+                break
+            await self.flush()
+        if self._pending:
+            logger.error("Write-behind queue stopped with %d unflushed operations", len(self._pending))
+
+    async def sync(self):
+        """
+        Read-your-writes for endpoints that read data written by /analyze:
+        flush anything still queued before querying. flush() takes the flush
+        lock, so a batch the background task is writing lands first too.
+        """
+        if self.running:
+            await self.flush()
+
+    async def write(self, db, collection: str, operation):
+        """
+        Queue a write, or execute it directly when write-behind is disabled.
+        Applies backpressure (waits for a flush) above WRITE_BEHIND_MAX_PENDING.
+        """
+        if not self.running:
+            await db[collection].bulk_write([operation])
+            return
+
+        self._pending.append((collection, operation, 0))
+        if len(self._pending) >= settings.WRITE_BEHIND_BATCH_SIZE:
+            self._wakeup.set()
+        if len(self._pending) >= settings.WRITE_BEHIND_MAX_PENDING:
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+
+            # Group by collection, keeping the submission order inside each group
+            groups = OrderedDict()
+            for entry in batch:
+                groups.setdefault(entry[0], []).append(entry)
+
+            retry = []
+            for collection, entries in groups.items():
+                try:
+                    with span("db_flush"):
+                        await self._db[collection].bulk_write([op for _, op, _ in entries], ordered=True)
+                except BulkWriteError as e:
+                    # Ordered: everything before the failing op was applied, everything after was not
+                    failed_index = e.details["writeErrors"][0]["index"]
+                    logger.error("Write-behind dropped a %s write: %s", collection, e.details["writeErrors"][0].get("errmsg"))
+                    retry.extend(entries[failed_index + 1:])
+                except Exception as e:
+                    logger.warning("Write-behind flush to %s failed (%d ops): %s", collection, len(entries), e)
+                    retry.extend(entries)
+
+            requeue = []
+            for collection, op, attempts in retry:
+                if attempts + 1 > settings.WRITE_BEHIND_MAX_RETRIES:
+                    logger.error("Write-behind gave up on a %s write after %d attempts", collection, attempts + 1)
+                else:
+                    requeue.append((collection, op, attempts + 1))
+            # Retried writes go first to keep per-collection order
+            self._pending = requeue + self._pending
+
+    async def _run(self):
+        interval = settings.WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush error")
+
+write_behind = WriteBehindQueue()
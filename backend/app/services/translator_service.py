@@ -1,4 +1,22 @@
-from deep_translator import GoogleTranslator
+import logging
+from typing import TYPE_CHECKING
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from deep_translator import GoogleTranslator
+
+def get_translator(source: str, target: str) -> "GoogleTranslator":
+    """
+    Builds a GoogleTranslator, pointed at the local stand-in when mocks are enabled.
+    """
+    from deep_translator import GoogleTranslator
+    translator = GoogleTranslator(source=source, target=target)
+    if settings.USE_MOCK_SERVICES:
+        # deep_translator has no base_url option; it GETs _base_url with the sl/tl/q params
+        translator._base_url = f"{settings.MOCK_SERVICES_URL}/translate/m"
+    return translator
 
 class TranslatorService:
     def translate_text(self, text: str, source: str, target: str) -> str:
@@ -7,10 +25,10 @@ class TranslatorService:
         Source can be 'auto'.
         """
         try:
-            translator = GoogleTranslator(source=source, target=target)
+            translator = get_translator(source, target)
             return translator.translate(text)
         except Exception as e:
-            print(f"Translation Error: {e}")
+            logger.warning("Translation failed: %s", e)
             return f"Error: {str(e)}"
 
 translator_service = TranslatorService()
@@ -0,0 +1,29 @@
+import importlib.util
+import os
+import sys
+from app.core.config import settings
+
+# The backend only uses ai-engine's preprocessing module (it imports nothing
+# but `re`). It is loaded from its file under a private module name, so the
+# ai-engine's generic top-level packages (config, models, pipelines,
+# heuristics) never go on sys.path, where they could shadow other modules.
+_BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+ENGINE_DIR = os.path.normpath(os.path.join(_BACKEND_DIR, settings.AI_ENGINE_DIR))
+_MODULE_NAME = "_ai_engine_preprocessing"
+
+
+def _load_preprocessing():
+    path = os.path.join(ENGINE_DIR, "pipelines", "preprocessing.py")
+    if not os.path.isfile(path):
+        raise ImportError(f"ai-engine preprocessing not found at {path} (check AI_ENGINE_DIR)")
+    spec = importlib.util.spec_from_file_location(_MODULE_NAME, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[_MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+_preprocessing = sys.modules.get(_MODULE_NAME) or _load_preprocessing()
+
+Document = _preprocessing.Document
+as_document = _preprocessing.as_document
+clean_text = _preprocessing.clean_text
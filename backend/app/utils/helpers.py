@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from bson import ObjectId
+
+# --- Counter maps ---
+
+def counter_key(label: str) -> str:
+    """
+    Field name for a label used as a key in a counter map (e.g. users_interests.verdicts).
+    MongoDB field names may not contain '.' or start with '$'.
+    """
+    key = (label or "Unknown").replace(".", "_").replace("$", "_").strip()
+    return key or "Unknown"
+
+def is_fake_verdict(verdict: str) -> bool:
+    # Same rule as the former {"verdict": {"$regex": "Fake|Likely Fake", "$options": "i"}} count
+    return "fake" in (verdict or "").lower()
+
+# --- Keyset pagination ---
+# Pages are ordered by (created_at desc, _id desc). The cursor is an opaque,
+# URL-safe token holding the sort key of the last item of the previous page.
+
+def encode_cursor(created_at: datetime, doc_id: Union[ObjectId, str]) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Union[ObjectId, str]]:
+    """
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(data["t"])
+        doc_id = ObjectId(data["id"]) if ObjectId.is_valid(data["id"]) else data["id"]
+        return created_at, doc_id
+    except Exception:
+        raise ValueError("Invalid pagination cursor.")
+
+def keyset_filter(cursor: Optional[str]) -> dict:
+    """
+    Filter selecting the items after `cursor` in (created_at desc, _id desc) order.
+    Combined with a (..., created_at -1, _id -1) index every page is a bounded index scan.
+    """
+    if not cursor:
+        return {}
+    created_at, doc_id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": doc_id}}
+    ]}
+
+async def fetch_page(collection, query: dict, limit: int, cursor: Optional[str] = None, projection: Optional[dict] = None):
+    """
+    Runs a keyset-paginated find. Returns (docs, next_cursor); next_cursor is None on the last page.
+    """
+    page_filter = keyset_filter(cursor)
+    if page_filter:
+        query = {"$and": [query, page_filter]} if query else page_filter
+
+    # Fetch one extra document to know whether another page exists
+    docs = await collection.find(query, projection).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["created_at"], last["_id"])
+    return docs, next_cursor
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match check (weak comparison, as the header requires).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
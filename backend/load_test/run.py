@@ -0,0 +1,299 @@
+"""
+Scripted load generator for the backend.
+
+Drives /analyze, /history, /history/insights, /blogs, /chat and /users/stats
+with the traffic mix and concurrency stages of a JSON profile (see
+profiles/), then reports throughput, p50/p95/p99 latency and error rates per
+endpoint and per stage. Every run writes a JSON report with the same layout,
+so two runs can be compared with --compare.
+
+Virtual users sign in with load test tokens ("loadtest:<uid>:<secret>"),
+which the backend only accepts with USE_MOCK_SERVICES=true and a matching
+LOAD_TEST_AUTH_SECRET; external APIs are served by mock_services/server.py:
+
+    python -m mock_services.server --port 8100 --seed 42
+    USE_MOCK_SERVICES=true LOAD_TEST_AUTH_SECRET=s3cret uvicorn app.main:app --workers 4
+    python -m load_test.run --profile load_test/profiles/mixed.json --secret s3cret
+    python -m load_test.run --profile load_test/profiles/mixed.json --secret s3cret --compare load_test_report_<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+PROFILES_DIR = os.path.join(os.path.dirname(__file__), "profiles")
+
+CLAIMS = [
+    "The government announced that all schools will close for a month starting next week.",
+    "Scientists confirm drinking hot water every hour cures viral infections.",
+    "The central bank raised interest rates by 25 basis points on Wednesday.",
+    "A viral message claims the new currency notes carry GPS tracking chips.",
+    "NASA launched a new satellite today to monitor global sea levels.",
+    "Doctors hate this one simple trick that reverses ageing overnight!!",
+    "The election commission extended voting hours in three districts due to heavy rain.",
+    "Experts claim a giant asteroid will hit Earth next Friday, mainstream media is silent.",
+]
+CHAT_MESSAGES = [
+    "How can I tell if a news article is fake?",
+    "What are common signs of a manipulated image?",
+    "Why do false stories spread faster than true ones?",
+    "Is this headline clickbait: 'You won't believe what happened next'?",
+]
+
+
+class VirtualUser:
+    """One simulated signed-in user; keeps the feed ETag like a browser would."""
+    def __init__(self, uid: str, secret: str, rng: random.Random):
+        self.uid = uid
+        self.headers = {"Authorization": f"Bearer loadtest:{uid}:{secret}"}
+        self.rng = rng
+        self.feed_etag = None
+
+    async def analyze(self, client):
+        # A random suffix keeps each request a distinct analysis
+        text = f"{self.rng.choice(CLAIMS)} (ref {self.rng.randrange(10**6)})"
+        return await client.post("/api/v1/analyze", json={"text": text}, headers=self.headers)
+
+    async def history(self, client):
+        return await client.get("/api/v1/history/", params={"limit": 20}, headers=self.headers)
+
+    async def history_insights(self, client):
+        return await client.get("/api/v1/history/insights", headers=self.headers)
+
+    async def blogs(self, client):
+        headers = dict(self.headers)
+        if self.feed_etag:
+            headers["If-None-Match"] = self.feed_etag
+        response = await client.get("/api/v1/blogs", params={"limit": 20}, headers=headers)
+        self.feed_etag = response.headers.get("etag", self.feed_etag)
+        return response
+
+    async def chat(self, client):
+        return await client.post("/api/v1/chat", json={"message": self.rng.choice(CHAT_MESSAGES), "history": []}, headers=self.headers)
+
+    async def user_stats(self, client):
+        return await client.get("/api/v1/users/stats", headers=self.headers)
+
+ENDPOINTS = {
+    "analyze": "POST /analyze",
+    "history": "GET /history",
+    "history_insights": "GET /history/insights",
+    "blogs": "GET /blogs",
+    "chat": "POST /chat",
+    "user_stats": "GET /users/stats",
+}
+
+
+def classify(status: int) -> str:
+    """ok (2xx/3xx, incl. 304), shed (429 rate limited / 503 busy) or error (0 = connection error / timeout)."""
+    if status in (429, 503):
+        return "shed"
+    if 0 < status < 400:
+        return "ok"
+    return "error"
+
+
+async def run_stage(client, stage: dict, profile: dict, users: List[VirtualUser], rng: random.Random, records: list):
+    """
+    Closed-loop workers for one stage. Concurrency ramps linearly from
+    ramp_from (default: concurrency, i.e. a step) to concurrency over the stage.
+    """
+    duration = stage["duration_s"]
+    concurrency = stage["concurrency"]
+    ramp_from = min(stage.get("ramp_from", concurrency), concurrency)
+    names = list(profile["mix"])
+    weights = [profile["mix"][name] for name in names]
+    think_min, think_max = profile.get("think_time_ms", [0, 0])
+    timeout = profile.get("request_timeout_s", 30)
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker(index: int):
+        # Workers beyond ramp_from join at evenly spaced points of the stage
+        if index >= ramp_from:
+            await asyncio.sleep((index - ramp_from + 1) / (concurrency - ramp_from + 1) * duration)
+        while time.perf_counter() < deadline:
+            user = rng.choice(users)
+            name = rng.choices(names, weights)[0]
+            sent = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(getattr(user, name)(client), timeout)
+                status = response.status_code
+            except Exception:
+                status = 0
+            records.append({
+                "endpoint": name, "stage": stage["name"], "status": status,
+                "latency": time.perf_counter() - sent, "at": sent - start,
+            })
+            if think_max:
+                await asyncio.sleep(rng.uniform(think_min, think_max) / 1000)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return time.perf_counter() - start
+
+
+def percentile(sorted_values: list, p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))] * 1000, 1)
+
+
+def summarize(records: list, elapsed: float) -> dict:
+    latencies = sorted(r["latency"] for r in records)
+    outcomes = [classify(r["status"]) for r in records]
+    count = len(records)
+    statuses = {}
+    for r in records:
+        statuses[str(r["status"])] = statuses.get(str(r["status"]), 0) + 1
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "error_rate": round(outcomes.count("error") / count, 4) if count else 0,
+        "shed_rate": round(outcomes.count("shed") / count, 4) if count else 0,
+        "statuses": statuses,
+    }
+
+
+def build_report(records: list, stage_times: Dict[str, float], meta: dict) -> dict:
+    total = sum(stage_times.values())
+    report = {"meta": meta, "overall": summarize(records, total), "endpoints": {}, "stages": {}}
+    for name in ENDPOINTS:
+        selected = [r for r in records if r["endpoint"] == name]
+        if selected:
+            report["endpoints"][name] = summarize(selected, total)
+    for stage, elapsed in stage_times.items():
+        selected = [r for r in records if r["stage"] == stage]
+        report["stages"][stage] = {
+            "overall": summarize(selected, elapsed),
+            "endpoints": {
+                name: summarize([r for r in selected if r["endpoint"] == name], elapsed)
+                for name in ENDPOINTS if any(r["endpoint"] == name for r in selected)
+            },
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(f"\n{'endpoint':20} {'requests':>9} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8} {'shed':>8}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        print(f"{ENDPOINTS.get(name, name):20} {s['requests']:9d} {s['throughput_rps']:8.1f} "
+              f"{s['p50_ms'] or 0:9.1f} {s['p95_ms'] or 0:9.1f} {s['p99_ms'] or 0:9.1f} "
+              f"{s['error_rate']:8.2%} {s['shed_rate']:8.2%}")
+    print("\nPer stage:")
+    for stage, s in report["stages"].items():
+        o = s["overall"]
+        print(f"  {stage:18} {o['requests']:7d} req {o['throughput_rps']:8.1f} rps  p95 {o['p95_ms'] or 0:8.1f} ms  errors {o['error_rate']:.2%}  shed {o['shed_rate']:.2%}")
+
+
+def print_comparison(report: dict, previous: dict):
+    """Per-endpoint deltas against an earlier report (same profile expected)."""
+    if previous["meta"].get("profile_name") != report["meta"].get("profile_name"):
+        print(f"\nWARNING: comparing different profiles ({previous['meta'].get('profile_name')} vs {report['meta'].get('profile_name')})")
+    print(f"\nCompared with {previous['meta'].get('timestamp')} (commit {previous['meta'].get('git_commit')}):")
+    print(f"{'endpoint':20} {'rps':>18} {'p95 ms':>20} {'p99 ms':>20} {'errors':>18}")
+    rows = [(name, report["endpoints"][name], previous["endpoints"].get(name)) for name in report["endpoints"]]
+    rows.append(("overall", report["overall"], previous["overall"]))
+    for name, new, old in rows:
+        if old is None:
+            continue
+        print(f"{ENDPOINTS.get(name, name):20} "
+              f"{old['throughput_rps']:8.1f} -> {new['throughput_rps']:6.1f} "
+              f"{old['p95_ms'] or 0:9.1f} -> {new['p95_ms'] or 0:7.1f} "
+              f"{old['p99_ms'] or 0:9.1f} -> {new['p99_ms'] or 0:7.1f} "
+              f"{old['error_rate']:7.2%} -> {new['error_rate']:6.2%}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+async def seed_posts(client, users: List[VirtualUser], count: int):
+    """Creates community posts so /blogs serves a realistic feed."""
+    for i in range(count):
+        user = users[i % len(users)]
+        await client.post("/api/v1/blogs", json={
+            "title": f"Load test post {i}", "content": CLAIMS[i % len(CLAIMS)], "category": "General"
+        }, headers=user.headers)
+
+
+async def run_load(client, profile: dict, secret: str, seed: int = 42, seed_posts_count: int = 0) -> dict:
+    """Runs every stage of the profile against `client` and returns the report."""
+    rng = random.Random(seed)
+    users = [VirtualUser(f"lt-user-{i}", secret, random.Random(f"{seed}:{i}")) for i in range(profile.get("users", 100))]
+    if seed_posts_count:
+        await seed_posts(client, users, seed_posts_count)
+
+    records, stage_times = [], {}
+    for stage in profile["stages"]:
+        print(f"Stage {stage['name']}: {stage['duration_s']}s at concurrency {stage.get('ramp_from', stage['concurrency'])} -> {stage['concurrency']}")
+        stage_times[stage["name"]] = await run_stage(client, stage, profile, users, rng, records)
+
+    meta = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "git_commit": git_commit(),
+        "base_url": str(client.base_url),
+        "profile_name": profile.get("name"),
+        "profile": profile,
+        "seed": seed,
+    }
+    return build_report(records, stage_times, meta)
+
+
+async def main(args):
+    with open(args.profile) as f:
+        profile = json.load(f)
+    profile.setdefault("name", os.path.splitext(os.path.basename(args.profile))[0])
+    if args.duration_scale != 1:
+        for stage in profile["stages"]:
+            stage["duration_s"] = stage["duration_s"] * args.duration_scale
+
+    limits = httpx.Limits(max_connections=max(s["concurrency"] for s in profile["stages"]) + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=None) as client:
+        report = await run_load(client, profile, args.secret, seed=args.seed, seed_posts_count=args.seed_posts)
+        if args.mock_url:
+            try:
+                report["meta"]["mock_services"] = (await client.get(f"{args.mock_url}/_stats")).json()
+            except Exception as e:
+                print(f"Could not read mock service stats: {e}")
+
+    print_report(report)
+    out = args.out or f"load_test_report_{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the backend with a scripted traffic mix.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--profile", default=os.path.join(PROFILES_DIR, "mixed.json"), help="Traffic mix and concurrency stages (JSON)")
+    parser.add_argument("--secret", default=os.getenv("LOAD_TEST_AUTH_SECRET", ""), help="The backend's LOAD_TEST_AUTH_SECRET")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for user/endpoint/payload choices")
+    parser.add_argument("--seed-posts", type=int, default=0, help="Create this many community posts before the run")
+    parser.add_argument("--duration-scale", type=float, default=1.0, help="Multiply every stage duration (e.g. 0.1 for a smoke run)")
+    parser.add_argument("--mock-url", default="http://127.0.0.1:8100", help="mock_services URL, to include its /_stats in the report ('' to skip)")
+    parser.add_argument("--out", help="Report path (default: load_test_report_<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args()
+    if not args.secret:
+        sys.exit("--secret (or LOAD_TEST_AUTH_SECRET) is required")
+    asyncio.run(main(args))
@@ -0,0 +1,260 @@
+"""
+Local stand-ins for the third-party APIs used by the backend, for offline
+load testing. Response shapes mirror what the services actually parse:
+
+*   Google Fact Check  -> GET  /factcheck/v1alpha1/claims:search   (FactChecker)
+*   NewsAPI            -> GET  /newsapi/v2/everything              (NewsVerifier)
+*   Groq (OpenAI API)  -> POST /groq/openai/v1/chat/completions    (LLMExplainer)
+*   Google Translate   -> GET  /translate/m                        (GoogleTranslator)
+
+Each service has its own latency distribution, error rate and rate limit,
+loaded from a JSON profile (see profiles/default.json). Run with:
+
+    python -m mock_services.server --port 8100 --profile mock_services/profiles/default.json --seed 42
+
+and start the backend with USE_MOCK_SERVICES=true.
+"""
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+
+DEFAULT_PROFILE = {
+    "factcheck": {"latency": {"distribution": "lognormal", "median_ms": 180, "sigma": 0.4}, "error_rate": 0.01, "rate_limit_per_second": 0, "burst": 0, "match_rate": 0.4},
+    "newsapi": {"latency": {"distribution": "lognormal", "median_ms": 250, "sigma": 0.5}, "error_rate": 0.01, "rate_limit_per_second": 0, "burst": 0},
+    "groq": {"latency": {"distribution": "lognormal", "median_ms": 1200, "sigma": 0.35}, "error_rate": 0.02, "rate_limit_per_second": 0, "burst": 0},
+    "translate": {"latency": {"distribution": "uniform", "min_ms": 40, "max_ms": 120}, "error_rate": 0.0, "rate_limit_per_second": 0, "burst": 0},
+}
+
+TRUSTED_SOURCES = [
+    ("Reuters", "https://www.reuters.com"), ("BBC News", "https://www.bbc.co.uk/news"),
+    ("Associated Press", "https://apnews.com"), ("The Hindu", "https://www.thehindu.com"),
+]
+OTHER_SOURCES = [
+    ("Daily Buzz", "https://dailybuzz.example"), ("Viral Now", "https://viralnow.example"),
+    ("Blog Wire", "https://blogwire.example"),
+]
+RATINGS = ["False", "True", "Misleading", "Partly false", "Missing context", "Correct"]
+
+
+class TokenBucket:
+    """Simple token bucket. rate <= 0 disables limiting."""
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(burst, rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Returns 0 if a token was taken, otherwise the seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class MockService:
+    def __init__(self, name: str, profile: dict, rng: random.Random):
+        self.name = name
+        self.profile = profile
+        self.rng = rng
+        self.bucket = TokenBucket(profile.get("rate_limit_per_second", 0), profile.get("burst", 0))
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "latency_ms_total": 0.0}
+
+    def sample_latency(self) -> float:
+        """Latency in seconds drawn from the configured distribution."""
+        spec = self.profile.get("latency", {})
+        kind = spec.get("distribution", "constant")
+        if kind == "constant":
+            ms = spec.get("ms", 0)
+        elif kind == "uniform":
+            ms = self.rng.uniform(spec.get("min_ms", 0), spec.get("max_ms", 0))
+        elif kind == "normal":
+            ms = self.rng.gauss(spec.get("mean_ms", 0), spec.get("stddev_ms", 0))
+        elif kind == "lognormal":
+            # median = exp(mu)
+            ms = spec.get("median_ms", 0) * self.rng.lognormvariate(0, spec.get("sigma", 0.0))
+        elif kind == "exponential":
+            mean = spec.get("mean_ms", 0)
+            ms = self.rng.expovariate(1.0 / mean) if mean > 0 else 0
+        else:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return max(ms, 0) / 1000.0
+
+    async def gate(self) -> Optional[JSONResponse]:
+        """
+        Applies rate limit, latency and error injection.
+        Returns an error response to send, or None to continue.
+        """
+        self.stats["requests"] += 1
+        retry_after = self.bucket.take()
+        if retry_after:
+            self.stats["throttled"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": {"message": "Rate limit exceeded (mock)", "code": 429}},
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+
+        latency = self.sample_latency()
+        self.stats["latency_ms_total"] += latency * 1000
+        await asyncio.sleep(latency)
+
+        if self.rng.random() < self.profile.get("error_rate", 0.0):
+            self.stats["errors"] += 1
+            status = self.profile.get("error_status", 503)
+            return JSONResponse(status_code=status, content={"error": {"message": "Injected failure (mock)", "code": status}})
+        return None
+
+
+def _seed_for(text: str) -> int:
+    # Stable per-query randomness so the same input gets the same payload
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def create_app(profile: Dict[str, dict], seed: int = 0) -> FastAPI:
+    rng = random.Random(seed)
+    services = {name: MockService(name, {**defaults, **profile.get(name, {})}, rng) for name, defaults in DEFAULT_PROFILE.items()}
+
+    app = FastAPI(title="AI Fake News Detector - Mock Services")
+
+    @app.get("/factcheck/v1alpha1/claims:search")
+    async def factcheck(query: str = "", languageCode: str = "en", key: str = ""):
+        service = services["factcheck"]
+        error = await service.gate()
+        if error:
+            return error
+
+        local = random.Random(_seed_for(query))
+        if local.random() >= service.profile.get("match_rate", 0.4):
+            return {}
+
+        rating = local.choice(RATINGS)
+        return {
+            "claims": [{
+                "text": query[:200],
+                "claimant": "Social media posts",
+                "claimDate": (datetime.utcnow() - timedelta(days=local.randint(1, 60))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "claimReview": [{
+                    "publisher": {"name": "Mock Fact Check", "site": "factcheck.example"},
+                    "url": f"https://factcheck.example/review/{_seed_for(query)}",
+                    "title": f"Fact check: {query[:60]}",
+                    "reviewDate": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "textualRating": rating,
+                    "languageCode": languageCode,
+                }],
+            }]
+        }
+
+    @app.get("/newsapi/v2/everything")
+    async def newsapi(q: str = "", pageSize: int = 10, apiKey: str = "", language: str = "en", sortBy: str = "relevance"):
+        error = await services["newsapi"].gate()
+        if error:
+            return error
+
+        local = random.Random(_seed_for(q))
+        total = local.randint(0, pageSize)
+        articles = []
+        for i in range(total):
+            name, base = local.choice(TRUSTED_SOURCES if local.random() < 0.5 else OTHER_SOURCES)
+            articles.append({
+                "source": {"id": None, "name": name},
+                "author": "Mock Reporter",
+                "title": f"{q[:80]} ({i + 1})",
+                "description": f"Coverage of: {q[:120]}",
+                "url": f"{base}/article/{_seed_for(q)}-{i}",
+                "urlToImage": f"{base}/images/{i}.jpg",
+                "publishedAt": (datetime.utcnow() - timedelta(hours=local.randint(1, 240))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "content": f"{q[:200]} ... [+{local.randint(200, 4000)} chars]",
+            })
+        return {"status": "ok", "totalResults": total, "articles": articles}
+
+    @app.post("/groq/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        error = await services["groq"].gate()
+        if error:
+            return error
+
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        local = random.Random(_seed_for(prompt))
+
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps({
+                "reasoning_summary": "Mock report: the claim was checked against the available evidence.",
+                "verdict": local.choice(["Real", "Likely Fake", "Partially True"]),
+                "category": local.choice(["Politics", "Health", "Technology", "Entertainment", "Business", "General"]),
+                "confidence_score": local.randint(0, 100),
+                "warnings": ["Mock warning: verify with primary sources."],
+                "tone_analysis": {"subjectivity": round(local.random(), 2), "polarity": round(local.random(), 2)},
+            })
+        else:
+            content = "This is a mock reply from the local Groq stand-in."
+
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+        completion_tokens = len(content.split())
+        return {
+            "id": f"chatcmpl-mock-{_seed_for(prompt)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "logprobs": None, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    @app.get("/translate/m", response_class=HTMLResponse)
+    async def translate(q: str = "", sl: str = "auto", tl: str = "en"):
+        error = await services["translate"].gate()
+        if error:
+            return error
+        # Echo the input: GoogleTranslator scrapes the result-container div
+        return f'<html><body><div class="result-container">{html.escape(q)}</div></body></html>'
+
+    @app.get("/_stats")
+    async def stats():
+        return {name: service.stats for name, service in services.items()}
+
+    @app.post("/_reset")
+    async def reset():
+        for service in services.values():
+            service.stats = {"requests": 0, "errors": 0, "throttled": 0, "latency_ms_total": 0.0}
+        return {"message": "Stats reset"}
+
+    return app
+
+
+def load_profile(path: Optional[str]) -> Dict[str, dict]:
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the local third-party API stand-ins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--profile", help="JSON file with per-service latency/error/rate-limit settings")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and error sampling")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(load_profile(args.profile), seed=args.seed), host=args.host, port=args.port, log_level="warning")
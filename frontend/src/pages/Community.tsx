@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Button, Form, Modal, Badge, Spinner, Alert } from 'react-bootstrap';
 import { MessageSquare, Heart, Send, Plus, Calendar, User } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { getPosts, createPost, addComment, likePost, BlogPost } from '../services/api';
+import { getPosts, createPost, addComment, getComments, likePost, BlogPost, Comment } from '../services/api';
 import { useAuth } from '../contexts/AuthContext';
 
 const CATEGORIES = ["Politics", "Health", "Technology", "Entertainment", "Business", "General"];
@@ -13,6 +13,7 @@ const Community = () => {
     const [loading, setLoading] = useState(true);
     const [showCreateModal, setShowCreateModal] = useState(false);
     const [selectedPost, setSelectedPost] = useState<BlogPost | null>(null);
+    const [thread, setThread] = useState<Comment[] | null>(null);
 
     // Form States
     const [newTitle, setNewTitle] = useState('');
@@ -26,6 +27,20 @@ const Community = () => {
         loadPosts();
     }, []);
 
+    useEffect(() => {
+        setThread(null);
+        if (selectedPost) loadThread(selectedPost._id);
+    }, [selectedPost?._id]);
+
+    const loadThread = async (postId: string) => {
+        try {
+            const { comments } = await getComments(postId);
+            setThread([...comments].reverse()); // Oldest first, like the preview
+        } catch (error) {
+            console.error("Failed to load comments", error);
+        }
+    };
+
     const loadPosts = async () => {
         try {
             const data = await getPosts();
@@ -37,6 +52,8 @@ const Community = () => {
         }
     };
 
+    const isLiked = (post: BlogPost) => post.liked ?? post.liked_by?.includes(currentUser?.uid || '');
+
     const handleLike = async (e: React.MouseEvent, postId: string) => {
         e.stopPropagation(); // Prevent opening modal
         try {
@@ -72,10 +89,11 @@ const Community = () => {
 
         setActionLoading(true);
         try {
-            const updatedPost = await addComment(selectedPost._id, newComment);
+            const updatedPost = { ...await addComment(selectedPost._id, newComment), liked: posts.find(p => p._id === selectedPost._id)?.liked };
             // Update in local list
             setPosts(posts.map(p => p._id === updatedPost._id ? updatedPost : p));
             setSelectedPost(updatedPost); // Update modal view
+            await loadThread(updatedPost._id);
             setNewComment('');
         } catch (error) {
             console.error("Failed to add comment", error);
@@ -152,14 +170,14 @@ const Community = () => {
                                                     >
                                                         <Heart
                                                             size={16}
-                                                            className={post.liked_by?.includes(currentUser?.uid || '') ? "text-danger fill-danger" : ""}
-                                                            fill={post.liked_by?.includes(currentUser?.uid || '') ? "currentColor" : "none"}
+                                                            className={isLiked(post) ? "text-danger fill-danger" : ""}
+                                                            fill={isLiked(post) ? "currentColor" : "none"}
                                                         />
                                                         <span className="small">{post.likes}</span>
                                                     </div>
                                                     <div className="d-flex align-items-center gap-1 text-muted">
                                                         <MessageSquare size={16} />
-                                                        <span className="small">{post.comments?.length || 0}</span>
+                                                        <span className="small">{post.comment_count ?? post.comments?.length ?? 0}</span>
                                                     </div>
                                                 </div>
                                             </div>
@@ -264,14 +282,14 @@ const Community = () => {
 
                                 <div className="mb-4 bg-dark bg-opacity-25 rounded-4 p-4 border border-white border-opacity-5">
                                     <div className="d-flex justify-content-between align-items-center mb-4">
-                                        <h5 className="fw-bold mb-0">Discussions ({selectedPost.comments?.length || 0})</h5>
+                                        <h5 className="fw-bold mb-0">Discussions ({selectedPost.comment_count ?? selectedPost.comments?.length ?? 0})</h5>
                                         <Badge bg="info" className="bg-opacity-10 text-info border border-info border-opacity-25 px-3 py-1">Active Topic</Badge>
                                     </div>
 
                                     <div className="comment-thread pe-2" style={{ maxHeight: '400px', overflowY: 'auto' }}>
-                                        {selectedPost.comments?.map((c, i) => (
+                                        {(thread ?? selectedPost.comments)?.map((c, i) => (
                                             <motion.div
-                                                key={i}
+                                                key={c.id ?? i}
                                                 initial={{ opacity: 0, x: -10 }}
                                                 animate={{ opacity: 1, x: 0 }}
                                                 className="mb-3 p-3 bg-dark bg-opacity-25 rounded-4 border border-white border-opacity-5"
@@ -285,7 +303,7 @@ const Community = () => {
                                                 <p className="mb-0 small text-light opacity-75 lh-base">{c.content}</p>
                                             </motion.div>
                                         ))}
-                                        {(!selectedPost.comments || selectedPost.comments.length === 0) && (
+                                        {(thread ?? selectedPost.comments ?? []).length === 0 && (
                                             <div className="text-center py-5 text-muted">
                                                 <MessageSquare size={40} className="opacity-10 mb-3" />
                                                 <p>Be the first to share your thoughts!</p>
@@ -67,6 +67,7 @@ export const chatWithBot = async (message: string, history: any[] = []) => {
 
 // --- Blogs / Community API ---
 export interface Comment {
+    id?: string;
     user_id: string;
     username: string;
     content: string;
@@ -86,8 +87,10 @@ export interface BlogPost {
     };
     created_at: string;
     likes: number;
-    liked_by: string[];
-    comments: Comment[];
+    liked_by: string[]; // Most recent likers only
+    liked?: boolean; // Whether the signed-in user likes the post
+    comments: Comment[]; // Latest few only; the full thread comes from getComments
+    comment_count?: number;
 }
 
 export const getPosts = async () => {
@@ -105,6 +108,12 @@ export const addComment = async (postId: string, content: string) => {
     return response.data;
 };
 
+// Newest first; pass the X-Next-Cursor header value to get older comments
+export const getComments = async (postId: string, limit: number = 100, cursor?: string) => {
+    const response = await api.get<Comment[]>(`/blogs/${postId}/comments`, { params: { limit, cursor } });
+    return { comments: response.data, nextCursor: response.headers['x-next-cursor'] as string | undefined };
+};
+
 export const likePost = async (postId: string) => {
     const response = await api.post<BlogPost>(`/blogs/${postId}/like`);
     return response.data;
@@ -0,0 +1,65 @@
+"""
+One-off backfill of users_interests.verdicts (per-user verdict counters used by
+GET /history/insights) from the existing analysis_history documents.
+
+    python scripts/backfill_verdict_counters.py            # all users still on counters_version < 1
+    python scripts/backfill_verdict_counters.py --all      # recompute every user
+
+Each user is rewritten with a single $set of the recomputed map and
+counters_version=1, so the job is idempotent and can be resumed. An /analyze
+call for the same user landing between the aggregation and the $set is not
+counted; run it during low traffic or re-run with --all afterwards.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Ensure backend directory is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.utils.helpers import counter_key
+
+
+async def backfill_user(db, user_id: str) -> dict:
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": "$verdict", "count": {"$sum": 1}}},
+    ]
+    verdicts = {}
+    async for row in db["analysis_history"].aggregate(pipeline):
+        key = counter_key(row["_id"])
+        verdicts[key] = verdicts.get(key, 0) + row["count"]
+
+    await db["users_interests"].update_one(
+        {"user_id": user_id},
+        {"$set": {"verdicts": verdicts, "counters_version": 1}}
+    )
+    return verdicts
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    try:
+        query = {} if args.all else {"counters_version": {"$not": {"$gte": 1}}}
+        done = 0
+        async for doc in db["users_interests"].find(query, {"_id": 0, "user_id": 1}):
+            verdicts = await backfill_user(db, doc["user_id"])
+            done += 1
+            if args.verbose:
+                print(f"{doc['user_id']}: {verdicts}")
+        print(f"Backfilled verdict counters for {done} users.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill per-user verdict counters.")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db", default=settings.DB_NAME)
+    parser.add_argument("--all", action="store_true", help="Recompute users that already have counters")
+    parser.add_argument("--verbose", action="store_true")
+    asyncio.run(main(parser.parse_args()))
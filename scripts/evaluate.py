@@ -0,0 +1,398 @@
+"""
+Offline evaluation of the credibility scoring over a labeled corpus.
+
+Streams a JSONL or CSV file (fields: id (optional), text, url (optional),
+label) through a process pool and scores every item with:
+
+*   engine:  ai-engine's detect_fake_news (heuristics + zero-shot classifier)
+*   backend: the scoring logic of perform_analysis (score_content and the
+    score-based verdict; the Groq report only with --with-llm)
+
+Results are appended to <out-dir>/results.jsonl as they complete, so an
+interrupted run resumes where it stopped (--fresh starts over). External
+lookups (Fact Check, NewsAPI, translation, scraping, Groq) go through a
+record/replay cache, so a corpus can be re-scored offline and
+deterministically after changing weights or thresholds:
+
+    python scripts/evaluate.py data/claims.jsonl --out-dir eval/base --lookups record
+    python scripts/evaluate.py data/claims.jsonl --out-dir eval/tuned --lookups replay --cache-dir eval/base/lookups
+
+Writes <out-dir>/summary.json with accuracy, calibration (Brier score, ECE,
+reliability table), per-verdict confusion, per-item latency percentiles and
+the run's throughput.
+"""
+import argparse
+import asyncio
+import copy
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+ENGINE_DIR = os.path.join(ROOT_DIR, "ai-engine")
+
+REAL_LABELS = {"real", "true", "reliable", "legit", "1"}
+FAKE_LABELS = {"fake", "false", "likely fake", "hoax", "0"}
+MIXED_LABELS = {"mixed", "partially true", "half-true", "misleading"}
+
+
+def normalize_label(label) -> str:
+    value = str(label).strip().lower()
+    if value in REAL_LABELS:
+        return "real"
+    if value in FAKE_LABELS:
+        return "fake"
+    if value in MIXED_LABELS:
+        return "mixed"
+    return "unknown"
+
+
+def read_dataset(path: str):
+    """Yields {"id", "text", "url", "label"} one item at a time (JSONL or CSV)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f) if path.lower().endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        for index, row in enumerate(rows):
+            yield {
+                "id": str(row.get("id") or index),
+                "text": row.get("text") or "",
+                "url": row.get("url") or "",
+                "label": row.get("label", ""),
+            }
+
+
+class LookupCache:
+    """
+    Record/replay cache for external lookups, keyed by service + arguments.
+
+    live:   call the services, store nothing
+    record: serve recorded entries, call (and record) the rest
+    replay: never call out; a miss returns the service's "unavailable" value
+    Each worker process appends to its own lookups-<pid>.jsonl file.
+    """
+    def __init__(self, directory: str, mode: str):
+        self.mode = mode
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._file = None
+        if mode == "live":
+            return
+        # Workers can record the same lookup; prefer a successful result over a
+        # failed one (None), then the first file in name order, so replays agree
+        for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if self.entries.get(entry["key"]) is None:
+                            self.entries[entry["key"]] = entry["result"]
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(os.path.join(directory, f"lookups-{os.getpid()}.jsonl"), "a", encoding="utf-8")
+
+    def wrap(self, service: str, fn, on_miss):
+        def lookup(*args):
+            if self.mode == "live":
+                return fn(*args)
+            key = service + ":" + hashlib.sha256(json.dumps(args, default=str).encode()).hexdigest()
+            if key in self.entries:
+                self.hits += 1
+                return copy.deepcopy(self.entries[key])
+            self.misses += 1
+            if self.mode == "replay":
+                return on_miss(*args)
+            result = fn(*args)
+            self.entries[key] = result
+            self._file.write(json.dumps({"key": key, "service": service, "result": result}, default=str) + "\n")
+            self._file.flush()
+            return result
+        return lookup
+
+
+def _raise_unrecorded(url):
+    raise RuntimeError(f"No recorded scrape for {url}")
+
+
+# Worker process state (set up once per process by _init_worker)
+_state = {}
+
+def _init_worker(systems: list, engine_classifier: str, lookups: str, cache_dir: str, with_llm: bool):
+    sys.path.append(BACKEND_DIR)
+    sys.path.append(ENGINE_DIR)
+    cache = LookupCache(cache_dir, lookups)
+    _state.update(systems=systems, with_llm=with_llm, cache=cache, loop=asyncio.new_event_loop())
+
+    if "engine" in systems:
+        from pipelines import detector
+        if engine_classifier == "mock":
+            detector._classifier = lambda text, candidate_labels: {
+                "labels": candidate_labels, "scores": [1.0 / len(candidate_labels)] * len(candidate_labels)
+            }
+        else:
+            detector.get_classifier() # Load the model once per process, not on the first timed item
+        _state["detector"] = detector
+
+    if "backend" in systems:
+        from app.services import analysis_service
+        from app.services.fact_checker import fact_checker
+        from app.services.news_verifier import news_verifier
+        from app.services.llm_explainer import llm_explainer
+        fact_checker.verify_claim = cache.wrap("fact_check", fact_checker.verify_claim, lambda query: None)
+        news_verifier.verify_news_presence = cache.wrap("news_api", news_verifier.verify_news_presence, lambda query: None)
+        llm_explainer.generate_explanation = cache.wrap("llm_report", llm_explainer.generate_explanation, lambda *args: None)
+        analysis_service.translate_and_clean = cache.wrap(
+            "translate", analysis_service.translate_and_clean,
+            lambda text: {"text": text.strip(), "original": None, "is_translated": False}
+        )
+        analysis_service.extract_text_from_url = cache.wrap("scrape", analysis_service.extract_text_from_url, _raise_unrecorded)
+        _state["analysis_service"] = analysis_service
+
+
+def _score_engine(item: dict) -> dict:
+    result = _state["detector"].detect_fake_news(item["text"], item["url"])
+    return {"score": result["credibility_score"], "verdict": result["verdict"], "tier": result.get("ml_breakdown", {}).get("tier")}
+
+
+def _score_backend(item: dict) -> dict:
+    analysis_service = _state["analysis_service"]
+    scored = _state["loop"].run_until_complete(analysis_service.score_content(item["text"], item["url"]))
+    if _state["with_llm"]:
+        result = analysis_service.build_result(scored, analysis_service.generate_report(scored))
+        return {"score": result["credibility_score"], "verdict": result["verdict"]}
+    return {"score": scored["final_score"], "verdict": analysis_service.verdict_from_score(scored["final_score"])}
+
+SCORERS = {"engine": _score_engine, "backend": _score_backend}
+
+
+def evaluate_chunk(items: list) -> dict:
+    """Runs in a worker: scores each item with every system, timing each call."""
+    cache = _state["cache"]
+    hits, misses = cache.hits, cache.misses
+    results = []
+    for item in items:
+        outcome = {"id": item["id"], "label": item["label"], "systems": {}}
+        for system in _state["systems"]:
+            start = time.perf_counter()
+            try:
+                scored = SCORERS[system](item)
+                scored["error"] = None
+            except Exception as e:
+                scored = {"score": None, "verdict": None, "error": str(getattr(e, "detail", e))[:300]}
+            scored["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            outcome["systems"][system] = scored
+        results.append(outcome)
+    return {"results": results, "lookup_hits": cache.hits - hits, "lookup_misses": cache.misses - misses}
+
+
+def percentile(sorted_values: list, p: float):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))], 3)
+
+
+def system_metrics(rows: list, system: str, threshold: float, bins: int) -> dict:
+    scored = [r for r in rows if r["systems"].get(system, {}).get("score") is not None]
+    latencies = sorted(r["systems"][system]["latency_ms"] for r in rows if system in r["systems"])
+
+    # 1. Accuracy on items labeled real/fake; score >= threshold predicts real
+    binary = [(normalize_label(r["label"]), r["systems"][system]["score"]) for r in scored]
+    binary = [(gold, score) for gold, score in binary if gold in ("real", "fake")]
+    correct = sum((score >= threshold) == (gold == "real") for gold, score in binary)
+    true_fake = sum(gold == "fake" and score < threshold for gold, score in binary)
+    predicted_fake = sum(score < threshold for _, score in binary)
+    actual_fake = sum(gold == "fake" for gold, _ in binary)
+    precision = true_fake / predicted_fake if predicted_fake else None
+    recall = true_fake / actual_fake if actual_fake else None
+
+    # 2. Calibration: score / 100 read as P(real)
+    brier = sum((score / 100 - (gold == "real")) ** 2 for gold, score in binary) / len(binary) if binary else None
+    table = []
+    for b in range(bins):
+        low, high = b / bins, (b + 1) / bins
+        members = [(gold, score / 100) for gold, score in binary if low <= score / 100 < high or (b == bins - 1 and score == 100)]
+        if members:
+            table.append({
+                "bin": f"{low:.1f}-{high:.1f}",
+                "count": len(members),
+                "mean_confidence": round(sum(p for _, p in members) / len(members), 4),
+                "observed_real_rate": round(sum(gold == "real" for gold, _ in members) / len(members), 4),
+            })
+    ece = sum(row["count"] * abs(row["mean_confidence"] - row["observed_real_rate"]) for row in table) / len(binary) if binary else None
+
+    # 3. Cascade routing (engine with CASCADE_ENABLED): share of items the linear tier could not decide
+    tiers = [r["systems"][system].get("tier") for r in scored if r["systems"][system].get("tier")]
+    escalation_rate = sum(tier == "transformer" for tier in tiers) / len(tiers) if tiers else None
+
+    # 4. Gold label x predicted verdict
+    confusion = {}
+    for r in scored:
+        row = confusion.setdefault(normalize_label(r["label"]), {})
+        verdict = r["systems"][system]["verdict"]
+        row[verdict] = row.get(verdict, 0) + 1
+
+    return {
+        "items": len(rows),
+        "scored": len(scored),
+        "errors": sum(1 for r in rows if r["systems"].get(system, {}).get("error")),
+        "labeled_binary": len(binary),
+        "accuracy": round(correct / len(binary), 4) if binary else None,
+        "fake_precision": round(precision, 4) if precision is not None else None,
+        "fake_recall": round(recall, 4) if recall is not None else None,
+        "fake_f1": round(2 * precision * recall / (precision + recall), 4) if precision and recall else None,
+        "brier": round(brier, 4) if brier is not None else None,
+        "ece": round(ece, 4) if ece is not None else None,
+        "reliability": table,
+        "confusion": confusion,
+        "escalation_rate": round(escalation_rate, 4) if escalation_rate is not None else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        },
+    }
+
+
+def print_summary(summary: dict):
+    run = summary["run"]
+    print(f"\n{run['items_this_run']} items in {run['wall_seconds']:.1f}s "
+          f"({run['throughput_items_per_sec']:.1f} items/s, {run['workers']} workers); "
+          f"lookups: {run['lookup_hits']} cached, {run['lookup_misses']} not cached ({run['lookups']})")
+    for system, m in summary["systems"].items():
+        print(f"\n[{system}] {m['scored']}/{m['items']} scored, {m['errors']} errors")
+        print(f"  accuracy {m['accuracy']}  fake P/R/F1 {m['fake_precision']}/{m['fake_recall']}/{m['fake_f1']}"
+              f"  brier {m['brier']}  ECE {m['ece']}")
+        latency = m["latency_ms"]
+        print(f"  latency ms p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  mean {latency['mean']}")
+        # Without --cascade every item reports the transformer tier: "100% escalated" would mean nothing
+        if run["cascade"] and m.get("escalation_rate") is not None:
+            print(f"  cascade: {m['escalation_rate']:.1%} escalated to the transformer")
+        verdicts = sorted({v for row in m["confusion"].values() for v in row})
+        print("  confusion (gold \\ verdict): " + " | ".join(verdicts))
+        for gold, row in sorted(m["confusion"].items()):
+            print(f"    {gold:8} " + " | ".join(str(row.get(v, 0)) for v in verdicts))
+
+
+def chunks(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main(args):
+    os.makedirs(args.out_dir, exist_ok=True)
+    results_path = os.path.join(args.out_dir, "results.jsonl")
+    cache_dir = args.cache_dir or os.path.join(args.out_dir, "lookups")
+    if args.fresh and os.path.exists(results_path):
+        os.remove(results_path)
+
+    # 1. Resume: skip items already in results.jsonl
+    done = set()
+    if os.path.exists(results_path):
+        with open(results_path, encoding="utf-8") as f:
+            done = {json.loads(line)["id"] for line in f if line.strip()}
+        if done:
+            print(f"Resuming: {len(done)} items already evaluated")
+
+    if "engine" in args.systems and args.engine_classifier == "model":
+        import importlib.util
+        if importlib.util.find_spec("transformers") is None:
+            sys.exit("transformers is not installed; use --engine-classifier mock or --systems backend")
+
+    if args.cascade:
+        # Read by ai-engine's Config when the workers import it
+        os.environ["CASCADE_ENABLED"] = "true"
+
+    # 2. Stream the corpus through the pool, keeping a bounded number of chunks in flight
+    pending_items = (item for item in read_dataset(args.dataset) if item["id"] not in done)
+    if args.limit:
+        pending_items = (item for _, item in zip(range(args.limit), pending_items))
+    processed, lookup_hits, lookup_misses = 0, 0, 0
+    start = time.perf_counter()
+    with open(results_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.systems, args.engine_classifier, args.lookups, cache_dir, args.with_llm),
+    ) as pool:
+        source = chunks(pending_items, args.chunk_size)
+        in_flight = set()
+        while True:
+            for chunk in source:
+                in_flight.add(pool.submit(evaluate_chunk, chunk))
+                if len(in_flight) >= args.workers * 2:
+                    break
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                batch = future.result()
+                for result in batch["results"]:
+                    out.write(json.dumps(result) + "\n")
+                out.flush() # Checkpoint: everything written here is skipped on resume
+                processed += len(batch["results"])
+                lookup_hits += batch["lookup_hits"]
+                lookup_misses += batch["lookup_misses"]
+            if args.progress and processed and processed % args.progress < args.chunk_size:
+                elapsed = time.perf_counter() - start
+                print(f"  {processed} items, {processed / elapsed:.1f} items/s")
+    wall = time.perf_counter() - start
+
+    # 3. Metrics over every evaluated item (this run and resumed ones)
+    with open(results_path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    summary = {
+        "dataset": os.path.abspath(args.dataset),
+        "threshold": args.threshold,
+        "run": {
+            "items_this_run": processed,
+            "items_total": len(rows),
+            "wall_seconds": round(wall, 3),
+            "throughput_items_per_sec": round(processed / wall, 2) if wall and processed else 0.0,
+            "workers": args.workers,
+            "lookups": args.lookups,
+            "lookup_hits": lookup_hits,
+            "lookup_misses": lookup_misses,
+            "engine_classifier": args.engine_classifier,
+            "cascade": args.cascade,
+            "with_llm": args.with_llm,
+        },
+        "systems": {system: system_metrics(rows, system, args.threshold, args.bins) for system in args.systems},
+    }
+    with open(os.path.join(args.out_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print_summary(summary)
+    print(f"\nWrote {os.path.join(args.out_dir, 'summary.json')}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate credibility scoring on a labeled JSONL/CSV corpus.")
+    parser.add_argument("dataset", help="JSONL or CSV with text, label and optional id, url")
+    parser.add_argument("--out-dir", default="eval_run")
+    parser.add_argument("--systems", nargs="*", default=["engine", "backend"], choices=list(SCORERS))
+    parser.add_argument("--engine-classifier", default="model", choices=["model", "mock"],
+                        help="mock = uniform scores, to evaluate the heuristics alone")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Engine: answer confident items with the linear classifier (CASCADE_MODEL_PATH), escalate the rest")
+    parser.add_argument("--lookups", default="record", choices=["live", "record", "replay"],
+                        help="External lookups: call live, record to --cache-dir, or replay from it")
+    parser.add_argument("--cache-dir", help="Lookup cache directory (default: <out-dir>/lookups)")
+    parser.add_argument("--with-llm", action="store_true", help="Include the Groq report (verdict from the LLM)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--chunk-size", type=int, default=8, help="Items per task sent to a worker")
+    parser.add_argument("--limit", type=int, help="Evaluate at most this many new items")
+    parser.add_argument("--threshold", type=float, default=50, help="Score at or above which an item counts as predicted real")
+    parser.add_argument("--bins", type=int, default=10, help="Calibration bins")
+    parser.add_argument("--progress", type=int, default=500, help="Print progress every N items (0 = off)")
+    parser.add_argument("--fresh", action="store_true", help="Discard results.jsonl instead of resuming")
+    main(parser.parse_args())
@@ -0,0 +1,123 @@
+"""
+Before/after numbers for the analysis_history storage format.
+
+Offline (synthetic, representative record):
+    python scripts/history_size_report.py
+
+Against a live database (collection stats + real list/detail response sizes):
+    python scripts/history_size_report.py --mongo-url mongodb://localhost:27017 --user-id <uid>
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+# Ensure backend directory is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+import bson
+from app.core.config import settings
+from app.services.history_service import LIST_PROJECTION, trim_ai_raw_data, history_service
+
+HISTORY_PAGE = 50
+
+
+def sample_result() -> dict:
+    """An /analyze result shaped like a URL analysis with full NewsAPI coverage."""
+    article = {
+        "source": {"id": "reuters", "name": "Reuters"},
+        "author": "Staff Reporter",
+        "title": "Government announces new policy on renewable energy targets for 2030",
+        "description": "The government on Monday unveiled a package of measures aimed at " * 3,
+        "url": "https://www.reuters.com/world/policy-renewable-energy-targets-2030-2024-05-06/",
+        "urlToImage": "https://www.reuters.com/resizer/v2/ABCDEFGHIJKLMNOPQRSTUVWXYZ.jpg?auth=0123456789abcdef&width=1200",
+        "publishedAt": "2024-05-06T10:15:00Z",
+        "content": "NEW DELHI, May 6 (Reuters) - The government on Monday unveiled ... " * 4 + "[+4213 chars]",
+    }
+    trusted = [{"source": "reuters", "title": article["title"], "url": article["url"], "publishedAt": article["publishedAt"]}] * 10
+    return {
+        "verdict": "Real",
+        "credibility_score": 82,
+        "explanation": "Several trusted outlets report the announcement and a fact-check confirms the key figures. " * 3,
+        "red_flags": ["Figures may change after parliamentary review.", "Some outlets quote anonymous officials."],
+        "verified_sources": ["AFP Fact Check", "Mainstream Media"],
+        "translated_content": "Texto original del artículo " * 180,
+        "category": "Politics",
+        "ml_breakdown": {"fake_prob": 0.0, "real_prob": 0.0, "opinion_prob": 0.0},
+        "source_verification": {"found": True, "publisher": "AFP Fact Check", "rating": "True", "url": "https://factcheck.afp.com/x", "title": "Claim"},
+        "news_coverage": {"total_articles": 10, "trusted_articles": trusted, "has_trusted_coverage": True, "top_match": article},
+        "sentiment_analysis": {"subjectivity": 0.3, "polarity": 0.2},
+        "explanation_pending": False,
+    }
+
+
+def history_doc(result: dict, stored: dict) -> dict:
+    return {
+        "_id": bson.ObjectId(),
+        "user_id": "x" * 28,
+        "content": "Government announces new policy on renewable energy targets " * 5,
+        "source_url": "https://example.com/article",
+        "input_type": "url",
+        "verdict": result["verdict"],
+        "credibility_score": result["credibility_score"],
+        "category": result["category"],
+        "explanation_pending": False,
+        "created_at": datetime.utcnow(),
+        **stored,
+    }
+
+
+def json_bytes(docs) -> int:
+    return len(json.dumps(docs, default=str).encode("utf-8"))
+
+
+def offline_report():
+    result = sample_result()
+    settings.COMPRESS_AI_RAW_DATA = True
+    compressed = history_service.pack_ai_raw_data(result)
+    variants = {
+        "full (before)": history_doc(result, {"ai_raw_data": result}),
+        "trimmed": history_doc(result, {"ai_raw_data": trim_ai_raw_data(result)}),
+        "trimmed+zlib": history_doc(result, {"ai_raw_data_z": compressed["ai_raw_data_z"]}),
+    }
+
+    print(f"{'format':16} {'doc bytes':>10} {'1M docs (working set)':>22}")
+    for name, doc in variants.items():
+        size = len(bson.encode(doc))
+        print(f"{name:16} {size:>10} {size * 1_000_000 / 2**20:>18.0f} MiB")
+
+    full_page = [variants["full (before)"]] * HISTORY_PAGE
+    summary = {k: v for k, v in variants["full (before)"].items() if k in LIST_PROJECTION or k == "_id"}
+    print(f"\nGET /history ({HISTORY_PAGE} items) response bytes: before {json_bytes(full_page)}, after {json_bytes([summary] * HISTORY_PAGE)}")
+
+
+async def live_report(mongo_url: str, db_name: str, user_id: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    try:
+        stats = await db.command("collStats", "analysis_history")
+        print(f"analysis_history: count={stats.get('count')} avgObjSize={stats.get('avgObjSize')} "
+              f"size={stats.get('size')} storageSize={stats.get('storageSize')} totalIndexSize={stats.get('totalIndexSize')}")
+        if user_id:
+            query = {"user_id": user_id}
+            full = await db["analysis_history"].find(query).sort("created_at", -1).limit(HISTORY_PAGE).to_list(HISTORY_PAGE)
+            lean = await db["analysis_history"].find(query, LIST_PROJECTION).sort("created_at", -1).limit(HISTORY_PAGE).to_list(HISTORY_PAGE)
+            print(f"GET /history response bytes for {user_id}: full {json_bytes(full)}, projected {json_bytes(lean)}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report analysis_history document and response sizes.")
+    parser.add_argument("--mongo-url", help="Also report live collection stats")
+    parser.add_argument("--db", default=settings.DB_NAME)
+    parser.add_argument("--user-id", help="Measure real /history payloads for this user")
+    args = parser.parse_args()
+
+    offline_report()
+    if args.mongo_url:
+        asyncio.run(live_report(args.mongo_url, args.db, args.user_id))
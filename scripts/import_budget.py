@@ -0,0 +1,120 @@
+"""
+Import-time budget check for the backend.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter
+(several times, keeping the median), prints the slowest modules and fails if
+the app takes longer than the budget to import or if a module that must be
+loaded lazily shows up at import time.
+
+    python scripts/import_budget.py
+    python scripts/import_budget.py --budget-ms 500 --top 30
+    python scripts/import_budget.py --json import_times.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+# Heavy dependencies that must only be imported where they are used
+# (first request / lifespan preload), never while importing the app.
+LAZY_MODULES = [
+    "transformers", "torch", "textblob", "nltk", "scipy", "bs4", "deep_translator",
+    "groq", "firebase_admin", "requests",
+]
+
+
+def measure(module: str) -> list:
+    """
+    One fresh interpreter run. Returns [(name, self_us, cumulative_us, depth)]
+    in importtime order (a module is listed after everything it imported).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_chain(rows: list, index: int) -> list:
+    """Who imported rows[index]: the next rows with a smaller depth."""
+    chain, depth = [], rows[index][3]
+    for name, _, _, row_depth in rows[index + 1:]:
+        if row_depth < depth:
+            chain.append(name)
+            depth = row_depth
+    return chain
+
+
+def main(args):
+    runs = [measure(args.module) for _ in range(args.runs)]
+
+    # Median per module across runs
+    samples = {}
+    for rows in runs:
+        for name, self_us, cumulative_us, _ in rows:
+            samples.setdefault(name, []).append((self_us, cumulative_us))
+    modules = {
+        name: {
+            "self_ms": statistics.median(s for s, _ in values) / 1000,
+            "cumulative_ms": statistics.median(c for _, c in values) / 1000,
+        }
+        for name, values in samples.items()
+    }
+    total_ms = modules[args.module]["cumulative_ms"]
+
+    print(f"import {args.module}: {total_ms:.0f} ms (median of {args.runs} runs, budget {args.budget_ms} ms)\n")
+    print(f"{'cumulative':>11} {'self':>8}  module")
+    slowest = sorted(modules.items(), key=lambda kv: kv[1]["cumulative_ms"], reverse=True)[:args.top]
+    for name, times in slowest:
+        print(f"{times['cumulative_ms']:9.1f}ms {times['self_ms']:6.1f}ms  {name}")
+
+    print("\nFirst-party modules:")
+    for name, times in sorted(modules.items(), key=lambda kv: kv[1]["cumulative_ms"], reverse=True):
+        if name.startswith("app.") or name == "app":
+            print(f"{times['cumulative_ms']:9.1f}ms {times['self_ms']:6.1f}ms  {name}")
+
+    # Lazy modules that were imported anyway, with the import chain that pulled them in
+    violations = []
+    rows = runs[0]
+    for i, (name, _, _, _) in enumerate(rows):
+        if name in args.lazy:
+            violations.append({"module": name, "imported_by": import_chain(rows, i)})
+    if violations:
+        print("\nModules that should be imported lazily:")
+        for v in violations:
+            print(f"  {v['module']} <- " + " <- ".join(v["imported_by"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"module": args.module, "total_ms": total_ms, "budget_ms": args.budget_ms,
+                       "modules": modules, "lazy_violations": violations}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    failed = total_ms > args.budget_ms or violations
+    print("\nFAIL" if failed else "\nOK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report backend import time per module and enforce a budget.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=800)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--lazy", nargs="*", default=LAZY_MODULES, help="Top-level modules that must not be imported at startup")
+    parser.add_argument("--json", help="Also write the measurements to this file")
+    main(parser.parse_args())
@@ -0,0 +1,53 @@
+"""
+Creates / migrates the MongoDB indexes declared in backend/app/db/indexes.py
+and checks with explain() that every endpoint query shape uses an index.
+
+    python scripts/init_database.py                 # build + verify
+    python scripts/init_database.py --verify-only   # only run the explain() checks
+    python scripts/init_database.py --prune         # also drop indexes not declared
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Ensure backend directory is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.db.indexes import ensure_indexes, verify_query_shapes
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    try:
+        if not args.verify_only:
+            report = await ensure_indexes(db, prune=args.prune)
+            for action in ("created", "rebuilt", "dropped", "failed"):
+                for label in report[action]:
+                    print(f"{action.upper():8} {label}")
+            if not any(report.values()):
+                print("Indexes already up to date.")
+
+        if args.no_verify:
+            return 0
+
+        results = await verify_query_shapes(db)
+        for result in results:
+            status = "OK" if result["indexed"] and not result.get("in_memory_sort") else "WARN"
+            print(f"{status:5} {result['name']:32} {' > '.join(result['stages'])}")
+        return 0 if all(r["indexed"] for r in results) else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provision MongoDB indexes for the AI Fake News Detector.")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db", default=settings.DB_NAME)
+    parser.add_argument("--verify-only", action="store_true", help="Skip index creation, only explain() the query shapes")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the explain() checks")
+    parser.add_argument("--prune", action="store_true", help="Drop indexes that are not declared")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,66 @@
+"""
+Moves comments and likes embedded in "posts" documents into the "comments"
+and "post_likes" collections, leaving a preview of the latest comments and
+likers (plus comment_count / likes) on each post.
+
+    python scripts/migrate_blog_posts.py
+    python scripts/migrate_blog_posts.py --reconcile-likes   # also recount likes from post_likes
+
+Safe to re-run: already migrated posts are skipped and records are upserted.
+Posts that are commented on or liked before this runs are migrated lazily by the API.
+--reconcile-likes repairs posts whose likes counter drifted from post_likes
+(a like toggle interrupted between its two writes).
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Ensure backend directory is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.db.indexes import ensure_indexes
+from app.services.blog_service import migrate_embedded_comments, migrate_embedded_likes, reconcile_likes
+
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db]
+    try:
+        # The comments index must exist before threads are paged
+        await ensure_indexes(db)
+
+        for label, flag, field, migrate in (
+            ("comments", "comments_migrated", "comments", migrate_embedded_comments),
+            ("likes", "likes_migrated", "liked_by", migrate_embedded_likes),
+        ):
+            migrated = skipped = 0
+            cursor = db["posts"].find({flag: {"$ne": True}}, {field: 1, flag: 1})
+            async for post in cursor:
+                if await migrate(db, post):
+                    migrated += 1
+                else:
+                    # Changed while we were copying it; the next run (or the API) picks it up
+                    skipped += 1
+            print(f"{label}: migrated {migrated} posts, {skipped} skipped.")
+
+        if args.reconcile_likes:
+            fixed = checked = 0
+            async for post in db["posts"].find({"likes_migrated": True}, {"likes": 1}):
+                checked += 1
+                updated = await reconcile_likes(db, {"_id": post["_id"]}, str(post["_id"]))
+                if updated is not None and updated.get("likes") != post.get("likes"):
+                    fixed += 1
+            print(f"likes: recounted {checked} posts, {fixed} counters corrected.")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move embedded blog comments and likes to their own collections.")
+    parser.add_argument("--mongo-url", default=settings.MONGODB_URL)
+    parser.add_argument("--db", default=settings.DB_NAME)
+    parser.add_argument("--reconcile-likes", action="store_true", help="Recount every post's likes from post_likes")
+    asyncio.run(main(parser.parse_args()))